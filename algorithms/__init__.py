@@ -1,6 +1,19 @@
-from algorithms.fifo import FIFO
-from algorithms.priority_p import PriorityPreemptive
-from algorithms.np_sjf import NonPreemptiveSJF
-from algorithms.np_priority import NonPreemptivePriority
-from algorithms.sjf import PreemptiveSJF
-from algorithms.round_robin import RR
+"""
+Scheduling algorithms, imported on first use by name through get_algorithm or as attributes of this
+package, e.g. `algorithms.RR`.
+"""
+from algorithms.registry import ALIASES, BUILTIN, get_algorithm, names, parameter_schema, validate_params
+
+__all__ = list(BUILTIN) + ['get_algorithm', 'names', 'parameter_schema', 'validate_params']
+
+
+def __getattr__(name):
+    if name in BUILTIN or name in ALIASES:
+        AlgorithmClass = get_algorithm(name)
+        globals()[name] = AlgorithmClass
+        return AlgorithmClass
+    raise AttributeError("module 'algorithms' has no attribute '{}'".format(name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(BUILTIN) | set(ALIASES))
@@ -0,0 +1,77 @@
+from bisect import bisect_right
+
+
+class ArrivalIndex:
+    """
+    Processes sorted by arrival time, split into groups that arrive at the same time.
+    A cursor marks the next process to arrive, so taking a group is a single slice.
+    """
+
+    def __init__(self, processes):
+        """
+        :param processes: list of processes sorted by arrival time
+        """
+        self.processes = processes
+        self.group_times = []
+        self.group_ends = []
+        for i, process in enumerate(processes):
+            if self.group_times and self.group_times[-1] == process.arrival_time:
+                self.group_ends[-1] = i + 1
+            else:
+                self.group_times.append(process.arrival_time)
+                self.group_ends.append(i + 1)
+        self.cursor = 0
+        self.group = 0
+        self.last_arrival_time = None
+
+    def __len__(self):
+        return len(self.processes) - self.cursor
+
+    def __bool__(self):
+        return self.cursor < len(self.processes)
+
+    def next_arrival_time(self):
+        """
+        :return: arrival time of the next process, or None if all of them have arrived
+        """
+        if self.group < len(self.group_times):
+            return self.group_times[self.group]
+        return None
+
+    def take(self, time):
+        """
+        Take the processes arriving at the given time.
+        :return: list of processes, empty if none arrives at that time
+        """
+        if self.group == len(self.group_times) or self.group_times[self.group] != time:
+            return []
+        end = self.group_ends[self.group]
+        arrived_processes = self.processes[self.cursor:end]
+        self.cursor = end
+        self.group += 1
+        self.last_arrival_time = time
+        return arrived_processes
+
+    def widest(self):
+        """
+        :return: largest number of CPUs a process needs, 1 if there are no processes
+        """
+        return max((process.cpus for process in self.processes), default=1)
+
+    def arrived_count(self, time):
+        """
+        :return: number of processes arriving by the given time which have not been taken yet
+        """
+        groups = bisect_right(self.group_times, time)
+        return max((self.group_ends[groups - 1] if groups else 0) - self.cursor, 0)
+
+    def popleft(self):
+        """
+        Take the next process alone.
+        """
+        process = self.processes[self.cursor]
+        self.cursor += 1
+        if self.cursor == self.group_ends[self.group]:
+            self.group += 1
+        self.last_arrival_time = process.arrival_time
+        return process
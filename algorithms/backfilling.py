@@ -0,0 +1,233 @@
+from heapq import heappop, heappush
+from itertools import count
+
+import numpy as np
+
+from algorithms.base_algorithm import BaseAlgorithm
+from algorithms.profile import AvailabilityProfile
+
+
+class EASYBackfilling(BaseAlgorithm):
+    """
+    First come, first served on a machine of many CPUs, with EASY backfilling: processes need
+    `cpus` CPUs at once and start in arrival order as long as enough are free. The first process
+    which does not fit gets a reservation at the earliest time enough CPUs will be free for it, and
+    later processes may start ahead of it if they do not delay it: if they end by then, or only use
+    CPUs it leaves free. Run times are known exactly, as with the other algorithms.
+
+    The running processes are kept in an AvailabilityProfile, and the reservation is only looked up
+    when another process reaches the head of the queue. Until then nothing a waiting process was
+    turned down for changes but the time, so when processes only arrive, only the new ones are tried.
+    """
+    cpus = None
+    slowdown_threshold = 10
+    parameters = {
+        'cpus': {'type': 'integer', 'minimum': 1,
+                 'description': 'CPUs of the machine, as many as the widest process needs if not given'},
+        'slowdown_threshold': {'type': 'number', 'minimum': 1,
+                               'description': 'Shortest run time the bounded slowdown divides by'},
+    }
+
+    def __init__(self, processes, sorted_by=()):
+        super().__init__(processes, sorted_by)
+        # Processes waiting for CPUs, in arrival order
+        self.queue = []
+        # Heap of the running processes by end time
+        self.running = []
+        # Heap of the processes reserved to start later by start time, see ConservativeBackfilling
+        self.waiting = []
+        self.counter = count()
+        self.profile = None
+        # CPU time of the processes started so far
+        self.busy_time = 0
+        # Head of the queue and the time it is guaranteed to start at
+        self.reserved = None
+        self.shadow_time = None
+
+    def run(self):
+        """
+        Run the algorithm.
+        :return: same as BaseAlgorithm.run, with "cpu_utilization" the share of the CPU time of all
+                 CPUs the processes used, plus "cpus", "average_bounded_slowdown" and
+                 "max_bounded_slowdown", see result
+        """
+        self.profile = AvailabilityProfile(self.machine_cpus(), self.time)
+        # Position in the queue from which processes have not been tried since the last change
+        first = 0
+        while self.arrivals or self.queue or self.running:
+            if self.observers:
+                self.notify()
+
+            finished = self.update()
+            self.take_arrivals()
+            self.schedule(0 if finished else first)
+            first = len(self.queue)
+            self.advance()
+
+        return self.result()
+
+    def machine_cpus(self):
+        """
+        :return: number of CPUs of the machine
+        :raise ValueError: if a process needs more
+        """
+        # Asked of the arrivals, which also know the processes of a trace simulated out of core
+        widest = self.arrivals.widest()
+        cpus = self.cpus if self.cpus is not None else widest
+        if widest > cpus:
+            raise ValueError('A process needs {} CPUs, the machine has {}'.format(widest, cpus))
+        return cpus
+
+    def update(self):
+        """
+        Complete the processes which end at the current time and start those reserved to start now.
+        :return: True if any process ended
+        """
+        running = self.running
+        finished = False
+        while running and running[0][0] <= self.time:
+            self.complete_process(heappop(running)[2])
+            finished = True
+        waiting = self.waiting
+        while waiting and waiting[0][0] <= self.time:
+            process = heappop(waiting)[2]
+            heappush(running, (process.start_time + process.burst_time, next(self.counter), process))
+        self.profile.advance(self.time)
+        return finished
+
+    def take_arrivals(self):
+        """
+        Queue every process which has arrived by now, in arrival order.
+        """
+        next_arrival_time = self.arrivals.next_arrival_time()
+        while next_arrival_time is not None and next_arrival_time <= self.time:
+            self.queue.extend(self.arrivals.take(next_arrival_time))
+            next_arrival_time = self.arrivals.next_arrival_time()
+
+    def advance(self):
+        """
+        Move the time to the next arrival, start or end of a process.
+        """
+        next_time = self.arrivals.next_arrival_time()
+        for heap in (self.running, self.waiting):
+            if heap and (next_time is None or heap[0][0] < next_time):
+                next_time = heap[0][0]
+        if next_time is None:
+            return
+        if not self.running:
+            self.idle_time += next_time - self.time
+        self.time = next_time
+
+    def schedule(self, first):
+        """
+        Start the processes at the head of the queue which fit, then backfill.
+        :param first: position of the first process to try to backfill
+        """
+        queue = self.queue
+        profile = self.profile
+        started = 0
+        while started < len(queue) and queue[started].cpus <= profile.free:
+            self.start(queue[started], self.time)
+            started += 1
+        if started:
+            del queue[:started]
+            first = 0
+        if not queue or not profile.free:
+            return
+
+        head = queue[0]
+        if head is not self.reserved:
+            self.reserved = head
+            self.shadow_time = profile.earliest_start(head.cpus, head.burst_time)
+        shadow_time = self.shadow_time
+        # CPUs the head leaves free once it starts
+        extra = profile.free_at(shadow_time) - head.cpus
+        backfilled = []
+        for i in range(max(first, 1), len(queue)):
+            process = queue[i]
+            if process.cpus > profile.free:
+                continue
+            if self.time + process.burst_time > shadow_time:
+                if process.cpus > extra:
+                    continue
+                extra -= process.cpus
+            self.start(process, self.time)
+            backfilled.append(i)
+            if not profile.free:
+                break
+        # Few processes backfill at once, so deleting them one by one beats copying the queue
+        for i in reversed(backfilled):
+            del queue[i]
+
+    def start(self, process, start_time):
+        """
+        Reserve the CPUs of a process from start_time on.
+        """
+        process.start_time = start_time
+        self.profile.reserve(start_time, process.burst_time, process.cpus)
+        self.busy_time += process.cpus * process.burst_time
+        if start_time > self.time:
+            heappush(self.waiting, (start_time, next(self.counter), process))
+        else:
+            heappush(self.running, (start_time + process.burst_time, next(self.counter), process))
+
+    def ready_count(self):
+        return len(self.queue)
+
+    def arrival_horizon(self):
+        """
+        The profile and the reservations are not part of the state what-if analysis restores, so
+        what-if runs of this algorithm always start over.
+        :return: None
+        """
+        return None
+
+    def result(self):
+        """
+        The bounded slowdown of a process is its turnaround time over its burst time, but at least
+        slowdown_threshold, and at least 1.
+        """
+        result = super().result()
+        records = result['processes']
+        cpus = self.profile.cpus
+        result['cpus'] = cpus
+        result['cpu_utilization'] = self.busy_time / (cpus * self.time) if self.time else 0.0
+        if len(records):
+            slowdowns = np.maximum(
+                records['turnaround_time'] / np.maximum(records['burst_time'], self.slowdown_threshold), 1
+            )
+            result['average_bounded_slowdown'] = float(slowdowns.mean())
+            result['max_bounded_slowdown'] = float(slowdowns.max())
+        return result
+
+
+class ConservativeBackfilling(EASYBackfilling):
+    """
+    Conservative backfilling: every process gets a reservation when it arrives, at the earliest time
+    enough CPUs are free for its whole run without moving the reservation of any process which
+    arrived before it. Run times are exact, so no process ends earlier than planned, reservations
+    never move and every process starts at its reservation.
+    """
+
+    def run(self):
+        """
+        Run the algorithm.
+        :return: same as EASYBackfilling.run
+        """
+        self.profile = AvailabilityProfile(self.machine_cpus(), self.time)
+        while self.arrivals or self.waiting or self.running:
+            if self.observers:
+                self.notify()
+
+            self.update()
+            next_arrival_time = self.arrivals.next_arrival_time()
+            while next_arrival_time is not None and next_arrival_time <= self.time:
+                for process in self.arrivals.take(next_arrival_time):
+                    self.start(process, self.profile.earliest_start(process.cpus, process.burst_time))
+                next_arrival_time = self.arrivals.next_arrival_time()
+            self.advance()
+
+        return self.result()
+
+    def ready_count(self):
+        return len(self.waiting)
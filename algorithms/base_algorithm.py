@@ -1,4 +1,38 @@
-from collections import deque
+from array import array
+from operator import attrgetter
+
+import numpy as np
+
+from algorithms.arrivals import ArrivalIndex
+from algorithms.ready_queue import ReadyQueue
+from results import ResultColumns
+
+
+def deadline_results(lateness):
+    """
+    Summarize how the processes with deadlines met them. Lateness is the end time minus the due
+    time, negative for processes which finished early; tardiness is the lateness of late processes, 0 otherwise.
+    :param lateness: non-empty sequence of the lateness of every process with a deadline
+    :return: {"processes", "missed", "miss_rate", "average_lateness", "max_lateness", "p50_lateness",
+              "p90_lateness", "p99_lateness", "total_tardiness", "average_tardiness", "max_tardiness"}
+    """
+    lateness = np.asarray(lateness, dtype=np.float64)
+    tardiness = np.maximum(lateness, 0)
+    missed = int(np.count_nonzero(lateness > 0))
+    p50, p90, p99 = np.percentile(lateness, [50, 90, 99]).tolist()
+    return {
+        "processes": len(lateness),
+        "missed": missed,
+        "miss_rate": missed / len(lateness),
+        "average_lateness": float(lateness.mean()),
+        "max_lateness": float(lateness.max()),
+        "p50_lateness": p50,
+        "p90_lateness": p90,
+        "p99_lateness": p99,
+        "total_tardiness": float(tardiness.sum()),
+        "average_tardiness": float(tardiness.mean()),
+        "max_tardiness": float(tardiness.max()),
+    }
 
 
 class BaseAlgorithm:
@@ -6,19 +40,43 @@ class BaseAlgorithm:
     Base class for all algorithms.
     """
     process_compare_prop = 'arrival_time'
+    # Properties the algorithm orders its input by
+    arrival_order = ('arrival_time',)
+    # Parameters which can be set on an instance, by name: {"type", "description", optional "minimum",
+    # "exclusiveMinimum", "maximum" and "enum"}.
+    # Types are JSON schema names: integer, number, string, boolean or object; defaults are the class attributes
+    parameters = {}
 
-    def __init__(self, processes):
+    def __init__(self, processes, sorted_by=()):
         """
         Initialize the algorithm.
         :param processes: list of processes to be executed.
+        :param sorted_by: properties the processes are already sorted by. Sorting them is skipped
+                          if these start with arrival_order.
         """
-        self.processes = deque(processes)
+        self.processes = list(processes)
+        if tuple(sorted_by[:len(self.arrival_order)]) != self.arrival_order:
+            self.processes.sort(key=attrgetter(*self.arrival_order))
+        self.arrivals = ArrivalIndex(self.processes)
+        # Sink of the finished processes, see results.py
+        self.executed_processes = ResultColumns(len(self.processes))
+        self.ready_queue = ReadyQueue()
+        self.running_process = None
+        self.time = 0
+        self.idle_time = 0
+        self.total_waiting_time = 0
+        self.total_turnaround_time = 0
+        self.total_response_time = 0
+        # Lateness of every finished process which has a deadline, in the order they finished
+        self.lateness = array('d')
+        # Callables invoked with the algorithm at the top of every scheduling step
+        self.observers = []
 
     def run(self):
         """
         Run the algorithm.
         :return: {
-            "processes": list of executed processes,
+            "processes": result records of the executed processes, see results.py,
             "time": total time of execution,
             "cpu_utilization": total CPU utilization,
             "throughput": total throughput,
@@ -28,3 +86,123 @@ class BaseAlgorithm:
         }
         """
         raise NotImplementedError
+
+    def complete_process(self, process):
+        """
+        Record that the process finished at current time.
+        :param process: finished process
+        """
+        process.end_time = self.time
+        process.turnaround_time = process.end_time - process.arrival_time
+        process.waiting_time = process.turnaround_time - process.burst_time
+        self.total_waiting_time += process.waiting_time
+        self.total_turnaround_time += process.turnaround_time
+        self.total_response_time += process.start_time - process.arrival_time
+        if process.due_time is not None:
+            self.lateness.append(self.time - process.due_time)
+        self.executed_processes.append(process)
+
+    def drain(self):
+        """
+        Finish a non-preemptive run once every process has arrived. From then on the running process
+        runs to its end and the ready queue follows in key order, back to back, so the schedule is
+        computed at once: end times are the cumulative sum of the remaining times.
+        :return: list of the processes finished, in the order they ran
+        """
+        processes = [process for _, _, process in sorted(self.ready_queue.heap)]
+        self.ready_queue = ReadyQueue()
+        if self.running_process is not None:
+            processes.insert(0, self.running_process)
+            self.running_process = None
+        if not processes:
+            return processes
+        durations = np.maximum([process.remaining_time for process in processes], 0)
+        # Summed one by one from the current time, so float times round exactly as step by step
+        ends = np.cumsum(np.concatenate([[self.time], durations]))[1:]
+        starts = ends - durations
+        if processes[0].start_time is not None:
+            starts[0] = processes[0].start_time
+        turnaround_times = ends - [process.arrival_time for process in processes]
+        waiting_times = turnaround_times - [process.burst_time for process in processes]
+        response_times = starts - [process.arrival_time for process in processes]
+        ends, starts = ends.tolist(), starts.tolist()
+        turnaround_times, waiting_times = turnaround_times.tolist(), waiting_times.tolist()
+        for process, start, end, turnaround_time, waiting_time in zip(
+                processes, starts, ends, turnaround_times, waiting_times):
+            process.start_time = start
+            process.end_time = end
+            process.remaining_time = 0
+            process.turnaround_time = turnaround_time
+            process.waiting_time = waiting_time
+            if process.due_time is not None:
+                self.lateness.append(end - process.due_time)
+        self.executed_processes.extend(processes)
+        # Added up in order like complete_process does, so the totals round the same way
+        self.total_waiting_time = sum(waiting_times, self.total_waiting_time)
+        self.total_turnaround_time = sum(turnaround_times, self.total_turnaround_time)
+        self.total_response_time = sum(response_times.tolist(), self.total_response_time)
+        self.time = ends[-1]
+        return processes
+
+    def result(self):
+        """
+        Calculate total time, CPU utilization, throughput, average waiting time, average turnaround time
+        and average response time of the finished run.
+        :return: same as run, plus "deadlines", see deadline_results, if any process had a deadline
+        """
+        total_time = self.time
+        executed = len(self.executed_processes)
+        result = {
+            "processes": self.executed_processes.records(),
+            "total_time": total_time,
+            "cpu_utilization": (total_time - self.idle_time) / total_time if total_time else 0.0,
+            "throughput": executed / total_time if total_time else 0.0,
+            "average_waiting_time": self.total_waiting_time / executed,
+            "average_turnaround_time": self.total_turnaround_time / executed,
+            "average_response_time": self.total_response_time / executed
+        }
+        if self.lateness:
+            result['deadlines'] = deadline_results(self.lateness)
+        return result
+
+    def notify(self):
+        """
+        Hand the current scheduling state to every observer.
+        Called at the top of each scheduling step, before processes arriving at self.time are taken.
+        """
+        for observer in self.observers:
+            observer(self)
+
+    def arrival_horizon(self):
+        """
+        Return the time before which every arrival has been taken from self.arrivals and after
+        which none has, or None if the current step is not such a boundary.
+        :return: Int or None
+        """
+        last_arrival_time = self.arrivals.last_arrival_time
+        if last_arrival_time is not None and last_arrival_time >= self.time:
+            return None
+        return self.time
+
+    def ready_count(self):
+        """
+        Return the number of arrived processes waiting for the CPU.
+        :return: Int
+        """
+        return len(self.ready_queue)
+
+    def append_to_ready_queue(self, process):
+        """
+        Append process to ready queue based on priority.
+        :param process: process to be appended
+        """
+        self.ready_queue.append(process)
+
+    def admit(self, arrived_processes):
+        """
+        Move the arrived processes which are not running to the ready queue in one batch.
+        :param arrived_processes: list of processes which arrived at current time
+        """
+        if self.running_process is not None:
+            arrived_processes = [process for process in arrived_processes if process is not self.running_process]
+        self.ready_queue.extend(arrived_processes)
@@ -0,0 +1,119 @@
+from algorithms.base_algorithm import BaseAlgorithm
+from algorithms.ready_queue import ReadyQueue
+
+# Key of the processes without a deadline, which only run when no process with one is ready
+NO_DEADLINE = float('inf')
+
+
+class KeyedReadyQueue(ReadyQueue):
+    """
+    Ready queue ordered by a function of the processes instead of their compare property.
+    """
+
+    def __init__(self, key):
+        super().__init__()
+        self.key = key
+
+    def entry(self, process):
+        return self.key(process), next(self.counter), process
+
+    def peek_key(self):
+        return self.heap[0][0]
+
+
+class EDF(BaseAlgorithm):
+    """
+    Preemptive earliest deadline first: the ready process which is due first runs, and an arriving
+    process preempts the running one if it is due earlier. Processes due at the same time, and
+    processes without a deadline, run in the order they became ready.
+
+    Ready processes are kept in a min-heap by key, without the running process, so taking an
+    arrival, preempting and picking the next process cost O(log n). Keys of waiting processes never
+    change. The running process only stops when it finishes or when a process arrives, so a run has
+    O(n) steps.
+    """
+
+    def __init__(self, processes, sorted_by=()):
+        super().__init__(processes, sorted_by)
+        self.ready_queue = KeyedReadyQueue(self.key)
+
+    def run(self):
+        """
+        Run the algorithm.
+        :return: same as BaseAlgorithm.run, plus "deadlines" if any process has a deadline
+        """
+        while self.arrivals or self.ready_queue or self.running_process:
+            if self.observers:
+                self.notify()
+
+            next_arrival_time = self.arrivals.next_arrival_time()
+            while next_arrival_time is not None and next_arrival_time <= self.time:
+                self.ready_queue.extend(self.arrivals.take(next_arrival_time))
+                next_arrival_time = self.arrivals.next_arrival_time()
+
+            process = self.running_process
+            if process is None:
+                if not self.ready_queue:
+                    self.idle_time += next_arrival_time - self.time
+                    self.time = next_arrival_time
+                    continue
+                process = self.ready_queue.popleft()
+            elif self.ready_queue and self.ready_queue.peek_key() < self.key(process):
+                self.append_to_ready_queue(process)
+                process = self.ready_queue.popleft()
+
+            if process.start_time is None:
+                process.start_time = self.time
+            run_time = self.run_time(process, next_arrival_time)
+            process.remaining_time -= run_time
+            self.time += run_time
+            if process.remaining_time == 0:
+                self.complete_process(process)
+                self.running_process = None
+            else:
+                self.running_process = process
+
+        return self.result()
+
+    def key(self, process):
+        """
+        :return: the key the process is picked by, smallest first
+        """
+        return process.due_time if process.due_time is not None else NO_DEADLINE
+
+    def run_time(self, process, next_arrival_time):
+        """
+        :return: how long the process runs before the next decision
+        """
+        if next_arrival_time is not None and self.time + process.remaining_time > next_arrival_time:
+            return next_arrival_time - self.time
+        return process.remaining_time
+
+
+class LLF(EDF):
+    """
+    Preemptive least laxity first: the ready process with the least slack runs, where the laxity is
+    the time left until the due time minus the remaining time. Ties go to the running process.
+
+    The laxity of a waiting process shrinks as fast as the time goes by, so waiting processes keep
+    their order and are keyed by due time minus remaining time, which stays the same while they wait.
+    The key of the running process grows while it runs, so it runs until it exceeds the smallest
+    waiting key, but at least one quantum, which keeps processes of equal laxity from taking turns
+    at every time unit.
+    """
+    quantum = 1
+    parameters = {
+        'quantum': {'type': 'number', 'minimum': 1,
+                    'description': 'Time a process runs at least before a process with less laxity preempts it'},
+    }
+
+    def key(self, process):
+        if process.due_time is None:
+            return NO_DEADLINE
+        return process.due_time - process.remaining_time
+
+    def run_time(self, process, next_arrival_time):
+        run_time = super().run_time(process, next_arrival_time)
+        if self.ready_queue and self.ready_queue.peek_key() != NO_DEADLINE:
+            run_time = min(run_time, max(self.quantum, self.ready_queue.peek_key() - self.key(process) + 1))
+        return run_time
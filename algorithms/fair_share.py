@@ -0,0 +1,231 @@
+from collections import deque
+
+from algorithms.base_algorithm import BaseAlgorithm
+from algorithms.indexed_heap import IndexedHeap
+
+# Group of the processes which have none
+DEFAULT_GROUP = 'default'
+
+
+class Group:
+    """
+    Node of the group tree. Leaves queue processes, inner nodes keep a heap of their active
+    children by virtual time, which is the CPU time a child received divided by its weight.
+    """
+    __slots__ = ('name', 'weight', 'parent', 'children', 'leaf', 'active', 'queue', 'virtual_time', 'virtual_floor',
+                 'cpu_time', 'processes', 'total_waiting_time', 'total_turnaround_time', 'total_response_time')
+
+    def __init__(self, name, weight, parent):
+        self.name = name
+        self.weight = weight
+        self.parent = parent
+        self.children = {}
+        # Whether processes were put in this group, which then cannot have subgroups
+        self.leaf = False
+        self.active = IndexedHeap()
+        self.queue = deque()
+        self.virtual_time = 0.0
+        # Smallest virtual time of the active children, never decreasing; a child which becomes
+        # active starts from here, so a group cannot save up CPU time while it has nothing to run
+        self.virtual_floor = 0.0
+        self.cpu_time = 0
+        self.processes = 0
+        self.total_waiting_time = 0
+        self.total_turnaround_time = 0
+        self.total_response_time = 0
+
+    def path(self):
+        """
+        :return: list of the groups from the top-level group down to this one
+        """
+        groups = []
+        group = self
+        while group.parent is not None:
+            groups.append(group)
+            group = group.parent
+        return groups[::-1]
+
+
+class FairShare(BaseAlgorithm):
+    """
+    Hierarchical fair share: the CPU is shared among the groups of the processes in proportion to
+    their weights, level by level. Groups are paths like "acme/batch", so "acme" and "globex" share
+    the CPU first, then the subgroups of "acme" share the part of "acme". Processes of one group take
+    turns like in round robin. Processes without a group belong to the group "default".
+
+    Every quantum, the active child with the smallest virtual time is picked from the root down,
+    and the time run is charged to the virtual time of every group on the way, so a pick costs
+    O(depth * log(groups)). A process runs on without quanta while nothing competes with it, up to
+    the next arrival.
+    """
+    quantum = 4
+    weights = {}
+    parameters = {
+        'quantum': {'type': 'integer', 'minimum': 1, 'description': 'Time a process runs before the next pick'},
+        'weights': {'type': 'object',
+                    'description': 'Weight of every group by path, e.g. {"acme": 3, "acme/batch": 2}, 1 if not given'},
+    }
+
+    def __init__(self, processes, sorted_by=()):
+        super().__init__(processes, sorted_by)
+        self.root = Group('', 1, None)
+        self.groups = {}
+        self.queued = 0
+
+    def run(self):
+        """
+        Run the algorithm.
+        :return: same as BaseAlgorithm.run, plus "groups": metrics of every group by path, see group_results
+        """
+        root = self.root
+        while self.arrivals or root.active:
+            if self.observers:
+                self.notify()
+
+            next_arrival_time = self.arrivals.next_arrival_time()
+            while next_arrival_time is not None and next_arrival_time <= self.time:
+                for process in self.arrivals.take(next_arrival_time):
+                    self.enqueue(process)
+                next_arrival_time = self.arrivals.next_arrival_time()
+
+            if not root.active:
+                self.running_process = None
+                self.idle_time += next_arrival_time - self.time
+                self.time = next_arrival_time
+                continue
+
+            # Pick the active child with the smallest virtual time at every level
+            group = root
+            contended = False
+            entries = root.active.entries
+            while entries:
+                contended = contended or len(entries) > 1
+                group = entries[0][2]
+                entries = group.active.entries
+            process = group.queue[0]
+            contended = contended or len(group.queue) > 1
+
+            run_time = min(self.quantum, process.remaining_time) if contended else process.remaining_time
+            if next_arrival_time is not None and self.time + run_time > next_arrival_time:
+                run_time = next_arrival_time - self.time
+            if process.start_time is None:
+                process.start_time = self.time
+            process.remaining_time -= run_time
+            self.time += run_time
+            self.charge(group, run_time)
+
+            if process.remaining_time == 0:
+                group.queue.popleft()
+                self.queued -= 1
+                self.complete_process(process)
+                self.running_process = None
+                self.deactivate(group)
+            else:
+                if run_time == self.quantum:
+                    group.queue.rotate(-1)
+                self.running_process = process
+
+        return self.result()
+
+    def group(self, name):
+        """
+        Get the group of a path, creating it and its parents on first use.
+        """
+        group = self.groups.get(name)
+        if group is not None:
+            return group
+        parent_name, _, _ = name.rpartition('/')
+        parent = self.group(parent_name) if parent_name else self.root
+        if parent.leaf:
+            raise ValueError('Group {} has both processes and subgroups'.format(parent_name))
+        weight = self.weights.get(name, 1)
+        if weight <= 0:
+            raise ValueError('Weight of group {} must be positive'.format(name))
+        group = Group(name, weight, parent)
+        parent.children[name] = group
+        self.groups[name] = group
+        return group
+
+    def enqueue(self, process):
+        group = self.group(DEFAULT_GROUP if process.group is None else str(process.group))
+        if group.children:
+            raise ValueError('Group {} has both processes and subgroups'.format(group.name))
+        group.leaf = True
+        group.queue.append(process)
+        self.queued += 1
+        if len(group.queue) > 1:
+            return
+        # The group becomes active, and so do its parents which were not
+        while group.parent is not None and group not in group.parent.active:
+            parent = group.parent
+            group.virtual_time = max(group.virtual_time, parent.virtual_floor)
+            parent.active.push(group, group.virtual_time)
+            group = parent
+
+    def charge(self, group, run_time):
+        """
+        Add the time run by a process of the group to the group and all its parents.
+        """
+        parent = group.parent
+        while parent is not None:
+            group.cpu_time += run_time
+            group.virtual_time += run_time / group.weight
+            heap = parent.active
+            heap.update(group, group.virtual_time)
+            if heap.entries[0][0] > parent.virtual_floor:
+                parent.virtual_floor = heap.entries[0][0]
+            group = parent
+            parent = group.parent
+
+    def deactivate(self, group):
+        """
+        Remove a group without processes from its parent's heap, and so on up the tree.
+        """
+        while group.parent is not None and not group.queue and not group.active:
+            group.parent.active.remove(group)
+            group = group.parent
+
+    def complete_process(self, process):
+        super().complete_process(process)
+        for group in self.group(DEFAULT_GROUP if process.group is None else str(process.group)).path():
+            group.processes += 1
+            group.total_waiting_time += process.waiting_time
+            group.total_turnaround_time += process.turnaround_time
+            group.total_response_time += process.start_time - process.arrival_time
+
+    def ready_count(self):
+        return self.queued - (self.running_process is not None)
+
+    def arrival_horizon(self):
+        """
+        The virtual times of the groups are not part of the state what-if analysis restores, so
+        what-if runs of this algorithm always start over.
+        :return: None
+        """
+        return None
+
+    def result(self):
+        result = super().result()
+        result['groups'] = self.group_results()
+        return result
+
+    def group_results(self):
+        """
+        :return: dict by group path of {"weight", "processes", "cpu_time", "cpu_share" (of the busy
+                 time), "average_waiting_time", "average_turnaround_time", "average_response_time"}
+        """
+        busy_time = self.time - self.idle_time
+        results = {}
+        for name in sorted(self.groups):
+            group = self.groups[name]
+            processes = group.processes or 1
+            results[name] = {
+                'weight': group.weight,
+                'processes': group.processes,
+                'cpu_time': group.cpu_time,
+                'cpu_share': group.cpu_time / busy_time if busy_time else 0.0,
+                'average_waiting_time': group.total_waiting_time / processes,
+                'average_turnaround_time': group.total_turnaround_time / processes,
+                'average_response_time': group.total_response_time / processes,
+            }
+        return results
@@ -7,16 +7,16 @@ class FIFO(BaseAlgorithm):
     FIFO algorithm for scheduling processes
     """
 
-    def __init__(self, processes):
-        super().__init__(processes)
-        self.processes = processes
-        self.processes.sort(key=lambda x: x.arrival_time)
+    def __init__(self, processes, sorted_by=()):
+        super().__init__(processes, sorted_by)
+        self.time = 0.0
+        self.idle_time = 0.0
 
     def run(self):
         """
         Run the algorithm.
         :return: {
-            "processes": list of executed processes,
+            "processes": result records of the executed processes, see results.py,
             "time": total time of execution,
             "cpu_utilization": total CPU utilization,
             "throughput": total throughput,
@@ -25,74 +25,42 @@ class FIFO(BaseAlgorithm):
             "average_response_time": average response time
         }
         """
-        time = 0.0
-        processes = []
-        cpu_idle_time = 0.0
-        while self.processes:
-            process = self.processes.pop(0)
+        while self.arrivals:
+            if self.observers:
+                self.notify()
+            process = self.arrivals.popleft()
 
             # If we have idle time, add it to the CPU idle time
-            if process.arrival_time > time:
-                cpu_idle_time += process.arrival_time - time
-                time = process.arrival_time
+            if process.arrival_time > self.time:
+                self.idle_time += process.arrival_time - self.time
+                self.time = process.arrival_time
 
-            # Calculate the waiting time
-            process.waiting_time = time - process.arrival_time
-            # Set process start time
-            process.start_time = time
-            # Calculate the turnaround time
-            process.turnaround_time = process.response_time + process.burst_time
             # Run the process
-            process.start_time = time
-            time += process.burst_time
-            process.end_time = time
+            process.start_time = self.time
+            self.time += process.burst_time
             # Change the state of the process
             process.state = State.EXECUTED
-            processes.append(process)
+            self.complete_process(process)
 
-        # Calculate CPU utilization
-        cpu_utilization = (time - cpu_idle_time) / time
-        # Calculate throughput
-        throughput = len(processes) / time
-        return {
-            "processes": processes,
-            "total_time": time,
-            "cpu_utilization": cpu_utilization,
-            "throughput": throughput,
-            "average_waiting_time": self.average_waiting_time(processes),
-            "average_turnaround_time": self.average_turnaround_time(processes),
-            "average_response_time": self.average_response_time(processes)
-        }
-
-    def average_waiting_time(self, processes):
-        """
-        Calculate average waiting time
-        :param processes: list of executed processes
-        :return: average waiting time
-        """
-        total_waiting_time = 0
-        for process in processes:
-            total_waiting_time += process.waiting_time
-        return total_waiting_time / len(processes)
+        return self.result()
 
-    def average_turnaround_time(self, processes):
+    def arrival_horizon(self):
         """
-        Calculate average turnaround time
-        :param processes: list of executed processes
-        :return: average turnaround time
+        Processes leave the queue in arrival order, so every arrival before the next pending one
+        has been taken unless that one ties with the last executed process.
+        :return: Int or None
         """
-        total_turnaround_time = 0
-        for process in processes:
-            total_turnaround_time += process.turnaround_time
-        return total_turnaround_time / len(processes)
+        horizon = self.arrivals.next_arrival_time()
+        if horizon is None:
+            return None
+        if self.arrivals.last_arrival_time is not None and self.arrivals.last_arrival_time >= horizon:
+            return None
+        return horizon
 
-    def average_response_time(self, processes):
+    def ready_count(self):
         """
-        Calculate average response time
-        :param processes: list of executed processes
-        :return: average response time
+        FIFO takes processes straight from the arrivals, so the waiting ones are those arrived by now
+        and not taken yet.
+        :return: Int
         """
-        total_response_time = 0
-        for process in processes:
-            total_response_time += process.response_time
-        return total_response_time / len(processes)
+        return self.arrivals.arrived_count(self.time)
@@ -0,0 +1,113 @@
+class IndexedHeap:
+    """
+    Binary min-heap of distinct hashable items with keys. An index of the position of every item lets
+    the key of any item be changed, or the item be removed, in O(log n).
+    Items with equal keys leave in the order they were pushed.
+    """
+
+    def __init__(self):
+        # Entries are [key, push number, item]; push numbers are unique, so entries compare without
+        # ever comparing items
+        self.entries = []
+        self.positions = {}
+        self.pushed = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def __iter__(self):
+        """
+        Iterate over the items in the order they would leave the heap.
+        """
+        return (entry[2] for entry in sorted(self.entries))
+
+    def key(self, item):
+        return self.entries[self.positions[item]][0]
+
+    def peek(self):
+        """
+        :return: item with the smallest key
+        """
+        return self.entries[0][2]
+
+    def peek_key(self):
+        return self.entries[0][0]
+
+    def push(self, item, key):
+        if item in self.positions:
+            raise ValueError('Item is already in the heap')
+        self.entries.append([key, self.pushed, item])
+        self.pushed += 1
+        self.positions[item] = len(self.entries) - 1
+        self.sift_up(len(self.entries) - 1)
+
+    def pop(self):
+        """
+        Remove the item with the smallest key.
+        :return: the item
+        """
+        item = self.entries[0][2]
+        self.remove(item)
+        return item
+
+    def update(self, item, key):
+        """
+        Change the key of an item in the heap.
+        """
+        position = self.positions[item]
+        entry = self.entries[position]
+        old_key = entry[0]
+        entry[0] = key
+        if key < old_key:
+            self.sift_up(position)
+        else:
+            self.sift_down(position)
+
+    def remove(self, item):
+        position = self.positions.pop(item)
+        last = self.entries.pop()
+        if position == len(self.entries):
+            return
+        self.entries[position] = last
+        self.positions[last[2]] = position
+        self.sift_up(position)
+        self.sift_down(self.positions[last[2]])
+
+    def sift_up(self, position):
+        entries = self.entries
+        entry = entries[position]
+        while position:
+            parent = (position - 1) >> 1
+            parent_entry = entries[parent]
+            if parent_entry < entry:
+                break
+            entries[position] = parent_entry
+            self.positions[parent_entry[2]] = position
+            position = parent
+        entries[position] = entry
+        self.positions[entry[2]] = position
+
+    def sift_down(self, position):
+        entries = self.entries
+        size = len(entries)
+        entry = entries[position]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and entries[child + 1] < entries[child]:
+                child += 1
+            child_entry = entries[child]
+            if entry < child_entry:
+                break
+            entries[position] = child_entry
+            self.positions[child_entry[2]] = position
+            position = child
+        entries[position] = entry
+        self.positions[entry[2]] = position
@@ -0,0 +1,191 @@
+from array import array
+from operator import attrgetter
+
+import numpy as np
+
+# Keys the burst time can be predicted by, as process properties; "global" predicts every
+# process from one average
+PREDICTION_KEYS = ('pid', 'group', 'priority', 'global')
+
+UNSEEN = float('nan')
+
+
+class BurstPredictor:
+    """
+    Exponentially averaged burst time of the finished processes of every key, e.g. of every group:
+    after a process of the key ran for t, the estimate e becomes alpha * t + (1 - alpha) * e.
+    A key without a finished process yet is predicted by the average over all keys, which is
+    kept the same way, and by initial_estimate before any process finished.
+
+    Keys are numbered as they first arrive and the estimates are kept in an array of floats by
+    number, so predicting and updating cost one dict lookup each. Prediction errors are recorded
+    when a process arrives, as its prediction minus its burst time, in another array.
+    """
+
+    def __init__(self, key='pid', alpha=0.5, initial_estimate=0):
+        """
+        :param key: one of PREDICTION_KEYS
+        :param alpha: weight of the last burst time in the estimate, from 0 (exclusive) to 1
+        :param initial_estimate: burst time predicted before any process finished
+        :raise ValueError: on an unknown key or an alpha out of range
+        """
+        if key not in PREDICTION_KEYS:
+            raise ValueError('Unknown prediction key {}, choose from {}'.format(key, ', '.join(PREDICTION_KEYS)))
+        if not 0 < alpha <= 1:
+            raise ValueError('alpha must be in (0, 1], got {}'.format(alpha))
+        self.key_name = key
+        self.key = None if key == 'global' else attrgetter(key)
+        self.alpha = alpha
+        self.initial_estimate = initial_estimate
+        # Number of every key; estimate 0 is the average over all keys
+        self.slots = {}
+        self.estimates = array('d', [UNSEEN])
+        self.errors = array('d')
+        self.total_burst_time = 0
+
+    def __len__(self):
+        """
+        :return: number of keys seen so far
+        """
+        return len(self.slots)
+
+    def slot(self, process):
+        if self.key is None:
+            return 0
+        key = self.key(process)
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = len(self.estimates)
+            self.estimates.append(UNSEEN)
+        return slot
+
+    def predict(self, processes):
+        """
+        Set the predicted burst and remaining time of arriving processes, and order them by pid, so
+        processes predicted the same do not leave in the order of their real burst times.
+        :param processes: list of processes arriving at the same time, sorted in place
+        """
+        processes.sort(key=attrgetter('pid'))
+        estimates = self.estimates
+        fallback = estimates[0] if estimates[0] == estimates[0] else self.initial_estimate
+        for process in processes:
+            estimate = estimates[self.slot(process)]
+            if estimate != estimate:
+                estimate = fallback
+            process.predicted_burst_time = process.predicted_remaining_time = estimate
+            process.compare_prop = 'predicted_remaining_time'
+            self.errors.append(estimate - process.burst_time)
+            self.total_burst_time += process.burst_time
+
+    def remaining(self, process):
+        """
+        Update the predicted remaining time of a process by the time it ran, at least 0.
+        :return: the predicted remaining time
+        """
+        process.predicted_remaining_time = max(
+            process.predicted_burst_time - (process.burst_time - process.remaining_time), 0
+        )
+        return process.predicted_remaining_time
+
+    def update(self, process):
+        """
+        Average the burst time of a finished process into the estimates of its key and of all keys.
+        """
+        estimates = self.estimates
+        alpha = self.alpha
+        burst_time = process.burst_time
+        slot = self.slot(process)
+        for i in (0, slot) if slot else (0,):
+            estimate = estimates[i]
+            estimates[i] = burst_time if estimate != estimate else estimate + alpha * (burst_time - estimate)
+
+    def results(self):
+        """
+        :return: {"key", "alpha", "keys", "processes", "average_error", "average_absolute_error",
+                  "relative_absolute_error", "rmse", "p50_absolute_error", "p90_absolute_error",
+                  "p99_absolute_error", "max_absolute_error"}. Errors are predictions minus burst
+                  times, so a positive average error means overestimates; the relative absolute
+                  error is the sum of the absolute errors over the sum of the burst times.
+        """
+        errors = np.frombuffer(self.errors, dtype=np.float64) if self.errors else np.zeros(1)
+        absolute = np.abs(errors)
+        p50, p90, p99 = np.percentile(absolute, [50, 90, 99]).tolist()
+        return {
+            "key": self.key_name,
+            "alpha": self.alpha,
+            "keys": len(self.slots) if self.key is not None else 1,
+            "processes": len(self.errors),
+            "average_error": float(errors.mean()),
+            "average_absolute_error": float(absolute.mean()),
+            "relative_absolute_error": float(absolute.sum()) / self.total_burst_time if self.total_burst_time else 0.0,
+            "rmse": float(np.sqrt(np.mean(errors ** 2))),
+            "p50_absolute_error": p50,
+            "p90_absolute_error": p90,
+            "p99_absolute_error": p99,
+            "max_absolute_error": float(absolute.max()),
+        }
+
+
+class BurstPrediction:
+    """
+    Prediction mode of the SJF algorithms, mixed in before BaseAlgorithm: with `prediction` set,
+    processes are ordered by the burst time a BurstPredictor predicts for them when they arrive,
+    instead of their real burst time, which a scheduler cannot know. The predictor learns from every
+    process that finishes, and the result reports its errors under "prediction".
+    """
+    prediction = False
+    prediction_key = 'pid'
+    alpha = 0.5
+    initial_estimate = 0
+    parameters = {
+        'prediction': {'type': 'boolean',
+                       'description': 'Order by exponentially averaged burst times instead of the real ones'},
+        'prediction_key': {'type': 'string', 'enum': list(PREDICTION_KEYS),
+                           'description': 'Property the burst time is averaged by'},
+        'alpha': {'type': 'number', 'exclusiveMinimum': 0, 'maximum': 1,
+                  'description': 'Weight of the last burst time in the average'},
+        'initial_estimate': {'type': 'number', 'minimum': 0,
+                             'description': 'Burst time predicted before any process finished'},
+    }
+
+    def __init__(self, processes, sorted_by=()):
+        super().__init__(processes, sorted_by)
+        self.predictor = None
+
+    def start_prediction(self):
+        """
+        Create the predictor if prediction is on, at the start of a run, once the parameters are set.
+        """
+        if self.prediction:
+            self.predictor = BurstPredictor(self.prediction_key, self.alpha, self.initial_estimate)
+
+    def complete_process(self, process):
+        super().complete_process(process)
+        if self.predictor is not None:
+            self.predictor.update(process)
+
+    def drain(self):
+        """
+        Processes finished at once by drain skip complete_process, so the predictor learns from
+        them here.
+        """
+        processes = super().drain()
+        if self.predictor is not None:
+            for process in processes:
+                self.predictor.update(process)
+        return processes
+
+    def arrival_horizon(self):
+        """
+        The estimates are not part of the state what-if analysis restores, so what-if runs in
+        prediction mode always start over.
+        """
+        if self.prediction:
+            return None
+        return super().arrival_horizon()
+
+    def result(self):
+        result = super().result()
+        if self.predictor is not None:
+            result['prediction'] = self.predictor.results()
+        return result
@@ -0,0 +1,123 @@
+from numbers import Integral
+
+import numpy as np
+
+
+class AvailabilityProfile:
+    """
+    Free CPUs of a machine from the current time on, as a step function: the number free now and
+    the change at every later time a reservation starts or ends, in sorted arrays.
+
+    Reserving a window and moving the clock are O(log n) searches plus an O(n) move of the end of
+    the arrays, which only moves memory. Finding the earliest window for a job is O(n) too, in
+    numpy: the free CPUs after every change are summed up, and the first run of changes leaving
+    enough free which lasts long enough is picked out of all of them at once. A walk over the
+    changes in Python would try the runs one by one, and a busy machine leaves many too short.
+    """
+
+    def __init__(self, cpus, time=0):
+        """
+        :param cpus: number of CPUs of the machine
+        :param time: time the profile starts at
+        """
+        self.cpus = cpus
+        self.time = time
+        self.free = cpus
+        # Sorted times of the changes and the changes, in their first `count` items. Times are
+        # integers until a time which is not comes
+        self.times = np.zeros(64, dtype=np.int64)
+        self.changes = np.zeros(64, dtype=np.int64)
+        self.count = 0
+
+    def __len__(self):
+        """
+        :return: number of times at which the free CPUs change from now on
+        """
+        return self.count
+
+    def advance(self, time):
+        """
+        Move the current time forward, applying the changes up to it.
+        """
+        count = self.count
+        end = int(np.searchsorted(self.times[:count], time, 'right'))
+        if end:
+            self.free += int(self.changes[:end].sum())
+            self.times[:count - end] = self.times[end:count]
+            self.changes[:count - end] = self.changes[end:count]
+            self.count = count - end
+        self.time = time
+
+    def change(self, time, delta):
+        """
+        Add delta free CPUs from time on.
+        """
+        if time <= self.time:
+            self.free += delta
+            return
+        count = self.count
+        times = self.times
+        changes = self.changes
+        i = int(np.searchsorted(times[:count], time))
+        if i < count and times[i] == time:
+            changes[i] += delta
+            if not changes[i]:
+                times[i:count - 1] = times[i + 1:count]
+                changes[i:count - 1] = changes[i + 1:count]
+                self.count = count - 1
+            return
+        if not isinstance(time, Integral) and times.dtype.kind == 'i':
+            self.times = times = times.astype(np.float64)
+        if count == len(times):
+            self.times = times = np.concatenate((times, np.zeros_like(times)))
+            self.changes = changes = np.concatenate((changes, np.zeros_like(changes)))
+        times[i + 1:count + 1] = times[i:count]
+        changes[i + 1:count + 1] = changes[i:count]
+        times[i] = time
+        changes[i] = delta
+        self.count = count + 1
+
+    def reserve(self, start, duration, cpus):
+        """
+        Take cpus CPUs from start until start + duration. The window must have them free.
+        """
+        self.change(start, -cpus)
+        self.change(start + duration, cpus)
+
+    def free_at(self, time):
+        """
+        :return: number of CPUs free at a time from now on
+        """
+        count = self.count
+        return self.free + int(self.changes[:np.searchsorted(self.times[:count], time, 'right')].sum())
+
+    def earliest_start(self, cpus, duration):
+        """
+        :return: earliest time from now on at which cpus CPUs are free for duration
+        :raise ValueError: if the machine has fewer CPUs
+        """
+        if cpus > self.cpus:
+            raise ValueError('{} CPUs requested of a machine with {}'.format(cpus, self.cpus))
+        count = self.count
+        free = self.free
+        if free >= cpus and (not count or self.times[0] >= self.time + duration):
+            return self.time
+        times = self.times[:count]
+        # Whether enough CPUs are free now and after every change
+        fits = np.empty(count + 1, dtype=bool)
+        fits[0] = free >= cpus
+        levels = self.changes[:count].cumsum()
+        levels += free
+        np.greater_equal(levels, cpus, out=fits[1:])
+        # Positions after which too few are free, from 1 for the first change
+        short = (~fits).nonzero()[0]
+        if fits[0] and (not len(short) or times[short[0] - 1] >= self.time + duration):
+            return self.time
+        # Changes at which a run with enough free starts, and where each run ends. All CPUs are
+        # free after the last change, so the last run never ends
+        starts = (fits[1:] > fits[:-1]).nonzero()[0]
+        ends = short.searchsorted(starts + 1)
+        lasting = ends == len(short)
+        ending = ~lasting
+        lasting[ending] = times[short[ends[ending]] - 1] - duration >= times[starts[ending]]
+        return times[starts[lasting.argmax()]].item()
@@ -0,0 +1,46 @@
+import heapq
+from itertools import count
+
+
+class ReadyQueue:
+    """
+    Min-heap of ready processes ordered by their compare property.
+    Processes with equal keys leave in the order they entered, as with bisect.insort.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.counter = count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __bool__(self):
+        return bool(self.heap)
+
+    def __iter__(self):
+        """
+        Iterate over the processes in the order they would leave the queue.
+        """
+        return (process for _, _, process in sorted(self.heap))
+
+    def entry(self, process):
+        return getattr(process, process.compare_prop), next(self.counter), process
+
+    def append(self, process):
+        heapq.heappush(self.heap, self.entry(process))
+
+    def extend(self, processes):
+        """
+        Add a batch of processes, re-heapifying once when the batch is large compared to the queue.
+        """
+        entries = [self.entry(process) for process in processes]
+        if len(entries) > len(self.heap):
+            self.heap.extend(entries)
+            heapq.heapify(self.heap)
+        else:
+            for entry in entries:
+                heapq.heappush(self.heap, entry)
+
+    def popleft(self):
+        return heapq.heappop(self.heap)[2]
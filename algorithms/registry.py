@@ -0,0 +1,130 @@
+"""
+Registry of the scheduling algorithms by name.
+
+Built-in algorithms are listed by module and only imported when first used, so importing the
+package costs the same however many algorithms there are. Other packages can add algorithms through
+the `cpu_scheduler.algorithms` entry point group, e.g. in their pyproject.toml:
+
+    [project.entry-points."cpu_scheduler.algorithms"]
+    MyPolicy = "my_package.policies:MyPolicy"
+
+Entry points are only looked up for names which are not built in.
+"""
+import importlib
+
+ENTRY_POINT_GROUP = 'cpu_scheduler.algorithms'
+
+# Module and class of every built-in algorithm
+BUILTIN = {
+    'FIFO': ('algorithms.fifo', 'FIFO'),
+    'PreemptiveSJF': ('algorithms.sjf', 'PreemptiveSJF'),
+    'NonPreemptiveSJF': ('algorithms.np_sjf', 'NonPreemptiveSJF'),
+    'RR': ('algorithms.round_robin', 'RR'),
+    'PriorityPreemptive': ('algorithms.priority_p', 'PriorityPreemptive'),
+    'NonPreemptivePriority': ('algorithms.np_priority', 'NonPreemptivePriority'),
+    'FairShare': ('algorithms.fair_share', 'FairShare'),
+    'EDF': ('algorithms.edf', 'EDF'),
+    'LLF': ('algorithms.edf', 'LLF'),
+    'EASYBackfilling': ('algorithms.backfilling', 'EASYBackfilling'),
+    'ConservativeBackfilling': ('algorithms.backfilling', 'ConservativeBackfilling'),
+}
+
+# Other names of the built-in algorithms
+ALIASES = {
+    'FCFS': 'FIFO',
+    'PreemptivePriority': 'PriorityPreemptive',
+    'EarliestDeadlineFirst': 'EDF',
+    'LeastLaxityFirst': 'LLF',
+    'EASY': 'EASYBackfilling',
+}
+
+# Python type of every parameter type of the schemas
+TYPES = {
+    'integer': int,
+    'number': (int, float),
+    'string': str,
+    'boolean': bool,
+    'object': dict,
+}
+
+_classes = {}
+_plugins = None
+
+
+def plugins():
+    """
+    :return: dict of the entry points of the installed third-party algorithms by name
+    """
+    global _plugins
+    if _plugins is None:
+        # Reading the installed metadata is slow, so it is only imported when needed
+        from importlib.metadata import entry_points
+        _plugins = {
+            entry_point.name: entry_point
+            for entry_point in entry_points(group=ENTRY_POINT_GROUP) if entry_point.name not in BUILTIN
+        }
+    return _plugins
+
+
+def names():
+    """
+    :return: sorted list of all algorithm names, built-in, aliases and plugins
+    """
+    return sorted(set(BUILTIN) | set(ALIASES) | set(plugins()))
+
+
+def get_algorithm(name):
+    """
+    Get an algorithm class by name, importing it on first use.
+    :raise ValueError: if there is no algorithm of that name
+    """
+    name = ALIASES.get(name, name)
+    if name in _classes:
+        return _classes[name]
+    if name in BUILTIN:
+        module, attribute = BUILTIN[name]
+        AlgorithmClass = getattr(importlib.import_module(module), attribute)
+    elif name in plugins():
+        AlgorithmClass = plugins()[name].load()
+    else:
+        raise ValueError('Algorithm not found: {}. Available algorithms: {}'.format(name, ', '.join(names())))
+    _classes[name] = AlgorithmClass
+    return AlgorithmClass
+
+
+def parameter_schema(name):
+    """
+    Get the parameters an algorithm accepts, as declared in its `parameters` attribute.
+    :return: dict of parameter name to {"type", "description", "default", optional "minimum",
+             "exclusiveMinimum", "maximum" and "enum"}
+    """
+    AlgorithmClass = get_algorithm(name)
+    return {
+        parameter: dict(spec, default=getattr(AlgorithmClass, parameter))
+        for parameter, spec in getattr(AlgorithmClass, 'parameters', {}).items()
+    }
+
+
+def validate_params(name, params):
+    """
+    Check an algorithm name and the parameters given for it against its schema.
+    :raise ValueError: on an unknown algorithm or parameter, or a parameter of the wrong type, range or value
+    """
+    schema = parameter_schema(name)
+    for parameter, value in params.items():
+        if parameter not in schema:
+            raise ValueError('Unknown parameter for {}: {}'.format(name, parameter))
+        spec = schema[parameter]
+        # bool is an int in Python, but not a valid integer or number here
+        if not isinstance(value, TYPES[spec['type']]) or (isinstance(value, bool) and spec['type'] != 'boolean'):
+            raise ValueError('Parameter {} of {} must be of type {}'.format(parameter, name, spec['type']))
+        if 'minimum' in spec and value < spec['minimum']:
+            raise ValueError('Parameter {} of {} must be at least {}'.format(parameter, name, spec['minimum']))
+        if 'exclusiveMinimum' in spec and value <= spec['exclusiveMinimum']:
+            raise ValueError('Parameter {} of {} must be greater than {}'.format(
+                parameter, name, spec['exclusiveMinimum']))
+        if 'maximum' in spec and value > spec['maximum']:
+            raise ValueError('Parameter {} of {} must be at most {}'.format(parameter, name, spec['maximum']))
+        if 'enum' in spec and value not in spec['enum']:
+            raise ValueError('Parameter {} of {} must be one of {}'.format(
+                parameter, name, ', '.join(str(choice) for choice in spec['enum'])))
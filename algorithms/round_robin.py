@@ -1,25 +1,33 @@
-import bisect
 from collections import deque
 
 from algorithms.base_algorithm import BaseAlgorithm
 
 
 class RR(BaseAlgorithm):
+    """
+    Round robin: ready processes take turns in arrival order, each running for at most one quantum
+    before it goes to the back of the queue. Processes arriving while a quantum runs queue up ahead
+    of the process whose quantum ended.
+
+    Whenever the queue has gone round once, the algorithm checks how many more full rounds it would
+    run without any process finishing or arriving, and runs them in one step.
+    """
     quantum = 4
-    process_compare_prop = 'priority'
+    parameters = {
+        'quantum': {'type': 'integer', 'minimum': 1, 'description': 'Time a process runs before it is preempted'},
+    }
 
-    def __init__(self, processes):
-        super().__init__(processes)
-        self.time = 0
-        self.idle_time = 0
-        self.ready_queue = deque([])
-        self.running_process = None
+    def __init__(self, processes, sorted_by=()):
+        super().__init__(processes, sorted_by)
+        self.ready_queue = deque()
+        # Quanta left until the queue has gone round once since the last fast-forward check
+        self.quanta_to_check = 0
 
     def run(self):
         """
         Run the RR algorithm
         :return: {
-            "processes": list of executed processes,
+            "processes": result records of the executed processes, see results.py,
             "time": total time of execution,
             "cpu_utilization": total CPU utilization,
             "throughput": total throughput,
@@ -28,123 +36,85 @@ class RR(BaseAlgorithm):
             "average_response_time": average response time
         }
         """
-        executed_processes = deque([])
+        while self.arrivals or self.ready_queue or self.running_process:
+            if self.observers:
+                self.notify()
 
-        while self.processes or self.ready_queue or self.running_process:
-            if self.running_process and self.running_process.remaining_time == 0:
-                self.running_process.end_time = self.time
-                self.running_process.turnaround_time = self.running_process.end_time - self.running_process.arrival_time
-                self.running_process.waiting_time = self.running_process.turnaround_time - self.running_process.burst_time
-                executed_processes.append(self.running_process)
-                self.running_process = None
-
-                if not self.processes and not self.ready_queue:
-                    break
-
-            arrived_processes = self.get_arrived_processes()
-
-            if arrived_processes:
-                highest_priority_process = min(arrived_processes, key=lambda process: process.priority)
-
-                if self.running_process is None:
-                    self.running_process = highest_priority_process
-                    self.running_process.start_time = self.time
-
-                elif self.time % self.quantum == 0 and self.running_process.start_time != self.time:
-                    self.append_to_ready_queue(self.running_process)
-                    self.running_process = highest_priority_process
-                    self.running_process.start_time = self.time
+            self.take_arrivals()
 
-                for _ in range(len(arrived_processes)):
-                    self.processes.popleft()
-
-                if self.running_process in arrived_processes:
-                    arrived_processes.remove(self.running_process)
-                for process in arrived_processes:
-                    self.append_to_ready_queue(process)
-                arrived_processes.clear()
-
-            # If no process is running, then pick the process from ready queue
-            if self.running_process is None and self.ready_queue:
-                self.running_process = self.ready_queue.popleft()
-                self.running_process.start_time = self.running_process.start_time or self.time
+            # The process whose quantum just ended goes behind the processes that arrived meanwhile
+            if self.running_process is not None:
+                self.ready_queue.append(self.running_process)
+                self.running_process = None
 
-            # If process is running, then get next important time and update the time
-            next_time = self.get_next_important_time()
-            if self.running_process:
-                self.running_process.remaining_time -= next_time - self.time
-            else:
+            if not self.ready_queue:
+                next_time = self.arrivals.next_arrival_time()
                 self.idle_time += next_time - self.time
-            self.time = next_time
-
-        # Calculate total time, CPU utilization, throughput, average waiting time, average turnaround time,
-        # average response time
-        total_time = self.time
-        cpu_utilization = (total_time - self.idle_time) / total_time
-        throughput = len(executed_processes) / total_time
-        average_waiting_time = sum(process.waiting_time for process in executed_processes) / len(executed_processes)
-        average_turnaround_time = sum(process.turnaround_time for process in executed_processes) / len(
-            executed_processes)
-        average_response_time = sum(process.start_time - process.arrival_time for process in executed_processes) / len(
-            executed_processes)
-        return {
-            "processes": executed_processes,
-            "total_time": total_time,
-            "cpu_utilization": cpu_utilization,
-            "throughput": throughput,
-            "average_waiting_time": average_waiting_time,
-            "average_turnaround_time": average_turnaround_time,
-            "average_response_time": average_response_time
-        }
-
-    def get_arrived_processes(self):
-        """
-        Get processes which arrived at current time.
-        :return: list of arrived processes
-        """
-        arrived_processes = []
-        for process in self.processes:
-            if process.arrival_time == self.time:
-                arrived_processes.append(process)
+                self.time = next_time
+                continue
+
+            self.quanta_to_check -= 1
+            if self.quanta_to_check <= 0:
+                self.quanta_to_check = len(self.ready_queue)
+                if self.fast_forward():
+                    continue
+
+            process = self.ready_queue.popleft()
+            if process.start_time is None:
+                process.start_time = self.time
+            run_time = min(self.quantum, process.remaining_time)
+            process.remaining_time -= run_time
+            self.time += run_time
+            if process.remaining_time == 0:
+                self.complete_process(process)
             else:
-                break
-        return arrived_processes
+                self.running_process = process
+
+        return self.result()
 
-    def append_to_ready_queue(self, process):
+    def take_arrivals(self):
         """
-        Append process to ready queue based on priority.
-        :param process: process to be appended
+        Append every process which has arrived by now to the ready queue, in arrival order.
         """
-        bisect.insort(self.ready_queue, process)
+        next_arrival_time = self.arrivals.next_arrival_time()
+        while next_arrival_time is not None and next_arrival_time <= self.time:
+            self.ready_queue.extend(self.arrivals.take(next_arrival_time))
+            next_arrival_time = self.arrivals.next_arrival_time()
 
-    def get_next_important_time(self):
+    def fast_forward(self):
         """
-        Find next point of time that need a decision
-        :return: Int
+        Run as many full rounds of the ready queue as possible at once. A round gives every process
+        one quantum and leaves the queue in the same order, as long as no process finishes within it
+        and none arrives before it ends. The last process of the queue is left running, as after a quantum.
+        :return: True if at least one round was run
         """
-        if self.running_process is not None:
-            if not self.processes:
-                return min(self.time + self.quantum, self.time + self.running_process.remaining_time)
-
-            return min(
-                self.time + (self.running_process.remaining_time or 1),
-                self.processes[0].arrival_time,
-                self.time + self.quantum
-            )
-
-        if self.ready_queue:
-            return self.time + 1
-
-        if self.processes:
-            return self.processes[0].arrival_time
-
-        return self.time + 1
-
-    def remove_processes(self, processes):
+        round_time = len(self.ready_queue) * self.quantum
+        rounds = (min(process.remaining_time for process in self.ready_queue) - 1) // self.quantum
+        next_arrival_time = self.arrivals.next_arrival_time()
+        if next_arrival_time is not None:
+            rounds = min(rounds, (next_arrival_time - self.time) // round_time)
+        if rounds < 1:
+            return False
+        for i, process in enumerate(self.ready_queue):
+            if process.start_time is None:
+                process.start_time = self.time + i * self.quantum
+            process.remaining_time -= rounds * self.quantum
+        self.time += rounds * round_time
+        # The last process of the round has just had its quantum, so processes arriving now go ahead of it
+        self.running_process = self.ready_queue.pop()
+        return True
+
+    def arrival_horizon(self):
         """
-        Remove processes from processes list
-        :param processes: list of processes
-        :return: None
+        Arrivals are taken at the top of a step, after the observers, so every arrival before the
+        next pending one or the current time has been taken, unless one ties with the last taken.
+        A fast-forward relies on no process arriving before its end, which is the current time.
+        :return: Int or None
         """
-        for process in processes:
-            self.processes.remove(process)
+        horizon = self.arrivals.next_arrival_time()
+        if horizon is None or horizon > self.time:
+            horizon = self.time
+        last_arrival_time = self.arrivals.last_arrival_time
+        if last_arrival_time is not None and last_arrival_time >= horizon:
+            return None
+        return horizon
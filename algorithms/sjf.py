@@ -1,69 +1,55 @@
-import bisect
-from collections import deque
-
 from algorithms.base_algorithm import BaseAlgorithm
+from algorithms.prediction import BurstPrediction
 
 
-class PreemptiveSJF(BaseAlgorithm):
+class PreemptiveSJF(BurstPrediction, BaseAlgorithm):
     process_compare_prop = 'remaining_time'
-
-    def __init__(self, processes):
-        processes = sorted(processes, key=lambda x: (x.arrival_time, x.burst_time))
-        super().__init__(processes)
-        self.ready_queue = deque([])
-        self.running_process = None
-        self.time = 0
-        self.idle_time = 0
+    arrival_order = ('arrival_time', 'burst_time')
 
     def run(self):
         """
         Run the algorithm.
         :return: {
-            "processes": list of executed processes,
+            "processes": result records of the executed processes, see results.py,
             "time": total time of execution,
             "cpu_utilization": total CPU utilization,
             "throughput": total throughput,
             "average_waiting_time": average waiting time,
             "average_turnaround_time": average turnaround time,
             "average_response_time": average response time
-        }
+        }, plus "prediction": errors of the predicted burst times in prediction mode, see BurstPredictor.results
         """
-        executed_processes = []
-
-        while self.processes or self.ready_queue or self.running_process:
+        self.start_prediction()
+        while self.arrivals or self.ready_queue or self.running_process:
+            if self.observers:
+                self.notify()
 
             if self.running_process and self.running_process.remaining_time == 0:
-                self.running_process.end_time = self.time
-                self.running_process.turnaround_time = self.running_process.end_time - self.running_process.arrival_time
-                self.running_process.waiting_time = self.running_process.turnaround_time - self.running_process.burst_time
-                executed_processes.append(self.running_process)
+                self.complete_process(self.running_process)
                 self.running_process = None
 
-                if not self.processes and not self.ready_queue:
+                if not self.arrivals and not self.ready_queue:
                     break
 
-            arrived_processes = self.get_arrived_processes()
+            arrived_processes = self.arrivals.take(self.time)
 
             if arrived_processes:
-                min_process = min(arrived_processes, key=lambda x: x.burst_time)
+                if self.predictor is None:
+                    min_process = min(arrived_processes, key=lambda x: x.burst_time)
+                else:
+                    self.predictor.predict(arrived_processes)
+                    min_process = min(arrived_processes, key=lambda x: x.predicted_burst_time)
 
                 if self.running_process is None:
                     self.running_process = min_process
                     self.running_process.start_time = self.time
 
-                elif self.running_process.remaining_time > min_process.remaining_time:
+                elif self.preempts(min_process):
                     self.append_to_ready_queue(self.running_process)
                     self.running_process = min_process
                     self.running_process.start_time = self.time
 
-                for _ in range(len(arrived_processes)):
-                    self.processes.popleft()
-
-                if self.running_process in arrived_processes:
-                    arrived_processes.remove(self.running_process)
-                for process in arrived_processes:
-                    self.append_to_ready_queue(process)
-                arrived_processes.clear()
+                self.admit(arrived_processes)
 
             # If no process is running, then pick the process from ready queue
             if self.running_process is None and self.ready_queue:
@@ -78,45 +64,16 @@ class PreemptiveSJF(BaseAlgorithm):
                 self.idle_time += next_time - self.time
             self.time = next_time
 
-        # Calculate total time, CPU utilization, throughput, average waiting time, average turnaround time,
-        # average response time
-        total_time = self.time
-        cpu_utilization = (total_time - self.idle_time) / total_time
-        throughput = len(executed_processes) / total_time
-        average_waiting_time = sum(process.waiting_time for process in executed_processes) / len(executed_processes)
-        average_turnaround_time = sum(process.turnaround_time for process in executed_processes) / len(
-            executed_processes)
-        average_response_time = sum(process.start_time - process.arrival_time for process in executed_processes) / len(
-            executed_processes)
-        return {
-            "processes": executed_processes,
-            "total_time": total_time,
-            "cpu_utilization": cpu_utilization,
-            "throughput": throughput,
-            "average_waiting_time": average_waiting_time,
-            "average_turnaround_time": average_turnaround_time,
-            "average_response_time": average_response_time
-        }
-
-    def get_arrived_processes(self):
-        """
-        Get processes which arrived at current time.
-        :return: list of arrived processes
-        """
-        arrived_processes = []
-        for process in self.processes:
-            if process.arrival_time == self.time:
-                arrived_processes.append(process)
-            else:
-                break
-        return arrived_processes
+        return self.result()
 
-    def append_to_ready_queue(self, process):
+    def preempts(self, process):
         """
-        Append process to ready queue based on priority.
-        :param process: process to be appended
+        Check whether an arriving process is shorter than the running one, by the predicted remaining
+        times in prediction mode.
         """
-        bisect.insort(self.ready_queue, process)
+        if self.predictor is None:
+            return self.running_process.remaining_time > process.remaining_time
+        return self.predictor.remaining(self.running_process) > process.predicted_remaining_time
 
     def get_next_important_time(self):
         """
@@ -124,27 +81,18 @@ class PreemptiveSJF(BaseAlgorithm):
         :return: Int
         """
         if self.running_process is not None:
-            if not self.processes:
+            if not self.arrivals:
                 return max(self.time + self.running_process.remaining_time, self.time)
 
             return min(
-                self.time + (self.running_process.remaining_time or 1),
-                self.processes[0].arrival_time
+                self.time + self.running_process.remaining_time,
+                self.arrivals.next_arrival_time()
             )
 
         if self.ready_queue:
             return self.time + 1
 
-        if self.processes:
-            return self.processes[0].arrival_time
+        if self.arrivals:
+            return self.arrivals.next_arrival_time()
 
         return self.time + 1
-
-    def remove_processes(self, processes):
-        """
-        Remove processes from processes list
-        :param processes: list of processes
-        :return: None
-        """
-        for process in processes:
-            self.processes.remove(process)
@@ -0,0 +1,154 @@
+"""
+Run a manifest of simulations (dataset x algorithm x params) on a worker pool and write all
+results to one file.
+"""
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import time
+
+import algorithms
+from dataset import Dataset
+
+parser = argparse.ArgumentParser(description='Run a batch of simulations described by a manifest.')
+parser.add_argument('-m', '--manifest', type=str, help='manifest.json or manifest.yaml file')
+parser.add_argument('-o', '--output', type=str, default='results.csv', help='Output file (.csv or .jsonl)')
+parser.add_argument('-w', '--workers', type=int, default=None, help='Number of worker processes')
+
+FIELDS = [
+    'dataset', 'algorithm', 'params', 'processes', 'run_time', 'total_time', 'cpu_utilization',
+    'throughput', 'average_waiting_time', 'average_turnaround_time', 'average_response_time',
+    'average_bounded_slowdown', 'average_absolute_prediction_error'
+]
+
+# Datasets of the current batch, inherited by the worker processes
+_datasets = {}
+
+
+def load_manifest(path):
+    """
+    Read a manifest and expand it into a list of runs.
+    The manifest is a list of entries with "dataset", "algorithm" and optional "params" keys. Each of
+    them may also be a list, in which case every combination is run.
+    :return: list of (dataset, algorithm, params) tuples
+    """
+    with open(path, 'r') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError('PyYAML is required for YAML manifests, run "pip3 install pyyaml"')
+            entries = yaml.safe_load(f)
+        else:
+            entries = json.load(f)
+
+    runs = []
+    for entry in entries:
+        datasets = as_list(entry['dataset'])
+        algorithm_names = as_list(entry['algorithm'])
+        params = as_list(entry.get('params', {}))
+        runs.extend(itertools.product(datasets, algorithm_names, params))
+    return runs
+
+
+def as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def algorithm_name(name):
+    """
+    Command line argument type of algorithm names, failing before anything is loaded on an unknown one.
+    """
+    try:
+        algorithms.get_algorithm(name)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return name
+
+
+def create_algorithm(dataset, algorithm, params):
+    """
+    Create an algorithm instance with fresh processes and the given parameters set on it.
+    """
+    algorithms.validate_params(algorithm, params)
+    AlgorithmClass = algorithms.get_algorithm(algorithm)
+    instance = AlgorithmClass(dataset.processes(AlgorithmClass.process_compare_prop), dataset.sorted_by)
+    for name, value in params.items():
+        setattr(instance, name, value)
+    return instance
+
+
+def run_one(run):
+    """
+    Run one simulation of the batch in a worker process.
+    """
+    path, algorithm, params = run
+    instance = create_algorithm(_datasets[path], algorithm, params)
+    start_time = time.time()
+    result = instance.run()
+    run_time = time.time() - start_time
+
+    row = {key: result[key] for key in FIELDS if key in result}
+    if 'prediction' in result:
+        row['average_absolute_prediction_error'] = result['prediction']['average_absolute_error']
+    row.update(
+        dataset=path,
+        algorithm=algorithm,
+        params=json.dumps(params, sort_keys=True),
+        processes=len(result['processes']),
+        run_time=run_time
+    )
+    return row
+
+
+def _init_worker(datasets):
+    _datasets.update(datasets)
+
+
+class Batch:
+    """
+    Parse every dataset of a manifest once, then run all simulations on a worker pool.
+    """
+
+    def __init__(self, runs, workers=None):
+        self.runs = runs
+        self.workers = workers
+        self.datasets = {}
+        self.results = []
+
+    def load(self):
+        for path, _, _ in self.runs:
+            if path not in self.datasets:
+                self.datasets[path] = Dataset.load(path)
+
+    def run(self):
+        # Check every run before parsing any dataset, so a typo fails at once
+        for _, algorithm, params in self.runs:
+            algorithms.validate_params(algorithm, params)
+        self.load()
+        with multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=(self.datasets,)) as pool:
+            self.results = pool.map(run_one, self.runs, chunksize=1)
+        return self.results
+
+    def save(self, output):
+        """
+        Write the results as CSV, or as JSON lines if output ends with .jsonl.
+        """
+        with open(output, 'w', newline='') as f:
+            if output.endswith('.jsonl'):
+                for row in self.results:
+                    f.write(json.dumps(row) + '\n')
+            else:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(self.results)
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    batch = Batch(load_manifest(args.manifest), args.workers)
+    batch.run()
+    batch.save(args.output)
+    print('Ran %d simulations, results saved to %s' % (len(batch.results), args.output))
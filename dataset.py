@@ -0,0 +1,121 @@
+"""
+Parsed workload datasets shared between simulation runs.
+"""
+import json
+
+import numpy as np
+
+from process import Process
+from tracefile import TRACE_DTYPE, is_manifest, is_trace, open_records, optional_columns
+
+
+class Dataset:
+    """
+    Immutable columns of a workload, sorted by arrival time.
+    Algorithms change the processes they are given, so every run gets fresh processes built from
+    the columns instead of re-reading and re-sorting the file.
+    """
+
+    def __init__(self, pids, arrival_times, burst_times, priorities, sorted_by=('arrival_time',), groups=None,
+                 deadlines=None, periods=None, cpus=None):
+        self.pids = tuple(pids)
+        self.arrival_times = tuple(arrival_times)
+        self.burst_times = tuple(burst_times)
+        self.priorities = tuple(priorities)
+        # Group of every process, None if the workload has no groups
+        self.groups = tuple(groups) if groups is not None else None
+        # Relative deadline and period of every process, None if the workload has none
+        self.deadlines = tuple(deadlines) if deadlines is not None else None
+        self.periods = tuple(periods) if periods is not None else None
+        # CPUs every process runs on, None if the workload only has single-CPU processes
+        self.cpus = tuple(cpus) if cpus is not None else None
+        # Properties the columns are sorted by, always starting with arrival_time
+        self.sorted_by = tuple(sorted_by)
+
+    def __len__(self):
+        return len(self.pids)
+
+    @classmethod
+    def from_jobs(cls, jobs, sorted_by=()):
+        """
+        Build a dataset from a list of job dicts as found in process.json.
+        :param sorted_by: properties the jobs are already sorted by
+        """
+        if tuple(sorted_by[:1]) != ('arrival_time',):
+            jobs = sorted(jobs, key=lambda x: x['arrival_time'])
+            sorted_by = ('arrival_time',)
+        columns = {
+            name: [job.get(key) for job in jobs] if any(key in job for job in jobs) else None
+            for name, key in (('groups', 'group'), ('deadlines', 'deadline'), ('periods', 'period'), ('cpus', 'cpus'))
+        }
+        return cls(
+            pids=[job['pid'] for job in jobs],
+            arrival_times=[job['arrival_time'] for job in jobs],
+            burst_times=[job['burst_time'] for job in jobs],
+            priorities=[job['priority'] for job in jobs],
+            sorted_by=sorted_by,
+            **columns
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a process.json, trace or manifest file.
+        A process.json file is either a list of jobs, or an object with the list in "processes" and
+        the properties it is sorted by in "sorted_by".
+        """
+        if is_trace(path) or is_manifest(path):
+            return cls.from_trace(path)
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            return cls.from_jobs(data['processes'], data.get('sorted_by', ()))
+        return cls.from_jobs(data)
+
+    @classmethod
+    def from_trace(cls, path):
+        """
+        Read a trace file, or all shards of a manifest, into memory.
+        """
+        header, parts = open_records(path)
+        records = np.concatenate(parts) if parts else np.zeros(0, dtype=TRACE_DTYPE)
+        sorted_by = tuple(header.get('sorted_by', ()))
+        if sorted_by[:1] != ('arrival_time',):
+            records = records[records['arrival_time'].argsort(kind='stable')]
+            sorted_by = ('arrival_time',)
+        return cls(
+            pids=records['pid'].tolist(),
+            arrival_times=records['arrival_time'].tolist(),
+            burst_times=records['burst_time'].tolist(),
+            priorities=records['priority'].tolist(),
+            sorted_by=sorted_by,
+            **optional_columns(records)
+        )
+
+    def processes(self, compare_prop='priority'):
+        """
+        Create new processes for one run of an algorithm.
+        :param compare_prop: property the algorithm compares processes by
+        :return: list of processes sorted by arrival time
+        """
+        missing = [None] * len(self)
+        groups = self.groups if self.groups is not None else missing
+        deadlines = self.deadlines if self.deadlines is not None else missing
+        periods = self.periods if self.periods is not None else missing
+        cpus = [1 if value is None else value for value in self.cpus] if self.cpus is not None else [1] * len(self)
+        return [
+            Process(
+                pid=pid,
+                arrival_time=arrival_time,
+                burst_time=burst_time,
+                priority=priority,
+                compare_prop=compare_prop,
+                group=group,
+                deadline=deadline,
+                period=period,
+                cpus=process_cpus
+            )
+            for pid, arrival_time, burst_time, priority, group, deadline, period, process_cpus in zip(
+                self.pids, self.arrival_times, self.burst_times, self.priorities, groups, deadlines, periods, cpus
+            )
+        ]
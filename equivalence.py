@@ -0,0 +1,293 @@
+"""
+Differential testing of the algorithms against their reference implementations.
+
+Seeded random and adversarial workloads are scheduled by the algorithm and by its reference in
+reference.py, and the start and end time of every job must be the same. A mismatch is shrunk to a
+small workload which still shows it, by dropping jobs and making their values smaller, and can be
+saved as a processes.json file to replay with simulate.py. Both paths are also timed on a larger
+workload to report the speedup of the algorithm.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import algorithms
+from dataset import Dataset
+from process_generator import ProcessGenerator
+from reference import REFERENCES
+
+parser = argparse.ArgumentParser(description='Check the algorithms against their reference implementations')
+parser.add_argument('--algorithms', '-a', nargs='+', default=list(REFERENCES), choices=list(REFERENCES),
+                    help='Algorithms to check, all that have a reference by default')
+parser.add_argument('--workloads', '-k', nargs='+', default=None,
+                    help='Kinds of workloads to generate, all by default: {}'.format(', '.join([
+                        'random', 'ties', 'zero_bursts', 'simultaneous', 'bursty'])))
+parser.add_argument('--runs', '-n', type=int, default=200, help='Number of workloads of every kind')
+parser.add_argument('--size', '-s', type=int, default=20, help='Largest number of jobs of a workload')
+parser.add_argument('--seed', type=int, default=0, help='Seed of the first workload, the next ones count up')
+parser.add_argument('--quantum', '-q', type=int, default=4, help='Quantum of RR')
+parser.add_argument('--bench-size', type=int, default=2000,
+                    help='Number of jobs of the workload both paths are timed on, 0 to skip timing')
+parser.add_argument('--save', type=str, default=None,
+                    help='Directory to save the shrunk workload of every mismatch to, as processes.json files')
+
+
+class StepLimitExceeded(Exception):
+    """
+    Raised when an algorithm takes far more steps than its workload can need, i.e. it is stuck.
+    """
+
+
+class StepLimit:
+    """
+    Observer stopping a run after a number of scheduling steps.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.steps = 0
+
+    def __call__(self, algorithm):
+        self.steps += 1
+        if self.steps > self.limit:
+            raise StepLimitExceeded('no end after {} steps at time {}'.format(self.limit, algorithm.time))
+
+
+def jobs_from(rng, size, arrival_times, burst_times, priorities):
+    """
+    :return: list of job dicts with values drawn from the given ranges
+    """
+    return [
+        {
+            'pid': pid,
+            'arrival_time': rng.randint(*arrival_times),
+            'burst_time': rng.randint(*burst_times),
+            'priority': rng.randint(*priorities),
+        }
+        for pid in range(size)
+    ]
+
+
+def random_workload(rng, size):
+    """
+    Jobs like process_generator.py makes, spread over a shorter time.
+    """
+    return jobs_from(rng, size, (0, 5 * size), (1, 20), (0, 10))
+
+
+def ties(rng, size):
+    """
+    Few distinct values, so most choices are between equal keys.
+    """
+    return jobs_from(rng, size, (0, size), (1, 3), (0, 1))
+
+
+def zero_bursts(rng, size):
+    """
+    About half of the jobs take no time.
+    """
+    jobs = jobs_from(rng, size, (0, 2 * size), (1, 8), (0, 3))
+    for job in jobs:
+        if rng.random() < 0.5:
+            job['burst_time'] = 0
+    return jobs
+
+
+def simultaneous(rng, size):
+    """
+    Every job arrives at one of a few times.
+    """
+    times = [rng.randint(0, 3 * size) for _ in range(rng.randint(1, 3))]
+    jobs = jobs_from(rng, size, (0, 0), (0, 10), (0, 5))
+    for job in jobs:
+        job['arrival_time'] = rng.choice(times)
+    return jobs
+
+
+def bursty(rng, size):
+    """
+    Long jobs which queues build up behind, and arrivals just before, at and after quantum and
+    burst boundaries.
+    """
+    jobs = jobs_from(rng, size, (0, 4 * size), (1, 4), (0, 10))
+    for job in jobs:
+        if rng.random() < 0.2:
+            job['burst_time'] = rng.randint(20, 60)
+        if rng.random() < 0.3:
+            job['arrival_time'] = rng.choice([4, 8, 12]) * rng.randint(0, size) + rng.randint(-1, 1) + 1
+    return jobs
+
+
+# Workload generators by kind, each taking a random.Random and a number of jobs
+WORKLOADS = {
+    'random': random_workload,
+    'ties': ties,
+    'zero_bursts': zero_bursts,
+    'simultaneous': simultaneous,
+    'bursty': bursty,
+}
+
+
+def reference_schedule(name, jobs, quantum=4):
+    """
+    :return: dict of (start time, end time) by pid, scheduled by the reference of the algorithm
+    """
+    if name == 'RR':
+        return REFERENCES[name](jobs, quantum)
+    return REFERENCES[name](jobs)
+
+
+def algorithm_schedule(name, jobs, quantum=4):
+    """
+    :return: dict of (start time, end time) by pid, scheduled by the algorithm
+    :raise StepLimitExceeded: if the algorithm does not finish in time
+    """
+    dataset = Dataset.from_jobs(jobs)
+    AlgorithmClass = algorithms.get_algorithm(name)
+    algorithm = AlgorithmClass(dataset.processes(AlgorithmClass.process_compare_prop), dataset.sorted_by)
+    if name == 'RR':
+        algorithm.quantum = quantum
+    # Every step finishes a job, takes an arrival or moves the clock on
+    algorithm.observers.append(StepLimit(2 * (len(jobs) + sum(job['burst_time'] for job in jobs)) + 10))
+    records = algorithm.run()['processes']
+    return dict(zip(records['pid'].tolist(), zip(records['start_time'].tolist(), records['end_time'].tolist())))
+
+
+def compare(name, jobs, quantum=4):
+    """
+    Schedule the jobs with the algorithm and its reference.
+    :return: None if both schedules are the same, otherwise a description of the first difference
+    """
+    expected = reference_schedule(name, jobs, quantum)
+    try:
+        actual = algorithm_schedule(name, jobs, quantum)
+    except StepLimitExceeded as e:
+        return 'algorithm stuck: {}'.format(e)
+    except Exception as e:
+        return 'algorithm failed: {!r}'.format(e)
+    for job in jobs:
+        pid = job['pid']
+        if pid not in actual:
+            return 'pid {}: expected {}, not executed'.format(pid, expected[pid])
+        if actual[pid] != expected[pid]:
+            return 'pid {}: expected (start, end) {}, got {}'.format(pid, expected[pid], actual[pid])
+    return None
+
+
+def shrink(name, jobs, quantum=4):
+    """
+    Shrink a workload the algorithm and its reference disagree on, keeping the disagreement.
+    Chunks of jobs, then single jobs, are dropped as long as the schedules still differ, then every
+    value is made as small as possible.
+    :return: the smallest workload found
+    """
+    def fails(candidate):
+        return bool(candidate) and compare(name, candidate, quantum) is not None
+
+    chunks = 2
+    while len(jobs) > 1:
+        size = -(-len(jobs) // chunks)
+        for start in range(0, len(jobs), size):
+            candidate = jobs[:start] + jobs[start + size:]
+            if fails(candidate):
+                jobs = candidate
+                chunks = max(chunks - 1, 2)
+                break
+        else:
+            if size == 1:
+                break
+            chunks = min(2 * chunks, len(jobs))
+
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(jobs)):
+            for key in ('arrival_time', 'burst_time', 'priority'):
+                value = jobs[i][key]
+                for smaller in sorted({0, value // 2, value - 1}):
+                    if not 0 <= smaller < value:
+                        continue
+                    candidate = jobs[:i] + [dict(jobs[i], **{key: smaller})] + jobs[i + 1:]
+                    if fails(candidate):
+                        jobs = candidate
+                        changed = True
+                        break
+    return jobs
+
+
+def check(names, kinds, runs, size, seed=0, quantum=4):
+    """
+    Compare every algorithm with its reference on runs workloads of every kind, with 1 to size jobs.
+    :return: list of mismatches: {"algorithm", "workload", "seed", "difference", "jobs" (shrunk)}
+    """
+    mismatches = []
+    for name in names:
+        for kind in kinds:
+            for i in range(runs):
+                rng = random.Random(seed + i)
+                jobs = WORKLOADS[kind](rng, rng.randint(1, size))
+                difference = compare(name, jobs, quantum)
+                if difference is None:
+                    continue
+                jobs = shrink(name, jobs, quantum)
+                mismatches.append({
+                    'algorithm': name,
+                    'workload': kind,
+                    'seed': seed + i,
+                    'difference': compare(name, jobs, quantum),
+                    'jobs': jobs,
+                })
+                # The shrunk workload says it all, more of the same kind add nothing
+                break
+    return mismatches
+
+
+def bench(name, jobs, quantum=4):
+    """
+    Time the reference and the algorithm on the same workload, from the list of jobs to the schedule.
+    :return: (reference seconds, algorithm seconds)
+    """
+    start = time.perf_counter()
+    reference_schedule(name, jobs, quantum)
+    reference_time = time.perf_counter() - start
+    start = time.perf_counter()
+    algorithm_schedule(name, jobs, quantum)
+    return reference_time, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    kinds = args.workloads or list(WORKLOADS)
+    for kind in kinds:
+        if kind not in WORKLOADS:
+            parser.error('unknown workload {}, choose from {}'.format(kind, ', '.join(WORKLOADS)))
+
+    mismatches = check(args.algorithms, kinds, args.runs, args.size, args.seed, args.quantum)
+    for name in args.algorithms:
+        failed = [mismatch for mismatch in mismatches if mismatch['algorithm'] == name]
+        print('{}: {} workloads, mismatches on: {}'.format(
+            name, args.runs * len(kinds), ', '.join(mismatch['workload'] for mismatch in failed) or 'none'))
+    for mismatch in mismatches:
+        print('\n{algorithm} on {workload} workload, seed {seed}: {difference}'.format(**mismatch))
+        print('Shrunk to {} jobs: {}'.format(len(mismatch['jobs']), json.dumps(mismatch['jobs'])))
+        if args.save:
+            os.makedirs(args.save, exist_ok=True)
+            path = os.path.join(args.save, '{algorithm}-{workload}-{seed}.json'.format(**mismatch))
+            with open(path, 'w') as f:
+                json.dump(mismatch['jobs'], f, indent=2)
+            print('Saved to', path)
+
+    if args.bench_size:
+        generator = ProcessGenerator(args.bench_size, args.seed)
+        generator.generate()
+        jobs = generator.processes
+        print('\nTiming on {} jobs of process_generator.py:'.format(args.bench_size))
+        for name in args.algorithms:
+            reference_time, algorithm_time = bench(name, jobs, args.quantum)
+            print('{}: reference {:.3f} s, algorithm {:.3f} s, speedup {:.1f}x'.format(
+                name, reference_time, algorithm_time, reference_time / algorithm_time))
+
+    sys.exit(1 if mismatches else 0)
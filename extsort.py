@@ -0,0 +1,174 @@
+"""
+Sort a trace file of any size within a fixed memory budget (external merge sort).
+
+The input is cut into runs that fit into memory, every run is sorted and written to a temporary
+trace file, then the runs are merged block by block. If there are more runs than blocks fitting
+into memory, groups of runs are merged into longer runs first. The sort is stable, so records with
+equal keys keep the order they had in the input.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from tracefile import TraceWriter, open_trace
+
+parser = argparse.ArgumentParser(description='Sort a trace file within a fixed memory budget.')
+parser.add_argument('-i', '--input', type=str, help='Trace file')
+parser.add_argument('-o', '--output', type=str, help='Sorted trace file')
+parser.add_argument('-k', '--keys', type=str, nargs='+', default=['arrival_time'], help='Fields to sort by')
+parser.add_argument('-m', '--memory', type=int, default=256, help='Memory budget in MB')
+
+# Smallest number of records read from a run at once while merging
+MIN_BLOCK_SIZE = 1024
+
+
+def sort_records(records, keys):
+    """
+    Stable sort of an in-memory structured array by the given fields.
+    """
+    return records[np.lexsort([records[key] for key in reversed(keys)])]
+
+
+class Run:
+    """
+    Sorted run of a merge, read in blocks. Records are compared by their keys, then by the run
+    index and their position in the run, so every record has a unique key and ties keep the
+    input order.
+    """
+
+    def __init__(self, path, index, keys):
+        self.records = open_trace(path)[1]
+        self.index = index
+        self.keys = keys
+        self.block = self.records[:0]
+        self.block_start = 0
+
+    def exhausted(self):
+        """
+        :return: True if every record is in the current block or already merged
+        """
+        return self.block_start + len(self.block) >= len(self.records)
+
+    def fill(self, block_size):
+        """
+        Read the next block once the current one is used up.
+        """
+        if not len(self.block) and not self.exhausted():
+            self.block_start += len(self.block)
+            self.block = np.array(self.records[self.block_start:self.block_start + block_size])
+
+    def key(self, i):
+        """
+        Unique key of record i of the current block.
+        """
+        record = self.block[i]
+        return tuple(record[key] for key in self.keys) + (self.index, self.block_start + i)
+
+    def take(self, bound):
+        """
+        Take the records of the current block whose key is at most bound.
+        :param bound: unique key, or None to take the whole block
+        """
+        end = len(self.block)
+        if bound is not None:
+            low = 0
+            while low < end:
+                middle = (low + end) // 2
+                if self.key(middle) <= bound:
+                    low = middle + 1
+                else:
+                    end = middle
+        taken = self.block[:end]
+        self.block = self.block[end:]
+        self.block_start += end
+        return taken
+
+
+def merge(paths, output, keys, memory, header):
+    """
+    Merge sorted run files into one sorted trace file.
+    Every round reads up to one block of each run and emits the records which are not greater than
+    the smallest last key among the runs which still have records on disk: nothing read later can
+    sort before them.
+    """
+    runs = [Run(path, index, keys) for index, path in enumerate(paths)]
+    dtype = runs[0].records.dtype
+    # A block per run, plus the same again for the records emitted in a round
+    block_size = max(MIN_BLOCK_SIZE, memory // (2 * dtype.itemsize * (len(runs) + 1)))
+
+    with TraceWriter(output, dtype, **header) as writer:
+        while True:
+            for run in runs:
+                run.fill(block_size)
+            runs = [run for run in runs if len(run.block)]
+            if not runs:
+                break
+            limits = [run.key(len(run.block) - 1) for run in runs if not run.exhausted()]
+            bound = min(limits) if limits else None
+            # Runs are taken in index order and each piece is sorted, so a stable sort keeps ties in input order
+            pieces = [run.take(bound) for run in runs]
+            writer.write(sort_records(np.concatenate(pieces), keys))
+
+
+def external_sort(input_path, output_path, keys=('arrival_time',), memory=256 * 1024 * 1024):
+    """
+    Sort the records of a trace file by the given fields, using about `memory` bytes.
+    The output header has "sorted_by" set to the keys.
+    :return: number of runs the input was cut into
+    """
+    header, records = open_trace(input_path)
+    keys = list(keys)
+    for key in keys:
+        if key not in records.dtype.names:
+            raise ValueError('Unknown field: {}'.format(key))
+    header = {name: value for name, value in header.items() if name not in ('magic', 'count', 'fields')}
+    header['sorted_by'] = keys
+
+    # A run is copied once for sorting, so it may take up half of the budget
+    run_size = max(MIN_BLOCK_SIZE, memory // (2 * records.dtype.itemsize))
+    fan_in = max(2, memory // (2 * records.dtype.itemsize * MIN_BLOCK_SIZE) - 1)
+
+    if len(records) <= run_size:
+        with TraceWriter(output_path, records.dtype, **header) as writer:
+            writer.write(sort_records(np.array(records), keys))
+        return 1
+
+    directory = os.path.dirname(os.path.abspath(output_path))
+    with tempfile.TemporaryDirectory(prefix='extsort-', dir=directory) as temp:
+        paths = []
+        for start in range(0, len(records), run_size):
+            path = os.path.join(temp, 'run-0-%d.trace' % len(paths))
+            with TraceWriter(path, records.dtype, sorted_by=keys) as writer:
+                writer.write(sort_records(np.array(records[start:start + run_size]), keys))
+            paths.append(path)
+        run_count = len(paths)
+
+        # Merge neighbouring runs, so earlier runs stay in front on ties
+        merge_pass = 1
+        while len(paths) > fan_in:
+            merged = []
+            for start in range(0, len(paths), fan_in):
+                group = paths[start:start + fan_in]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                path = os.path.join(temp, 'run-%d-%d.trace' % (merge_pass, len(merged)))
+                merge(group, path, keys, memory, dict(sorted_by=keys))
+                for old in group:
+                    os.remove(old)
+                merged.append(path)
+            paths = merged
+            merge_pass += 1
+
+        merge(paths, output_path, keys, memory, header)
+    return run_count
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    start_time = time.time()
+    runs = external_sort(args.input, args.output, args.keys, args.memory * 1024 * 1024)
+    print('Sorted %d runs in %.3f s, results saved to %s' % (runs, time.time() - start_time, args.output))
@@ -0,0 +1,257 @@
+"""
+Import cluster workload traces into trace files.
+
+Standard Workload Format (SWF) logs and CSV job logs are parsed in chunks and written straight to
+a trace file, so logs larger than memory can be replayed with outofcore.py. Files ending with .gz
+are decompressed on the fly.
+"""
+import argparse
+import csv
+import gzip
+import os
+
+import numpy as np
+
+from tracefile import OPTIONAL_FIELDS, TRACE_DTYPE, TraceWriter
+
+parser = argparse.ArgumentParser(description='Convert a cluster workload trace to a trace file.')
+parser.add_argument('-i', '--input', type=str, help='SWF or CSV file, optionally gzipped')
+parser.add_argument('-o', '--output', type=str, help='Output trace file')
+parser.add_argument('-f', '--format', type=str, choices=['swf', 'csv'], default=None,
+                    help='Input format, guessed from the file name by default')
+parser.add_argument('--priority', type=str, default=None,
+                    help='SWF field or CSV column used as priority (SWF default: queue)')
+parser.add_argument('--pid', type=str, default=None, help='CSV column of the job id, jobs are numbered if omitted')
+parser.add_argument('--arrival', type=str, default='submit_time', help='CSV column of the arrival time')
+parser.add_argument('--burst', type=str, default=None, help='CSV column of the burst time')
+parser.add_argument('--start', type=str, default=None, help='CSV column of the start time, with --end instead of --burst')
+parser.add_argument('--end', type=str, default=None, help='CSV column of the end time, with --start instead of --burst')
+parser.add_argument('--cpus', type=str, default=None, help='CSV column of the number of CPUs of a job, 1 if omitted')
+parser.add_argument('--delimiter', type=str, default=',', help='CSV delimiter')
+parser.add_argument('--time-scale', type=float, default=1.0, help='Factor converting trace times to simulation times')
+parser.add_argument('--chunk-size', type=int, default=65536, help='Number of jobs parsed at once')
+
+# Fields of a SWF job line, in order
+SWF_FIELDS = [
+    'job', 'submit_time', 'wait_time', 'run_time', 'allocated_processors', 'average_cpu_time',
+    'used_memory', 'requested_processors', 'requested_time', 'requested_memory', 'status', 'user',
+    'group', 'executable', 'queue', 'partition', 'preceding_job', 'think_time'
+]
+
+
+def open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', newline='')
+    return open(path, 'r', newline='')
+
+
+def parse_floats(values):
+    """
+    Convert a sequence of strings to floats, empty strings become NaN.
+    """
+    return np.array([value.strip() or 'nan' for value in values], dtype=np.float64)
+
+
+class TraceImporter:
+    """
+    Base class of the importers. Subclasses yield chunks of columns from chunks(), which are
+    converted to trace records. Jobs without a valid arrival time or a positive burst time are skipped,
+    and so are jobs with a number of CPUs below 1.
+    """
+    format = None
+    # Whether the chunks have the number of CPUs of every job
+    has_cpus = False
+
+    def __init__(self, path, time_scale=1.0, chunk_size=65536):
+        """
+        :param path: input file
+        :param time_scale: factor converting trace times to simulation times, e.g. 1e-6 for microseconds
+        :param chunk_size: number of jobs parsed at once
+        """
+        self.path = path
+        self.time_scale = time_scale
+        self.chunk_size = chunk_size
+        self.imported = 0
+        self.skipped = 0
+
+    def chunks(self):
+        """
+        :return: iterator of (pids, arrival_times, burst_times, priorities, cpus) arrays; pids may be
+                 None to number the jobs in input order, cpus is None unless has_cpus
+        """
+        raise NotImplementedError
+
+    def convert(self, output):
+        """
+        Write the jobs of the input to a trace file. The trace is marked as sorted by arrival time
+        if the input is, otherwise sort it with extsort.py before simulating it out of core.
+        :return: number of jobs written
+        """
+        is_sorted = True
+        last_arrival_time = None
+        dtype = np.dtype(TRACE_DTYPE.descr + [OPTIONAL_FIELDS['cpus']]) if self.has_cpus else TRACE_DTYPE
+        with TraceWriter(output, dtype, source=os.path.basename(self.path), format=self.format) as writer:
+            for pids, arrival_times, burst_times, priorities, cpus in self.chunks():
+                if pids is None:
+                    pids = np.arange(self.imported + self.skipped, self.imported + self.skipped + len(arrival_times))
+                arrival_times = np.rint(arrival_times * self.time_scale)
+                burst_times = np.rint(burst_times * self.time_scale)
+                valid = (arrival_times >= 0) & (burst_times > 0)
+                if cpus is not None:
+                    valid &= cpus >= 1
+                self.skipped += len(valid) - int(valid.sum())
+
+                records = np.zeros(int(valid.sum()), dtype=dtype)
+                records['pid'] = pids[valid]
+                records['arrival_time'] = arrival_times[valid]
+                records['burst_time'] = burst_times[valid]
+                records['priority'] = priorities[valid]
+                if cpus is not None:
+                    records['cpus'] = cpus[valid]
+                if len(records):
+                    if last_arrival_time is not None and records['arrival_time'][0] < last_arrival_time:
+                        is_sorted = False
+                    if np.any(np.diff(records['arrival_time']) < 0):
+                        is_sorted = False
+                    last_arrival_time = records['arrival_time'][-1]
+                writer.write(records)
+                self.imported += len(records)
+            writer.header['sorted_by'] = ['arrival_time'] if is_sorted else []
+        return self.imported
+
+
+class SWFImporter(TraceImporter):
+    """
+    Standard Workload Format of the Parallel Workloads Archive: one job per line with 18
+    whitespace-separated fields, comment lines start with ";" and missing values are -1.
+    Jobs map to processes as job -> pid, submit_time -> arrival_time, run_time -> burst_time and
+    requested_processors, or allocated_processors if missing, -> cpus.
+    """
+    format = 'swf'
+    has_cpus = True
+
+    def __init__(self, path, priority='queue', time_scale=1.0, chunk_size=65536):
+        """
+        :param priority: SWF field used as priority
+        """
+        super().__init__(path, time_scale, chunk_size)
+        if priority not in SWF_FIELDS:
+            raise ValueError('Unknown SWF field: {}'.format(priority))
+        self.columns = [
+            SWF_FIELDS.index(name)
+            for name in ('job', 'submit_time', 'run_time', priority, 'requested_processors', 'allocated_processors')
+        ]
+
+    def chunks(self):
+        with open_text(self.path) as f:
+            rows = []
+            for line_number, line in enumerate(f, 1):
+                fields = line.split()
+                if not fields or fields[0].startswith(';'):
+                    continue
+                if len(fields) < len(SWF_FIELDS):
+                    raise ValueError('Line {} of {} has {} fields, expected {}'.format(
+                        line_number, self.path, len(fields), len(SWF_FIELDS)))
+                rows.append([fields[i] for i in self.columns])
+                if len(rows) == self.chunk_size:
+                    yield self.parse(rows)
+                    rows = []
+            if rows:
+                yield self.parse(rows)
+
+    def parse(self, rows):
+        columns = np.array(rows, dtype=np.float64)
+        # Missing priorities (-1) become 0 instead of skipping the job
+        priorities = np.maximum(columns[:, 3], 0)
+        cpus = np.where(columns[:, 4] > 0, columns[:, 4], columns[:, 5])
+        return columns[:, 0].astype(np.int64), columns[:, 1], columns[:, 2], priorities, cpus
+
+
+class CSVImporter(TraceImporter):
+    """
+    CSV job logs with a header row, such as the public cluster traces. Columns are given by name;
+    the burst time is either a column or the difference of a start and an end column.
+    """
+    format = 'csv'
+
+    def __init__(self, path, arrival='submit_time', burst=None, start=None, end=None, pid=None,
+                 priority=None, delimiter=',', time_scale=1.0, chunk_size=65536, cpus=None):
+        """
+        :param arrival: column of the arrival time
+        :param burst: column of the burst time
+        :param start: column of the start time, used with end if burst is not given
+        :param end: column of the end time
+        :param pid: column of the integer job id, jobs are numbered in input order if None
+        :param priority: column of the priority, 0 for every job if None; empty cells are 0 as well
+        :param cpus: column of the number of CPUs, none are stored if None
+        """
+        super().__init__(path, time_scale, chunk_size)
+        if burst is None and (start is None or end is None):
+            raise ValueError('Either a burst column or both start and end columns are required')
+        self.arrival = arrival
+        self.burst = burst
+        self.start = start
+        self.end = end
+        self.pid = pid
+        self.priority = priority
+        self.cpus = cpus
+        self.has_cpus = cpus is not None
+        self.delimiter = delimiter
+
+    def chunks(self):
+        with open_text(self.path) as f:
+            reader = csv.reader(f, delimiter=self.delimiter)
+            header = next(reader, [])
+            names = [self.pid, self.arrival, self.burst, self.start, self.end, self.priority, self.cpus]
+            for name in names:
+                if name is not None and name not in header:
+                    raise ValueError('Column not found in {}: {}'.format(self.path, name))
+            self.columns = [header.index(name) if name is not None else None for name in names]
+
+            rows = []
+            for row in reader:
+                if row:
+                    rows.append(row)
+                if len(rows) == self.chunk_size:
+                    yield self.parse(rows)
+                    rows = []
+            if rows:
+                yield self.parse(rows)
+
+    def parse(self, rows):
+        pid, arrival, burst, start, end, priority, cpus = [
+            parse_floats([row[i] for row in rows]) if i is not None else None for i in self.columns
+        ]
+        if burst is None:
+            burst = end - start
+        if priority is None:
+            priority = np.zeros(len(rows))
+        else:
+            # Empty priorities become 0 instead of skipping the job, as in SWF
+            priority = np.where(np.isnan(priority), 0, priority)
+        if pid is not None:
+            if not np.all(np.isfinite(pid) & (pid == np.rint(pid))):
+                raise ValueError('Job ids of {} are not integers, leave out the pid column'.format(self.path))
+            pid = pid.astype(np.int64)
+        return pid, arrival, burst, priority, cpus
+
+
+def create_importer(args):
+    """
+    Create the importer for the parsed command line arguments.
+    """
+    path = args.input[:-3] if args.input.endswith('.gz') else args.input
+    trace_format = args.format or ('swf' if path.endswith('.swf') else 'csv')
+    if trace_format == 'swf':
+        return SWFImporter(args.input, args.priority or 'queue', args.time_scale, args.chunk_size)
+    return CSVImporter(
+        args.input, args.arrival, args.burst, args.start, args.end, args.pid, args.priority,
+        args.delimiter, args.time_scale, args.chunk_size, args.cpus
+    )
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    importer = create_importer(args)
+    importer.convert(args.output)
+    print('Imported %d jobs, skipped %d, results saved to %s' % (importer.imported, importer.skipped, args.output))
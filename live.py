@@ -0,0 +1,375 @@
+"""
+Watch a simulation while it runs: a Gantt strip of the CPU, the ready-queue depth and rolling
+utilization and waiting time, updated live.
+
+The simulation runs in a child process with a sampler observer, so drawing never holds up the
+scheduling loop. The sampler folds every step into a fixed number of columns of simulated time and
+sends only the columns changed since its last message, a few times per second. The window redraws
+just the changing artists over a cached background (blitting); axes are redrawn in full only when a
+curve outgrows its y range, which doubles it.
+"""
+import argparse
+import multiprocessing
+import time
+from queue import Empty
+
+import numpy as np
+from matplotlib import pyplot as plt
+
+from batch import algorithm_name, create_algorithm
+from dataset import Dataset
+
+parser = argparse.ArgumentParser(description='Simulate the scheduling algorithm and plot it live.')
+parser.add_argument('-p', '--process', type=str, help='process.json or trace file')
+parser.add_argument('-a', '--algorithm', type=algorithm_name, help='algorithm name')
+parser.add_argument('-c', '--columns', type=int, default=1000, help='Number of columns of simulated time')
+parser.add_argument('-r', '--rolling', type=int, default=20, help='Number of columns the rolling metrics span')
+parser.add_argument('-i', '--interval', type=float, default=0.1, help='Seconds between updates')
+parser.add_argument('-o', '--output', type=str, default=None, help='Save the final figure to this file')
+
+RESULT_FIELDS = [
+    'total_time', 'cpu_utilization', 'throughput', 'average_waiting_time', 'average_turnaround_time',
+    'average_response_time'
+]
+
+# Per-column series sent by the sampler
+SERIES = ['busy', 'colors', 'depth', 'completions', 'waiting']
+
+# Number of colors of the processes in the Gantt strip, those of the tab20 colormap
+COLORS = 20
+
+
+class LiveSampler:
+    """
+    Observer folding the steps of a run into `columns` columns of simulated time up to `end_time`
+    and sending the changed columns to a queue at most every `interval` seconds.
+
+    Steps are only sampled once the clock has moved a quarter of a column since the last sample, so
+    a sample costs a comparison for most steps and a run takes about four samples per column. Per
+    column it keeps the busy time, the color of the last process which ran in it (-1 if none), the
+    deepest ready queue seen at a sample, and the number and total waiting time of the processes
+    completed in it. Processes are colored in the order they first run, so any kind of pid can be shown.
+    Between two samples the CPU is idle before it is busy; the busy part is credited to the running
+    process, or to the last executed one for algorithms which run a process within a single step.
+    """
+
+    def __init__(self, queue, end_time, columns=1000, interval=0.1):
+        self.queue = queue
+        self.columns = columns
+        self.width = max(end_time, 1) / columns
+        self.interval = interval
+        self.busy = [0.0] * columns
+        self.colors = [-1] * columns
+        # Color of every process which ran so far, by pid
+        self.pid_colors = {}
+        self.depth = [0] * columns
+        self.completions = [0] * columns
+        self.waiting = [0.0] * columns
+        self.time = 0
+        self.idle_time = 0
+        self.executed = 0
+        self.next_sample = 0
+        self.flushed = 0
+        self.next_flush = time.monotonic() + interval
+
+    def column(self, time):
+        return min(int(time / self.width), self.columns - 1)
+
+    def __call__(self, algorithm):
+        now = algorithm.time
+        if now < self.next_sample:
+            return
+        self.next_sample = now + self.width / 4
+        executed = algorithm.executed_processes
+        busy_time = (now - self.time) - (algorithm.idle_time - self.idle_time)
+        if busy_time > 0:
+            if algorithm.running_process is not None:
+                pid = algorithm.running_process.pid
+            else:
+                pid = executed[-1]['pid'] if len(executed) else None
+            self.add_busy(now - busy_time, now, self.color(pid))
+        self.time = now
+        self.idle_time = algorithm.idle_time
+
+        column = self.column(now)
+        depth = algorithm.ready_count()
+        if depth > self.depth[column]:
+            self.depth[column] = depth
+
+        if len(executed) > self.executed:
+            records = executed.records()[self.executed:]
+            for end_time, waiting_time in zip(records['end_time'].tolist(), records['waiting_time'].tolist()):
+                column = self.column(end_time)
+                self.completions[column] += 1
+                self.waiting[column] += waiting_time
+            self.executed = len(executed)
+
+        if time.monotonic() >= self.next_flush:
+            self.flush()
+
+    def color(self, pid):
+        """
+        :return: color index of a process, -1 for None
+        """
+        if pid is None:
+            return -1
+        color = self.pid_colors.get(pid)
+        if color is None:
+            color = self.pid_colors[pid] = len(self.pid_colors) % COLORS
+        return color
+
+    def add_busy(self, start, end, color):
+        first = self.column(start)
+        last = self.column(end)
+        if first == last:
+            self.busy[first] += end - start
+            self.colors[first] = color
+            return
+        for column in range(first, last + 1):
+            low = max(start, column * self.width)
+            high = end if column == last else min(end, (column + 1) * self.width)
+            self.busy[column] += high - low
+            self.colors[column] = color
+
+    def flush(self):
+        """
+        Send the columns changed since the last message. Steps only write at or after the column of
+        the clock at that message, so those are resent along with the new ones.
+        """
+        end = self.column(self.time) + 1
+        series = {name: getattr(self, name)[self.flushed:end] for name in SERIES}
+        self.queue.put(('columns', self.flushed, series, self.executed, self.time))
+        self.flushed = end - 1
+        self.next_flush = time.monotonic() + self.interval
+
+    def finish(self, algorithm):
+        """
+        Record the rest of a finished run and send it.
+        """
+        self.next_sample = 0
+        self(algorithm)
+        self.flush()
+
+
+def simulate(path, algorithm, columns, interval, queue):
+    """
+    Run the simulation in the child process, sending its columns and finally its result to the queue.
+    """
+    try:
+        dataset = Dataset.load(path)
+        # The run ends by the last arrival plus all the work, so the columns span at most that
+        end_time = max(dataset.arrival_times) + sum(dataset.burst_times)
+        queue.put(('start', end_time, len(dataset)))
+        instance = create_algorithm(dataset, algorithm, {})
+        sampler = LiveSampler(queue, end_time, columns, interval)
+        instance.observers.append(sampler)
+        start_time = time.time()
+        result = instance.run()
+        run_time = time.time() - start_time
+        sampler.finish(instance)
+        queue.put(('done', {key: result[key] for key in RESULT_FIELDS}, run_time))
+    except Exception as e:
+        queue.put(('error', '%s: %s' % (type(e).__name__, e)))
+
+
+class LiveView:
+    """
+    Window drawing the columns of a LiveSampler as they arrive.
+    """
+
+    def __init__(self, title, rolling=20):
+        """
+        :param title: window title, e.g. the algorithm name
+        :param rolling: number of columns the rolling utilization and waiting time span
+        """
+        self.rolling = rolling
+        self.fig, axes = plt.subplots(4, 1, sharex=True, gridspec_kw={'height_ratios': [1, 2, 2, 2]})
+        self.gantt_axes, self.depth_axes, self.utilization_axes, self.waiting_axes = axes
+        self.fig.set_size_inches(14, 9)
+        self.fig.canvas.manager.set_window_title(title)
+        self.fig.suptitle(f'{title} scheduling algorithm, live', fontsize=16)
+        self.gantt_axes.set_yticks([])
+        self.gantt_axes.set_ylabel('CPU')
+        self.depth_axes.set_ylabel('Ready queue')
+        self.utilization_axes.set_ylabel('Utilization')
+        self.utilization_axes.set_ylim(0, 1.05)
+        self.waiting_axes.set_ylabel('Waiting time')
+        self.waiting_axes.set_xlabel('Time')
+        self.series = None
+        self.artists = []
+        self.background = None
+
+    def start(self, end_time, processes, columns):
+        """
+        Allocate the columns and create the artists once the size of the run is known.
+        """
+        self.processes = processes
+        self.width = max(end_time, 1) / columns
+        self.series = {name: np.zeros(columns) for name in SERIES if name != 'colors'}
+        self.series['colors'] = np.full(columns, -1, dtype=np.int64)
+        self.reached = 0
+        self.executed = 0
+        self.time = 0
+        self.x = (np.arange(columns) + 0.5) * self.width
+        for axes in (self.gantt_axes, self.depth_axes, self.utilization_axes, self.waiting_axes):
+            axes.set_xlim(0, columns * self.width)
+        self.depth_axes.set_ylim(0, 1)
+        self.waiting_axes.set_ylim(0, 1)
+        self.gantt = self.gantt_axes.imshow(
+            self.gantt_image(), aspect='auto', cmap='tab20', vmin=0, vmax=COLORS - 1, interpolation='nearest',
+            extent=(0, columns * self.width, 0, 1), animated=True
+        )
+        self.depth_line, = self.depth_axes.plot([], [], color='#7570b3', drawstyle='steps-mid', animated=True)
+        self.utilization_line, = self.utilization_axes.plot([], [], color='#1b9e77', animated=True)
+        self.waiting_line, = self.waiting_axes.plot([], [], color='#e7298a', animated=True)
+        self.status = self.gantt_axes.text(
+            0, 1.05, '', transform=self.gantt_axes.transAxes, verticalalignment='bottom', animated=True
+        )
+        self.artists = [self.gantt, self.depth_line, self.utilization_line, self.waiting_line, self.status]
+        plt.show(block=False)
+        self.redraw()
+
+    def gantt_image(self):
+        """
+        Color every column by its process, leaving idle columns blank.
+        """
+        return np.ma.masked_less(self.series['colors'], 0).reshape(1, -1)
+
+    def update(self, start, series, executed, time):
+        """
+        Take a message of columns from the sampler.
+        """
+        end = start + len(series['busy'])
+        for name, values in series.items():
+            self.series[name][start:end] = values
+        self.reached = max(self.reached, end)
+        self.executed = executed
+        self.time = time
+
+    def rolling_sum(self, values):
+        total = np.cumsum(values)
+        total[self.rolling:] = total[self.rolling:] - total[:-self.rolling]
+        return total
+
+    def render(self):
+        """
+        Update the artists with the columns reached so far and blit them.
+        """
+        n = self.reached
+        x = self.x[:n]
+        depth = self.series['depth'][:n]
+        spans = np.minimum(np.arange(1, n + 1), self.rolling) * self.width
+        utilization = self.rolling_sum(self.series['busy'][:n]) / spans
+        completions = self.rolling_sum(self.series['completions'][:n])
+        waiting = self.rolling_sum(self.series['waiting'][:n]) / np.maximum(completions, 1)
+        waiting[completions == 0] = np.nan
+
+        self.gantt.set_data(self.gantt_image())
+        self.depth_line.set_data(x, depth)
+        self.utilization_line.set_data(x, utilization)
+        self.waiting_line.set_data(x, waiting)
+        self.status.set_text('Time %.0f, %d of %d processes executed' % (self.time, self.executed, self.processes))
+
+        # A curve above its axes doubles the y range, which needs the axes redrawn in full
+        rescaled = False
+        for axes, values in ((self.depth_axes, depth), (self.waiting_axes, waiting)):
+            top = np.nanmax(values) if n and not np.isnan(values).all() else 0
+            if top > axes.get_ylim()[1]:
+                axes.set_ylim(0, 2 ** np.ceil(np.log2(top)))
+                rescaled = True
+        if rescaled:
+            self.redraw()
+        else:
+            self.blit()
+
+    def redraw(self):
+        """
+        Draw everything but the artists and cache it as the background.
+        """
+        self.fig.canvas.draw()
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self.blit()
+
+    def blit(self):
+        canvas = self.fig.canvas
+        canvas.restore_region(self.background)
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
+    def open(self):
+        return plt.fignum_exists(self.fig.number)
+
+    def finish(self, result, run_time):
+        """
+        Show the result of the run and turn the artists into regular ones, so the figure can be saved.
+        """
+        for artist in self.artists:
+            artist.set_animated(False)
+        self.status.set_text(
+            'Simulation time: %.3f s, total time: %.0f, utilization: %.2f%%, throughput: %.6f\n'
+            'Average waiting / turnaround / response time: %.2f / %.2f / %.2f' % (
+                run_time, result['total_time'], result['cpu_utilization'] * 100, result['throughput'],
+                result['average_waiting_time'], result['average_turnaround_time'], result['average_response_time']
+            )
+        )
+        self.fig.canvas.draw()
+
+
+def watch(path, algorithm, columns=1000, rolling=20, interval=0.1):
+    """
+    Run a simulation in a child process and plot it live.
+    :return: (view, result, run time), result is None if the window was closed before the end
+    """
+    queue = multiprocessing.Queue()
+    child = multiprocessing.Process(target=simulate, args=(path, algorithm, columns, interval, queue), daemon=True)
+    child.start()
+    view = LiveView(algorithm, rolling)
+    try:
+        while True:
+            try:
+                messages = [queue.get(timeout=interval)]
+            except Empty:
+                if not child.is_alive():
+                    raise RuntimeError('The simulation stopped without a result')
+                if view.series is not None:
+                    view.fig.canvas.flush_events()
+                continue
+            try:
+                while True:
+                    messages.append(queue.get_nowait())
+            except Empty:
+                pass
+            for message in messages:
+                kind = message[0]
+                if kind == 'start':
+                    view.start(message[1], message[2], columns)
+                elif kind == 'columns':
+                    view.update(*message[1:])
+                elif kind == 'error':
+                    raise RuntimeError(message[1])
+                else:
+                    view.render()
+                    view.finish(*message[1:])
+                    return view, message[1], message[2]
+            if not view.open():
+                return view, None, None
+            view.render()
+    finally:
+        if child.is_alive():
+            child.terminate()
+        child.join()
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    view, result, run_time = watch(args.process, args.algorithm, args.columns, args.rolling, args.interval)
+    if result is not None:
+        print('Simulation time: %.10f s' % run_time)
+        for name in RESULT_FIELDS:
+            print('%s: %s' % (name, result[name]))
+        if args.output:
+            view.fig.savefig(args.output)
+        if plt.get_backend().lower() != 'agg':
+            plt.show()
@@ -0,0 +1,154 @@
+"""
+Latency-vs-load curves: replay a base workload at different arrival rates and find the offered
+load at which waiting times blow up (the saturation point).
+
+The offered load of a workload is its total burst time divided by the time between its first and
+last arrival. Scaling the arrival times of the base workload sets any offered load while keeping
+its bursts and priorities. A coarse grid of loads is run first; the saturation point is then
+narrowed down between the highest unsaturated and the lowest saturated load, running one point per
+worker between them in every round.
+"""
+import argparse
+import csv
+import multiprocessing
+
+import numpy as np
+
+from batch import algorithm_name, create_algorithm
+from dataset import Dataset
+
+parser = argparse.ArgumentParser(description='Find the latency-vs-load curve of a scheduling algorithm.')
+parser.add_argument('-p', '--process', type=str, help='process.json or trace file')
+parser.add_argument('-a', '--algorithm', type=algorithm_name, help='algorithm name')
+parser.add_argument('-o', '--output', type=str, default='loadcurve.csv', help='Output CSV file')
+parser.add_argument('--min-load', type=float, default=0.1, help='Lowest offered load of the grid')
+parser.add_argument('--max-load', type=float, default=1.5, help='Highest offered load of the grid')
+parser.add_argument('--points', type=int, default=8, help='Number of loads of the grid')
+parser.add_argument('--threshold', type=float, default=10,
+                    help='Average waiting time, in average burst times, from which a load counts as saturated')
+parser.add_argument('--tolerance', type=float, default=0.01, help='Precision of the saturation point')
+parser.add_argument('-w', '--workers', type=int, default=None, help='Number of worker processes')
+
+FIELDS = ['load', 'cpu_utilization', 'average_waiting_time', 'p99_waiting_time', 'saturated']
+
+# Base workload of the current search, inherited by the worker processes
+_base = {}
+
+
+def offered_load(dataset):
+    """
+    :return: total burst time / time between the first and the last arrival, None if all arrive at once
+    """
+    span = max(dataset.arrival_times) - min(dataset.arrival_times)
+    return sum(dataset.burst_times) / span if span else None
+
+
+def scale_load(dataset, load):
+    """
+    Stretch or compress the arrival times of a dataset to the given offered load. Arrival times
+    stay integers, so processes may end up arriving together.
+    """
+    first = min(dataset.arrival_times)
+    factor = offered_load(dataset) / load
+    arrival_times = np.rint(first + (np.array(dataset.arrival_times) - first) * factor).astype(np.int64)
+    return Dataset(
+        dataset.pids, arrival_times.tolist(), dataset.burst_times, dataset.priorities,
+        sorted_by=dataset.sorted_by[:1], groups=dataset.groups,
+        deadlines=dataset.deadlines, periods=dataset.periods, cpus=dataset.cpus
+    )
+
+
+def run_point(load):
+    """
+    Run the base workload at one offered load in a worker process.
+    """
+    dataset = scale_load(_base['dataset'], load)
+    result = create_algorithm(dataset, _base['algorithm'], {}).run()
+    return {
+        'load': load,
+        'cpu_utilization': result['cpu_utilization'],
+        'average_waiting_time': result['average_waiting_time'],
+        'p99_waiting_time': float(np.percentile(result['processes']['waiting_time'], 99)),
+    }
+
+
+def _init_worker(dataset, algorithm):
+    _base.update(dataset=dataset, algorithm=algorithm)
+
+
+class LoadCurve:
+    """
+    Latency-vs-load curve of one algorithm on one base workload.
+    """
+
+    def __init__(self, dataset, algorithm, threshold=10, workers=None):
+        """
+        :param dataset: base workload
+        :param algorithm: algorithm name
+        :param threshold: average waiting time, in average burst times, from which a load counts as saturated
+        :param workers: number of worker processes, all CPUs if None
+        """
+        if offered_load(dataset) is None:
+            raise ValueError('The arrivals of the base workload must span some time')
+        self.dataset = dataset
+        self.algorithm = algorithm
+        self.saturation_waiting_time = threshold * sum(dataset.burst_times) / len(dataset)
+        self.workers = workers or multiprocessing.cpu_count()
+        self.points = {}
+        self.saturation_point = None
+
+    def saturated(self, point):
+        return point['average_waiting_time'] >= self.saturation_waiting_time
+
+    def run(self, min_load=0.1, max_load=1.5, points=8, tolerance=0.01):
+        """
+        Run a grid of loads, then bisect the interval where saturation starts.
+        :return: points of the curve sorted by load, each with the fields of FIELDS
+        """
+        with multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                  initargs=(self.dataset, self.algorithm)) as pool:
+            self.evaluate(pool, np.linspace(min_load, max_load, points))
+            low, high = self.knee()
+            while low is not None and high is not None and high - low > tolerance:
+                # One new load per worker, evenly spaced inside the interval
+                self.evaluate(pool, np.linspace(low, high, self.workers + 2)[1:-1])
+                low, high = self.knee()
+        self.saturation_point = high
+        return self.curve()
+
+    def evaluate(self, pool, loads):
+        loads = [float(load) for load in loads if float(load) not in self.points]
+        for point in pool.map(run_point, loads, chunksize=1):
+            point['saturated'] = self.saturated(point)
+            self.points[point['load']] = point
+
+    def knee(self):
+        """
+        :return: (highest load below the lowest saturated load, lowest saturated load); either is None
+                 if there is no such load
+        """
+        saturated = [load for load, point in self.points.items() if point['saturated']]
+        high = min(saturated) if saturated else None
+        below = [load for load in self.points if high is None or load < high]
+        return (max(below) if below else None), high
+
+    def curve(self):
+        return [self.points[load] for load in sorted(self.points)]
+
+    def save(self, output):
+        with open(output, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(self.curve())
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    load_curve = LoadCurve(Dataset.load(args.process), args.algorithm, args.threshold, args.workers)
+    load_curve.run(args.min_load, args.max_load, args.points, args.tolerance)
+    load_curve.save(args.output)
+    if load_curve.saturation_point is None:
+        print('No saturation up to load %.3f' % args.max_load)
+    else:
+        print('Saturation point: load %.4f' % load_curve.saturation_point)
+    print('%d points saved to %s' % (len(load_curve.points), args.output))
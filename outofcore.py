@@ -0,0 +1,84 @@
+"""
+Run a simulation on a trace file larger than memory.
+
+Pending processes are read from the memory-mapped trace through a bounded read-ahead buffer and
+finished processes are streamed to a result trace, so only the ready queue and the running process
+are kept in memory.
+"""
+import argparse
+import time
+
+import algorithms
+from telemetry import Telemetry
+from tracefile import ResultWriter, StreamedArrivals
+
+parser = argparse.ArgumentParser(description='Simulate the scheduling algorithm on a trace file.')
+parser.add_argument('-p', '--process', type=str, help='Trace file sorted by arrival time')
+parser.add_argument('-a', '--algorithm', type=str, help='algorithm name')
+parser.add_argument('-o', '--output', type=str, default='results.trace', help='Result trace file')
+parser.add_argument('-b', '--buffer', type=int, default=65536, help='Number of records read ahead')
+parser.add_argument('-c', '--cpus', type=int, default=None,
+                    help='CPUs of the machine of the backfilling algorithms, as many as the widest job needs by default')
+parser.add_argument('-t', '--telemetry', type=float, default=None, metavar='SECONDS',
+                    help='Report the progress of the run to stderr every this many seconds, 0 for every check')
+parser.add_argument('--telemetry-output', type=str, default=None,
+                    help='Write the progress reports to this JSON lines file instead of stderr')
+
+
+def create_algorithm(algorithm, trace_path, output_path, buffer_size=65536, params=None):
+    """
+    Create an algorithm instance which reads its processes from trace_path and writes finished
+    processes to output_path.
+    :param params: parameters to set on the algorithm, see algorithms.parameter_schema
+    """
+    params = params or {}
+    algorithms.validate_params(algorithm, params)
+    AlgorithmClass = algorithms.get_algorithm(algorithm)
+    instance = AlgorithmClass([])
+    for name, value in params.items():
+        setattr(instance, name, value)
+    instance.arrivals = StreamedArrivals(
+        trace_path, AlgorithmClass.arrival_order, AlgorithmClass.process_compare_prop, buffer_size
+    )
+    instance.executed_processes = ResultWriter(output_path)
+    return instance
+
+
+def run(algorithm, trace_path, output_path, buffer_size=65536, telemetry=None, params=None):
+    """
+    Run the algorithm out of core.
+    :param telemetry: Telemetry observer reporting the progress of the run, or None
+    :param params: parameters to set on the algorithm
+    :return: result dict like BaseAlgorithm.run, with "processes" memory-mapped from the result trace
+    """
+    instance = create_algorithm(algorithm, trace_path, output_path, buffer_size, params)
+    if telemetry is None:
+        return instance.run()
+    instance.observers.append(telemetry)
+    result = instance.run()
+    telemetry.finish(instance)
+    return result
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    telemetry = None
+    if args.telemetry is not None and args.telemetry < 0:
+        parser.error('--telemetry must not be negative')
+    if args.telemetry is not None or args.telemetry_output is not None:
+        telemetry = Telemetry(args.telemetry if args.telemetry is not None else 1.0, args.telemetry_output)
+    params = {'cpus': args.cpus} if args.cpus is not None else {}
+    try:
+        algorithms.validate_params(args.algorithm, params)
+    except ValueError as e:
+        parser.error(str(e))
+    start_time = time.time()
+    result = run(args.algorithm, args.process, args.output, args.buffer, telemetry, params)
+    print('Simulation time: %.10f s' % (time.time() - start_time))
+    print('CPU total time: %.0f' % result['total_time'])
+    print('CPU utilization: %f%%' % (result['cpu_utilization'] * 100))
+    print('Throughput: %.6f' % result['throughput'])
+    print('Average waiting time: %.2f' % result['average_waiting_time'])
+    print('Average turnaround time: %.2f' % result['average_turnaround_time'])
+    print('Average response time: %.2f' % result['average_response_time'])
+    print('Results saved to %s' % args.output)
@@ -10,15 +10,31 @@ class Process:
     Process class for the scheduler simulation.
     """
 
-    def __init__(self, pid, arrival_time, priority, burst_time, compare_prop='priority'):
+    def __init__(self, pid, arrival_time, priority, burst_time, compare_prop='priority', group=None,
+                 deadline=None, period=None, cpus=1):
         """
         Initialize a process.
+        :param group: tenant or group the process belongs to, a path like "acme/batch", or None
+        :param deadline: time after its arrival by which the process must finish, or None
+        :param period: period of the periodic task the process is a job of, or None. A job without
+                       a deadline must finish by the end of its period.
+        :param cpus: number of CPUs the process runs on at once, only used by the backfilling algorithms
         """
         self.pid = pid
+        self.group = group
+        self.deadline = deadline
+        self.period = period
+        self.cpus = cpus
+        relative_deadline = deadline if deadline is not None else period
+        # Absolute time by which the process must finish, None if it has no deadline
+        self.due_time = arrival_time + relative_deadline if relative_deadline is not None else None
         self.arrival_time = arrival_time
         self.priority = priority
         self.burst_time = burst_time
         self.remaining_time = burst_time
+        # Burst and remaining time the SJF algorithms predict in prediction mode, see algorithms/prediction.py
+        self.predicted_burst_time = None
+        self.predicted_remaining_time = None
         self.start_time = None
         self.end_time = None
         self.io_time = 0
@@ -4,25 +4,39 @@ Generate a json dataset for simulation
 
 import argparse
 import json
+import multiprocessing
+import os
 import random
 
+import numpy as np
+
+from tracefile import MANIFEST_MAGIC, TraceWriter
+
 parser = argparse.ArgumentParser(description='Generate a json dataset for simulation')
 parser.add_argument('--output', '-o', type=str, default='dataset.json', help='Output file')
 parser.add_argument('--size', '-s', type=int, default=100000, help='Number of samples')
+parser.add_argument('--seed', type=int, default=None, help='Random seed, for reproducible datasets')
+parser.add_argument('--min-burst', type=int, default=0, help='Smallest burst time')
+parser.add_argument('--sharded', action='store_true',
+                    help='Write trace shards sorted by arrival time and a manifest (the output file) instead of JSON')
+parser.add_argument('--shard-size', type=int, default=10000000, help='Number of processes per shard')
+parser.add_argument('--workers', '-w', type=int, default=None, help='Number of worker processes for --sharded')
 
 
 class ProcessGenerator:
-    def __init__(self, size):
+    def __init__(self, size, seed=None, min_burst=0):
         self.size = size
+        self.random = random.Random(seed)
+        self.min_burst = min_burst
         self.processes = []
 
     def generate(self):
         for i in range(self.size):
             self.processes.append({
                 'pid': i,
-                'arrival_time': random.randint(0, 100),
-                'priority': random.randint(0, 10),
-                'burst_time': random.randint(0, 100),
+                'arrival_time': self.random.randint(0, 100),
+                'priority': self.random.randint(0, 10),
+                'burst_time': self.random.randint(self.min_burst, 100),
             })
 
     def save(self, output):
@@ -30,8 +44,91 @@ class ProcessGenerator:
             json.dump(self.processes, f)
 
 
+class ShardedGenerator:
+    """
+    Generate a dataset of any size in parallel, with the same distribution as ProcessGenerator.
+    The dataset is written as trace shards of shard_size processes, sorted by arrival time across
+    all shards, and a manifest listing them.
+
+    The number of processes per arrival time is drawn first, from the PCG64 stream of the seed, so
+    the arrival times and pids of every shard follow from its position. Shard i draws priorities and
+    burst times from that stream jumped i + 1 times, which never overlaps another shard's. The output
+    only depends on the seed, the size and the shard size, not on the number of workers.
+    """
+    # Processes drawn at once, fixed so that shards do not depend on memory settings
+    chunk_size = 1 << 20
+    max_arrival_time = 100
+
+    def __init__(self, size, seed=None, min_burst=0, shard_size=10000000):
+        self.size = size
+        self.seed = seed if seed is not None else np.random.SeedSequence().entropy
+        self.min_burst = min_burst
+        self.shard_size = shard_size
+
+    def arrival_counts(self):
+        """
+        :return: number of processes arriving at every time from 0 to max_arrival_time
+        """
+        rng = np.random.Generator(np.random.PCG64(self.seed))
+        times = self.max_arrival_time + 1
+        return rng.multinomial(self.size, [1 / times] * times)
+
+    def generate_shard(self, shard, arrival_counts, path):
+        """
+        Write one shard.
+        :return: manifest entry of the shard
+        """
+        start = shard * self.shard_size
+        end = min(self.size, start + self.shard_size)
+        rng = np.random.Generator(np.random.PCG64(self.seed).jumped(shard + 1))
+        arrived = np.cumsum(arrival_counts)
+        with TraceWriter(path, sorted_by=['arrival_time'], seed=self.seed, shard=shard) as writer:
+            for chunk_start in range(start, end, self.chunk_size):
+                pids = np.arange(chunk_start, min(end, chunk_start + self.chunk_size))
+                records = np.zeros(len(pids), dtype=writer.dtype)
+                records['pid'] = pids
+                records['arrival_time'] = np.searchsorted(arrived, pids, side='right')
+                records['priority'] = rng.integers(0, 10, len(pids), endpoint=True)
+                records['burst_time'] = rng.integers(self.min_burst, 100, len(pids), endpoint=True)
+                writer.write(records)
+        return {'path': os.path.basename(path), 'count': end - start, 'first_pid': start}
+
+    def generate(self, output, workers=None):
+        """
+        Write all shards next to the manifest `output` in parallel, then the manifest.
+        :return: manifest dict
+        """
+        arrival_counts = self.arrival_counts()
+        stem = os.path.splitext(output)[0]
+        shards = (self.size + self.shard_size - 1) // self.shard_size
+        tasks = [(self, shard, arrival_counts, '%s-%05d.trace' % (stem, shard)) for shard in range(shards)]
+        with multiprocessing.Pool(workers) as pool:
+            entries = pool.map(_generate_shard, tasks, chunksize=1)
+        manifest = {
+            'magic': MANIFEST_MAGIC,
+            'count': self.size,
+            'seed': self.seed,
+            'min_burst': self.min_burst,
+            'shard_size': self.shard_size,
+            'sorted_by': ['arrival_time'],
+            'shards': entries,
+        }
+        with open(output, 'w') as f:
+            json.dump(manifest, f)
+        return manifest
+
+
+def _generate_shard(task):
+    generator, shard, arrival_counts, path = task
+    return generator.generate_shard(shard, arrival_counts, path)
+
+
 if __name__ == '__main__':
     args = parser.parse_args()
-    generator = ProcessGenerator(args.size)
-    generator.generate()
-    generator.save(args.output)
+    if args.sharded:
+        generator = ShardedGenerator(args.size, args.seed, args.min_burst, args.shard_size)
+        generator.generate(args.output, args.workers)
+    else:
+        generator = ProcessGenerator(args.size, args.seed, args.min_burst)
+        generator.generate()
+        generator.save(args.output)
@@ -0,0 +1,164 @@
+"""
+Reference implementations of the scheduling algorithms, for checking the algorithms package.
+
+These follow the rules of every policy one time unit at a time, with plain lists, exactly as they
+are described, without the shortcuts the algorithms take to jump from event to event: heaps, arrival
+groups, fast-forwarded rounds and the closed-form end of non-preemptive runs. They are slow, and
+only meant for small workloads with integer times, see equivalence.py.
+
+Every function takes a list of job dicts as found in processes.json and returns a dict of
+(start time, end time) by pid.
+"""
+
+
+def prepare(jobs, order):
+    """
+    :param jobs: list of job dicts
+    :param order: properties the algorithm orders its input by, see BaseAlgorithm.arrival_order
+    :return: copies of the jobs with their remaining time, sorted like the algorithm sorts them
+    """
+    jobs = [dict(job, remaining_time=job['burst_time'], start_time=None) for job in jobs]
+    return sorted(jobs, key=lambda job: tuple(job[name] for name in order))
+
+
+def pop_min(ready, key):
+    """
+    Remove the first job with the smallest key from the list, so equal keys leave in the order they came.
+    """
+    best = min(range(len(ready)), key=lambda i: key(ready[i]))
+    return ready.pop(best)
+
+
+def fifo(jobs):
+    """
+    First come, first served: jobs run to their end in arrival order.
+    """
+    time = 0
+    schedule = {}
+    for job in prepare(jobs, ('arrival_time',)):
+        time = max(time, job['arrival_time'])
+        schedule[job['pid']] = (time, time + job['burst_time'])
+        time += job['burst_time']
+    return schedule
+
+
+def by_key(jobs, order, key, preemptive):
+    """
+    Schedule the jobs by a key, smallest first. At every time unit:
+    1. the running job ends if it has no time left;
+    2. the best of the jobs arriving now (the first of them on ties) takes the CPU if it is free,
+       or, if preemptive, if its key is smaller than the running job's, which goes back to the
+       ready list ahead of the other arrivals; the other arrivals join the ready list in order;
+    3. a free CPU takes the best ready job, the first of them on ties.
+    A job taken from the ready list keeps its start time, unless it started at time 0, as in the
+    original implementation.
+    """
+    arrivals = prepare(jobs, order)
+    cursor = 0
+    ready = []
+    running = None
+    time = 0
+    schedule = {}
+    while cursor < len(arrivals) or ready or running:
+        if running is not None and running['remaining_time'] == 0:
+            schedule[running['pid']] = (running['start_time'], time)
+            running = None
+            if cursor == len(arrivals) and not ready:
+                break
+
+        arrived = []
+        while cursor < len(arrivals) and arrivals[cursor]['arrival_time'] == time:
+            arrived.append(arrivals[cursor])
+            cursor += 1
+        if arrived:
+            best = pop_min(list(arrived), key)
+            if running is None:
+                running = best
+                running['start_time'] = time
+            elif preemptive and key(running) > key(best):
+                ready.append(running)
+                running = best
+                running['start_time'] = time
+            ready.extend(job for job in arrived if job is not running)
+
+        if running is None and ready:
+            running = pop_min(ready, key)
+            running['start_time'] = running['start_time'] or time
+
+        # A job without time left ends before the clock moves on
+        if running is not None and running['remaining_time'] == 0:
+            continue
+        if running is not None:
+            running['remaining_time'] -= 1
+        time += 1
+    return schedule
+
+
+def preemptive_sjf(jobs):
+    return by_key(jobs, ('arrival_time', 'burst_time'), lambda job: job['remaining_time'], True)
+
+
+def non_preemptive_sjf(jobs):
+    return by_key(jobs, ('arrival_time', 'burst_time'), lambda job: job['remaining_time'], False)
+
+
+def preemptive_priority(jobs):
+    return by_key(jobs, ('arrival_time', 'priority'), lambda job: job['priority'], True)
+
+
+def non_preemptive_priority(jobs):
+    return by_key(jobs, ('arrival_time', 'priority'), lambda job: job['priority'], False)
+
+
+def round_robin(jobs, quantum=4):
+    """
+    Round robin: ready jobs take turns in arrival order for one quantum each. At every time unit,
+    the jobs arriving now join the back of the queue first, then the running job ends if it has no
+    time left or goes to the back of the queue if its quantum is used up, and a free CPU takes the
+    front of the queue.
+    """
+    arrivals = prepare(jobs, ('arrival_time',))
+    cursor = 0
+    queue = []
+    running = None
+    used = 0
+    time = 0
+    schedule = {}
+    while cursor < len(arrivals) or queue or running:
+        while cursor < len(arrivals) and arrivals[cursor]['arrival_time'] == time:
+            queue.append(arrivals[cursor])
+            cursor += 1
+
+        if running is not None and running['remaining_time'] == 0:
+            schedule[running['pid']] = (running['start_time'], time)
+            running = None
+        elif running is not None and used == quantum:
+            queue.append(running)
+            running = None
+
+        if running is None and queue:
+            running = queue.pop(0)
+            used = 0
+            if running['start_time'] is None:
+                running['start_time'] = time
+            if running['remaining_time'] == 0:
+                continue
+        if running is None and cursor == len(arrivals):
+            break
+
+        if running is not None:
+            running['remaining_time'] -= 1
+            used += 1
+        time += 1
+    return schedule
+
+
+# Reference of every algorithm which has one, by algorithm name
+REFERENCES = {
+    'FIFO': fifo,
+    'PreemptiveSJF': preemptive_sjf,
+    'NonPreemptiveSJF': non_preemptive_sjf,
+    'PriorityPreemptive': preemptive_priority,
+    'NonPreemptivePriority': non_preemptive_priority,
+    'RR': round_robin,
+}
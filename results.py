@@ -0,0 +1,159 @@
+"""
+Sinks for the finished processes of a run.
+
+Algorithms append every process they finish to a sink, their `executed_processes`, and return the
+sink's records as "processes" in their result: a NumPy structured array with the fields of
+tracefile.RESULT_DTYPE, one row per process in the order they finished. Analysis reads whole
+columns, e.g. `result['processes']['waiting_time']`, without touching a Process object.
+
+ResultColumns, the default sink, keeps the records in memory. ResultWriter streams them to a
+trace file, which is memory-mapped at the end, and CSVResultWriter streams them to a CSV file.
+"""
+import csv
+
+import numpy as np
+
+from tracefile import RESULT_DTYPE, ResultWriter, fill_results
+
+# Result records of processes whose pids are not all integers, e.g. "P1"
+OBJECT_PID_DTYPE = np.dtype([('pid', object)] + RESULT_DTYPE.descr[1:])
+
+
+class ResultColumns:
+    """
+    Records of finished processes in preallocated NumPy columns, which double in size when full.
+    Finished processes are kept by reference until the records are read, and then copied in a
+    column at a time, which costs far less than writing every record on its own. The algorithm
+    holds on to its processes anyway, so keeping them pending costs no memory.
+    """
+
+    def __init__(self, capacity=0):
+        """
+        :param capacity: number of records allocated up front, e.g. the number of processes
+        """
+        self.data = np.zeros(capacity, dtype=RESULT_DTYPE)
+        self.count = 0
+        self.pending = []
+        # Appending is the only cost a finished process has until the records are read
+        self.append = self.pending.append
+        self.extend = self.pending.extend
+
+    def __len__(self):
+        return self.count + len(self.pending)
+
+    def __getitem__(self, index):
+        return self.records()[index]
+
+    def extend_records(self, records):
+        """
+        Append records of another run, e.g. the result records of a base run.
+        """
+        self.flush()
+        self.reserve(len(records))
+        if self.data.dtype != OBJECT_PID_DTYPE and records.dtype['pid'].kind not in 'iu':
+            self.data = self.data.astype(OBJECT_PID_DTYPE)
+        for name in records.dtype.names:
+            self.data[name][self.count:self.count + len(records)] = records[name]
+        self.count += len(records)
+
+    def reserve(self, count):
+        """
+        Make room for count more records.
+        """
+        if self.count + count > len(self.data):
+            data = np.zeros(max(self.count + count, 2 * len(self.data)), dtype=self.data.dtype)
+            data[:self.count] = self.data[:self.count]
+            self.data = data
+
+    def flush(self):
+        """
+        Copy the pending processes into the columns.
+        """
+        if not self.pending:
+            return
+        if self.data.dtype != OBJECT_PID_DTYPE and np.array([process.pid for process in self.pending]).dtype.kind != 'i':
+            self.data = self.data.astype(OBJECT_PID_DTYPE)
+        self.reserve(len(self.pending))
+        fill_results(self.data[self.count:self.count + len(self.pending)], self.pending)
+        self.count += len(self.pending)
+        self.pending.clear()
+
+    def records(self):
+        """
+        :return: structured array viewing the records so far
+        """
+        self.flush()
+        return self.data[:self.count]
+
+    def close(self):
+        self.flush()
+
+
+class CSVResultWriter:
+    """
+    Result sink which streams every finished process to a CSV file with a header row of the field
+    names of RESULT_DTYPE. Processes without a deadline have an empty due time.
+    """
+
+    def __init__(self, path, chunk_size=65536):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.count = 0
+        self.pending = []
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(RESULT_DTYPE.names)
+
+    def __len__(self):
+        return self.count + len(self.pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, process):
+        self.pending.append(process)
+        if len(self.pending) == self.chunk_size:
+            self.flush()
+
+    def extend(self, processes):
+        for process in processes:
+            self.append(process)
+
+    def flush(self):
+        if not self.pending:
+            return
+        records = np.zeros(len(self.pending), dtype=OBJECT_PID_DTYPE)
+        fill_results(records, self.pending)
+        columns = [records[name].tolist() for name in RESULT_DTYPE.names[:-1]]
+        columns.append(['' if process.due_time is None else process.due_time for process in self.pending])
+        self.writer.writerows(zip(*columns))
+        self.count += len(self.pending)
+        self.pending = []
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+    def records(self):
+        """
+        Close the file and read the records back, with the pids as strings.
+        :return: structured array of RESULT_DTYPE with a string pid field
+        """
+        self.close()
+        dtype = np.dtype([('pid', str, 64)] + RESULT_DTYPE.descr[1:])
+        records = np.genfromtxt(self.path, delimiter=',', skip_header=1, dtype=dtype, encoding='utf-8')
+        return np.atleast_1d(records)
+
+
+def open_sink(path, chunk_size=65536):
+    """
+    Open a result sink streaming to a file: CSV if path ends with .csv, a trace file otherwise.
+    """
+    if path.endswith('.csv'):
+        return CSVResultWriter(path, chunk_size)
+    return ResultWriter(path, chunk_size)
@@ -0,0 +1,226 @@
+"""
+Time-windowed metrics of a simulation: busy time, completions, ready-queue length and backlog work
+per window of simulated time.
+
+The series is an observer of the algorithm. At every scheduling step it records how much of the
+last step the CPU was busy, and every finished process adds its arrival and completion. Each event
+updates a constant number of array cells: a quantity that holds from some time on (a busy CPU, an
+arrived or a completed process) adds the part of its first window and starts a count for the
+windows after it, which are summed up once on export.
+"""
+import argparse
+import csv
+
+import numpy as np
+
+import algorithms
+from dataset import Dataset
+
+parser = argparse.ArgumentParser(description='Simulate the scheduling algorithm and save time-windowed metrics.')
+parser.add_argument('-p', '--process', type=str, help='process.json or trace file')
+parser.add_argument('-a', '--algorithm', type=str, help='algorithm name')
+parser.add_argument('-w', '--width', type=float, default=100, help='Simulated time per window')
+parser.add_argument('-s', '--sliding', type=int, default=1, help='Number of windows every row spans')
+parser.add_argument('-o', '--output', type=str, default='series.csv', help='Output file (.csv or .npz)')
+
+COLUMNS = [
+    'window_start', 'window_end', 'busy_time', 'cpu_utilization', 'arrivals', 'completions',
+    'throughput', 'average_queue_length', 'backlog_work'
+]
+
+
+class StepIntegral:
+    """
+    Integral per window of a sum of step functions, each 0 before its time and its weight after.
+    """
+
+    def __init__(self, width, capacity):
+        self.width = width
+        self.partial = np.zeros(capacity)
+        self.starts = np.zeros(capacity)
+
+    def grow(self, capacity):
+        self.partial = np.concatenate([self.partial, np.zeros(capacity - len(self.partial))])
+        self.starts = np.concatenate([self.starts, np.zeros(capacity - len(self.starts))])
+
+    def add(self, window, time, weight=1):
+        """
+        Add a step of the given weight at time, which lies in the given window.
+        """
+        self.partial[window] += weight * ((window + 1) * self.width - time)
+        self.starts[window + 1] += weight
+
+    def add_all(self, windows, times):
+        """
+        Add steps of weight 1 at an array of times, which lie in the given array of windows.
+        """
+        np.add.at(self.partial, windows, (windows + 1) * self.width - times)
+        np.add.at(self.starts, windows + 1, 1)
+
+    def integrals(self, windows):
+        """
+        :return: integral over each of the first `windows` windows
+        """
+        return self.partial[:windows] + self.width * np.cumsum(self.starts[:windows])
+
+
+class WindowedSeries:
+    """
+    Observer collecting the metrics of fixed windows of `width` time units. Arrays start with
+    `capacity` windows and double whenever the simulation runs past them.
+    Completed processes are read from the result records of the algorithm in batches of at least
+    `batch` processes, and the rest when the run finishes.
+    """
+
+    def __init__(self, width, capacity=1024, batch=4096):
+        """
+        :param width: simulated time per window
+        :param capacity: number of windows allocated up front, e.g. the expected total time / width
+        :param batch: number of completed processes read at once
+        """
+        self.width = width
+        self.batch = batch
+        self.capacity = max(2, capacity)
+        self.windows = 0
+        self.busy = StepIntegral(width, self.capacity)
+        self.arrived = StepIntegral(width, self.capacity)
+        self.completed = StepIntegral(width, self.capacity)
+        self.arrivals = np.zeros(self.capacity)
+        self.completions = np.zeros(self.capacity)
+        self.arrived_work = np.zeros(self.capacity)
+        self.time = 0
+        self.idle_time = 0
+        self.executed = 0
+
+    def window(self, time):
+        """
+        Get the window of a point of time, growing the arrays if needed.
+        """
+        window = int(time // self.width)
+        if window + 1 >= self.capacity:
+            capacity = self.capacity
+            while window + 1 >= capacity:
+                capacity *= 2
+            for integral in (self.busy, self.arrived, self.completed):
+                integral.grow(capacity)
+            for name in ('arrivals', 'completions', 'arrived_work'):
+                values = getattr(self, name)
+                setattr(self, name, np.concatenate([values, np.zeros(capacity - len(values))]))
+            self.capacity = capacity
+        self.windows = max(self.windows, window + 1)
+        return window
+
+    def __call__(self, algorithm):
+        """
+        Record the step which ended at the algorithm's current time and the processes completed since.
+        Within a step the CPU is idle before it is busy.
+        """
+        busy_time = (algorithm.time - self.time) - (algorithm.idle_time - self.idle_time)
+        if busy_time > 0:
+            busy_start = algorithm.time - busy_time
+            self.busy.add(self.window(busy_start), busy_start)
+            self.busy.add(self.window(algorithm.time), algorithm.time, -1)
+        self.time = algorithm.time
+        self.idle_time = algorithm.idle_time
+
+        if len(algorithm.executed_processes) - self.executed >= self.batch:
+            self.add_completed(algorithm)
+
+    def add_completed(self, algorithm):
+        """
+        Record the arrival and completion of the processes completed since the last call.
+        """
+        records = algorithm.executed_processes.records()[self.executed:]
+        if not len(records):
+            return
+        arrival_times = records['arrival_time']
+        end_times = records['end_time']
+        # Growing to the last window grows the arrays for all the others
+        self.window(max(arrival_times.max(), end_times.max()))
+        windows = (arrival_times // self.width).astype(np.int64)
+        self.arrived.add_all(windows, arrival_times)
+        np.add.at(self.arrivals, windows, 1)
+        np.add.at(self.arrived_work, windows, records['burst_time'])
+        windows = (end_times // self.width).astype(np.int64)
+        self.completed.add_all(windows, end_times)
+        np.add.at(self.completions, windows, 1)
+        self.executed += len(records)
+
+    def finish(self, algorithm):
+        """
+        Record the rest of a finished run.
+        """
+        self(algorithm)
+        self.add_completed(algorithm)
+
+    def columns(self, sliding=1):
+        """
+        Get the series as columns, one row per window.
+        :param sliding: number of windows every row spans; rows still advance by one window
+        :return: dict of arrays named as in COLUMNS. average_queue_length is the time-weighted number of
+                 processes which have arrived but are neither running nor finished, backlog_work the
+                 work left of the arrived processes at the end of the row
+        """
+        windows = self.windows
+        busy_time = self.busy.integrals(windows)
+        # Waiting processes are the arrived ones minus the finished ones minus the running one
+        queue_time = self.arrived.integrals(windows) - self.completed.integrals(windows) - busy_time
+        backlog_work = np.cumsum(self.arrived_work[:windows]) - np.cumsum(busy_time)
+
+        def rolling(values):
+            total = np.cumsum(values)
+            total[sliding:] = total[sliding:] - total[:-sliding]
+            return total
+
+        starts = np.arange(windows) * self.width
+        span = np.minimum(np.arange(1, windows + 1), sliding) * self.width
+        busy_time = rolling(busy_time)
+        completions = rolling(self.completions[:windows])
+        return {
+            'window_start': starts + self.width - span,
+            'window_end': starts + self.width,
+            'busy_time': busy_time,
+            'cpu_utilization': busy_time / span,
+            'arrivals': rolling(self.arrivals[:windows]),
+            'completions': completions,
+            'throughput': completions / span,
+            'average_queue_length': rolling(queue_time) / span,
+            'backlog_work': backlog_work
+        }
+
+    def save(self, output, sliding=1):
+        """
+        Write the columns as CSV, or as a NumPy .npz archive if output ends with .npz.
+        """
+        columns = self.columns(sliding)
+        if output.endswith('.npz'):
+            np.savez(output, **columns)
+            return
+        with open(output, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            writer.writerows(zip(*[columns[name].tolist() for name in COLUMNS]))
+
+
+def run(path, algorithm, width):
+    """
+    Simulate a workload and collect its series.
+    :return: (result dict of the run, WindowedSeries)
+    """
+    AlgorithmClass = algorithms.get_algorithm(algorithm)
+    dataset = Dataset.load(path)
+    instance = AlgorithmClass(dataset.processes(AlgorithmClass.process_compare_prop), dataset.sorted_by)
+    # Enough windows for the last arrival plus all the work, so the arrays rarely need to grow
+    horizon = max(dataset.arrival_times, default=0) + sum(dataset.burst_times)
+    series = WindowedSeries(width, int(horizon // width) + 2)
+    instance.observers.append(series)
+    result = instance.run()
+    series.finish(instance)
+    return result, series
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    result, series = run(args.process, args.algorithm, args.width)
+    series.save(args.output, args.sliding)
+    print('Saved %d windows of %s to %s' % (series.windows, args.algorithm, args.output))
@@ -0,0 +1,382 @@
+"""
+Local simulation job server: a small HTTP/JSON API on top of asyncio and a process pool.
+
+    POST /jobs              {"dataset": path} or {"jobs": [...]}, plus "algorithm" and optional "params"
+                            -> 202 {"id": ..., "status": "queued"}
+    GET  /algorithms        -> parameters of every algorithm by name
+    GET  /jobs              -> list of all jobs
+    GET  /jobs/<id>         -> job status, progress and result once done
+    GET  /jobs/<id>/events  -> stream of JSON lines with the job state on every change, until it ends
+
+Jobs wait in a bounded queue and at most `concurrency` of them run at once on the process pool.
+Datasets given by path are kept in an LRU cache, so repeated runs on the same file skip parsing it.
+Only the standard library is used, so the server runs fully offline.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import algorithms
+from batch import create_algorithm
+from dataset import Dataset
+
+parser = argparse.ArgumentParser(description='Serve simulation jobs over HTTP.')
+parser.add_argument('--host', type=str, default='127.0.0.1', help='Address to listen on')
+parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+parser.add_argument('-w', '--workers', type=int, default=None, help='Number of worker processes')
+parser.add_argument('-c', '--concurrency', type=int, default=None, help='Jobs running at once, workers by default')
+parser.add_argument('-q', '--queue', type=int, default=100, help='Jobs waiting at most, further jobs are rejected')
+parser.add_argument('--cache', type=int, default=8, help='Number of datasets kept in memory')
+parser.add_argument('--history', type=int, default=1000,
+                    help='Number of finished jobs kept, older ones are forgotten')
+
+RESULT_FIELDS = [
+    'total_time', 'cpu_utilization', 'throughput', 'average_waiting_time', 'average_turnaround_time',
+    'average_response_time'
+]
+
+# Queue of progress messages from the workers, inherited by the worker processes
+_progress = None
+
+
+class ProgressReporter:
+    """
+    Observer sending the share of executed processes to the server whenever it grows by a percent.
+    """
+
+    def __init__(self, job_id, total):
+        self.job_id = job_id
+        self.total = total
+        self.step = max(1, total // 100)
+        self.reported = 0
+
+    def __call__(self, algorithm):
+        executed = len(algorithm.executed_processes)
+        if executed - self.reported >= self.step:
+            self.reported = executed
+            _progress.put((self.job_id, executed / self.total))
+
+
+def run_job(job_id, dataset, algorithm, params):
+    """
+    Run one job in a worker process.
+    :return: result dict without the processes, plus the number of processes and the run time
+    """
+    instance = create_algorithm(dataset, algorithm, params)
+    instance.observers.append(ProgressReporter(job_id, len(dataset)))
+    start_time = time.time()
+    result = instance.run()
+    run_time = time.time() - start_time
+    summary = {key: result[key] for key in RESULT_FIELDS}
+    summary.update(processes=len(result['processes']), run_time=run_time)
+    return summary
+
+
+def _init_worker(progress):
+    global _progress
+    _progress = progress
+
+
+class DatasetCache:
+    """
+    Least recently used datasets by path. A file changed since it was loaded is loaded again.
+
+    get is called from executor threads, so the cache is guarded by a lock. A file is loaded outside
+    of it, holding a lock of its own, so threads asking for the same file wait for one load while
+    other files load at the same time.
+    """
+
+    def __init__(self, capacity=8):
+        self.capacity = capacity
+        self.datasets = OrderedDict()
+        self.lock = threading.Lock()
+        # Lock of every file being loaded, by key
+        self.loading = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """
+        :return: the cached dataset of a key, or None. Call with the lock held.
+        """
+        dataset = self.datasets.get(key)
+        if dataset is not None:
+            self.hits += 1
+            self.datasets.move_to_end(key)
+        return dataset
+
+    def get(self, path):
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            dataset = self.lookup(key)
+            if dataset is not None:
+                return dataset
+            loading = self.loading.setdefault(key, threading.Lock())
+        with loading:
+            with self.lock:
+                # Loaded by another thread while this one waited
+                dataset = self.lookup(key)
+                if dataset is not None:
+                    return dataset
+                self.misses += 1
+            try:
+                dataset = Dataset.load(path)
+            finally:
+                with self.lock:
+                    self.loading.pop(key, None)
+            with self.lock:
+                self.datasets[key] = dataset
+                if len(self.datasets) > self.capacity:
+                    self.datasets.popitem(last=False)
+        return dataset
+
+
+class Job:
+    """
+    A simulation request and its state. Watchers wait on `changed`, which is replaced on every update.
+    """
+
+    def __init__(self, job_id, request):
+        self.id = job_id
+        self.request = request
+        self.status = 'queued'
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.changed = asyncio.Event()
+
+    def update(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def done(self):
+        return self.status in ('done', 'failed')
+
+    def state(self):
+        return {
+            'id': self.id,
+            'algorithm': self.request.get('algorithm'),
+            'status': self.status,
+            'progress': self.progress,
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class JobServer:
+    """
+    Accept jobs over HTTP and run them on a process pool.
+    """
+
+    reasons = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+    def __init__(self, workers=None, concurrency=None, queue_size=100, cache_size=8, history=1000):
+        """
+        :param history: number of finished jobs kept, the oldest ones are forgotten first
+        """
+        self.workers = workers or multiprocessing.cpu_count()
+        self.concurrency = concurrency or self.workers
+        self.queue_size = queue_size
+        self.cache = DatasetCache(cache_size)
+        self.history = history
+        self.jobs = {}
+        # Ids of the finished jobs, in the order they finished
+        self.finished = deque()
+        self.ids = itertools.count(1)
+        self.waiting = 0
+        self.slots = None
+        self.pool = None
+        self.progress = None
+        self.loop = None
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        self.loop = asyncio.get_running_loop()
+        self.slots = asyncio.Semaphore(self.concurrency)
+        self.progress = multiprocessing.Queue()
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.progress,))
+        threading.Thread(target=self.read_progress, daemon=True).start()
+        server = await asyncio.start_server(self.handle, host, port)
+        print('Serving simulation jobs on http://%s:%d' % (host, port))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+
+    def read_progress(self):
+        """
+        Hand progress messages from the workers to the event loop.
+        """
+        while True:
+            job_id, progress = self.progress.get()
+            self.loop.call_soon_threadsafe(self.set_progress, job_id, progress)
+
+    def set_progress(self, job_id, progress):
+        job = self.jobs.get(job_id)
+        if job is not None and job.status == 'running':
+            job.update(progress=progress)
+
+    def submit(self, request):
+        """
+        Validate a job request and queue it.
+        """
+        if not isinstance(request, dict) or 'algorithm' not in request:
+            raise HTTPError(400, 'A job needs an "algorithm" and a "dataset" path or inline "jobs"')
+        if ('dataset' in request) == ('jobs' in request):
+            raise HTTPError(400, 'A job needs either a "dataset" path or inline "jobs"')
+        if not isinstance(request['algorithm'], str) or not isinstance(request.get('params', {}), dict):
+            raise HTTPError(400, 'The "algorithm" must be a name and the "params" an object')
+        try:
+            algorithms.validate_params(request['algorithm'], request.get('params', {}))
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        if self.waiting >= self.queue_size:
+            raise HTTPError(503, 'Too many jobs waiting, try again later')
+        job = Job(next(self.ids), request)
+        self.jobs[job.id] = job
+        self.waiting += 1
+        asyncio.ensure_future(self.execute(job))
+        return job
+
+    async def execute(self, job):
+        try:
+            async with self.slots:
+                self.waiting -= 1
+                job.update(status='running')
+                request = job.request
+                if 'dataset' in request:
+                    # Loading a large file blocks, so it runs in a thread
+                    dataset = await self.loop.run_in_executor(None, self.cache.get, request['dataset'])
+                else:
+                    dataset = Dataset.from_jobs(request['jobs'])
+                result = await self.loop.run_in_executor(
+                    self.pool, run_job, job.id, dataset, request['algorithm'], request.get('params', {})
+                )
+                job.update(status='done', progress=1.0, result=result)
+        except Exception as e:
+            job.update(status='failed', error='%s: %s' % (type(e).__name__, e))
+        self.retire(job)
+
+    def retire(self, job):
+        """
+        Record that a job finished and drop the oldest finished jobs beyond the history.
+        """
+        self.finished.append(job.id)
+        while len(self.finished) > self.history:
+            self.jobs.pop(self.finished.popleft(), None)
+
+    async def handle(self, reader, writer):
+        try:
+            method, path, body = await self.read_request(reader)
+            await self.route(method, path, body, writer)
+        except HTTPError as e:
+            self.respond(writer, e.status, {'error': str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            self.respond(writer, 500, {'error': '%s: %s' % (type(e).__name__, e)})
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+            except ConnectionError:
+                pass
+
+    async def read_request(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            raise HTTPError(400, 'Malformed request line')
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPError(400, 'Invalid Content-Length: {}'.format(headers['content-length']))
+        body = await reader.readexactly(length)
+        return request_line[0], request_line[1], body
+
+    async def route(self, method, path, body, writer):
+        parts = [part for part in path.split('?')[0].split('/') if part]
+        if parts == ['jobs'] and method == 'POST':
+            try:
+                request = json.loads(body or b'null')
+            except ValueError:
+                raise HTTPError(400, 'Request body is not valid JSON')
+            job = self.submit(request)
+            self.respond(writer, 202, {'id': job.id, 'status': job.status})
+        elif parts == ['algorithms'] and method == 'GET':
+            self.respond(writer, 200, {name: algorithms.parameter_schema(name) for name in algorithms.names()})
+        elif parts == ['jobs'] and method == 'GET':
+            self.respond(writer, 200, [job.state() for job in self.jobs.values()])
+        elif len(parts) in (2, 3) and parts[0] == 'jobs' and method == 'GET':
+            job = self.jobs.get(int(parts[1])) if parts[1].isdigit() else None
+            if job is None:
+                raise HTTPError(404, 'Job not found: {}'.format(parts[1]))
+            if len(parts) == 2:
+                self.respond(writer, 200, job.state())
+            elif parts[2] == 'events':
+                await self.stream(job, writer)
+            else:
+                raise HTTPError(404, 'Not found: {}'.format(path))
+        elif parts and parts[0] == 'jobs':
+            raise HTTPError(405, 'Method not allowed: {}'.format(method))
+        else:
+            raise HTTPError(404, 'Not found: {}'.format(path))
+
+    def respond(self, writer, status, data):
+        body = json.dumps(data).encode()
+        writer.write((
+            'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: close\r\n\r\n'
+            % (status, self.reasons[status], len(body))
+        ).encode() + body)
+
+    async def stream(self, job, writer):
+        """
+        Send the job state as a JSON line whenever it changes, using chunked transfer encoding.
+        """
+        writer.write(
+            b'HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n'
+            b'Connection: close\r\n\r\n'
+        )
+        while True:
+            changed = job.changed
+            line = json.dumps(job.state()).encode() + b'\n'
+            writer.write(b'%x\r\n%s\r\n' % (len(line), line))
+            await writer.drain()
+            if job.done():
+                break
+            await changed.wait()
+        writer.write(b'0\r\n\r\n')
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    server = JobServer(args.workers, args.concurrency, args.queue, args.cache, args.history)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
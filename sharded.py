@@ -0,0 +1,170 @@
+"""
+Simulate a partitioned workload as independent shards, e.g. one per machine or tenant, and merge
+their metrics.
+
+Processes are assigned to shards by a hash of a partition column, every shard runs its own
+scheduler in a worker process, and each worker sends back only sums and quantile sketches, so
+merging costs the same however many processes a shard has. Sums merge exactly; quantiles are
+within the relative accuracy of the sketches.
+"""
+import argparse
+import json
+import multiprocessing
+import time
+import zlib
+
+from batch import algorithm_name, create_algorithm
+from dataset import Dataset
+from sketch import QuantileSketch
+
+parser = argparse.ArgumentParser(description='Simulate a workload split into independent shards.')
+parser.add_argument('-p', '--process', type=str, help='process.json or trace file')
+parser.add_argument('-a', '--algorithm', type=algorithm_name, help='algorithm name')
+parser.add_argument('-k', '--key', type=str, default='pid', help='Column the workload is partitioned by')
+parser.add_argument('-n', '--shards', type=int, default=None, help='Number of shards, one per worker by default')
+parser.add_argument('-w', '--workers', type=int, default=None, help='Number of worker processes')
+parser.add_argument('-o', '--output', type=str, default=None, help='Output JSON file')
+
+# Dataset attribute of every partition column
+COLUMNS = {
+    'pid': 'pids',
+    'arrival_time': 'arrival_times',
+    'burst_time': 'burst_times',
+    'priority': 'priorities',
+    'group': 'groups',
+}
+
+QUANTILES = [0.5, 0.9, 0.99]
+
+TIMES = ['waiting_time', 'turnaround_time', 'response_time']
+
+# Shards of the current run, inherited by the worker processes
+_shards = []
+
+
+def shard_of(value, shards):
+    """
+    Stable hash partitioning, independent of the interpreter's hash seed.
+    """
+    return zlib.crc32(str(value).encode()) % shards
+
+
+def split(dataset, key, shards):
+    """
+    Split a dataset into shards by the hash of a column. Shards keep the arrival order of the dataset.
+    :return: list of datasets, some of them possibly empty
+    """
+    if key not in COLUMNS or getattr(dataset, COLUMNS[key]) is None:
+        raise ValueError('Unknown partition column: {}'.format(key))
+    rows = [[] for _ in range(shards)]
+    for i, value in enumerate(getattr(dataset, COLUMNS[key])):
+        rows[shard_of(value, shards)].append(i)
+    return [
+        Dataset(
+            [dataset.pids[i] for i in indexes],
+            [dataset.arrival_times[i] for i in indexes],
+            [dataset.burst_times[i] for i in indexes],
+            [dataset.priorities[i] for i in indexes],
+            sorted_by=dataset.sorted_by,
+            groups=[dataset.groups[i] for i in indexes] if dataset.groups is not None else None,
+            deadlines=[dataset.deadlines[i] for i in indexes] if dataset.deadlines is not None else None,
+            periods=[dataset.periods[i] for i in indexes] if dataset.periods is not None else None,
+            cpus=[dataset.cpus[i] for i in indexes] if dataset.cpus is not None else None
+        )
+        for indexes in rows
+    ]
+
+
+class ShardResult:
+    """
+    Mergeable summary of the run of one or more shards.
+    """
+
+    def __init__(self):
+        self.shards = 0
+        self.processes = 0
+        self.total_time = 0
+        self.busy_time = 0
+        self.sketches = {name: QuantileSketch() for name in TIMES}
+
+    @classmethod
+    def from_run(cls, result):
+        summary = cls()
+        processes = result['processes']
+        summary.shards = 1
+        summary.processes = len(processes)
+        summary.total_time = result['total_time']
+        summary.busy_time = result['total_time'] * result['cpu_utilization']
+        for name in TIMES:
+            summary.sketches[name].add(processes[name])
+        return summary
+
+    def merge(self, other):
+        self.shards += other.shards
+        self.processes += other.processes
+        # Shards run side by side, so the whole run takes as long as the longest shard
+        self.total_time = max(self.total_time, other.total_time)
+        self.busy_time += other.busy_time
+        for name in TIMES:
+            self.sketches[name].merge(other.sketches[name])
+        return self
+
+    def result(self):
+        """
+        :return: dict with the metrics of BaseAlgorithm.result, minus the processes, plus quantiles
+                 of every time. cpu_utilization is the busy time of all shards over shards * total_time
+        """
+        result = {
+            'shards': self.shards,
+            'processes': self.processes,
+            'total_time': self.total_time,
+            'cpu_utilization': self.busy_time / (self.shards * self.total_time),
+            'throughput': self.processes / self.total_time,
+        }
+        for name in TIMES:
+            sketch = self.sketches[name]
+            result['average_' + name] = sketch.mean()
+            for q in QUANTILES:
+                result['p%g_%s' % (q * 100, name)] = sketch.quantile(q)
+        return result
+
+
+def run_shard(args):
+    """
+    Run one shard in a worker process.
+    """
+    index, algorithm = args
+    return ShardResult.from_run(create_algorithm(_shards[index], algorithm, {}).run())
+
+
+def _init_worker(shards):
+    _shards[:] = shards
+
+
+def run(dataset, algorithm, key='pid', shards=None, workers=None):
+    """
+    Simulate every shard of a dataset and merge the results.
+    :return: same as ShardResult.result
+    """
+    workers = workers or multiprocessing.cpu_count()
+    datasets = split(dataset, key, shards or workers)
+    # Largest shards first, so the last shards to finish are short ones
+    order = sorted((i for i, shard in enumerate(datasets) if len(shard)), key=lambda i: -len(datasets[i]))
+    total = ShardResult()
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(datasets,)) as pool:
+        for summary in pool.imap_unordered(run_shard, [(i, algorithm) for i in order]):
+            total.merge(summary)
+    return total.result()
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    dataset = Dataset.load(args.process)
+    start_time = time.time()
+    result = run(dataset, args.algorithm, args.key, args.shards, args.workers)
+    print('Simulation time: %.10f s' % (time.time() - start_time))
+    for name, value in result.items():
+        print('%s: %s' % (name, value))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
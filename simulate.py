@@ -2,17 +2,30 @@
 Run simulation with given process.json and algorithm, then plot the result.
 """
 import argparse
-import json
 import time
 
 from matplotlib import pyplot as plt
 
 import algorithms
-from process import Process
+from algorithms.prediction import PREDICTION_KEYS
+from dataset import Dataset
+from results import open_sink
+from telemetry import Telemetry
 
 parser = argparse.ArgumentParser(description='Simulate the scheduling algorithm.')
 parser.add_argument('-p', '--process', type=str, help='process.json file')
 parser.add_argument('-a', '--algorithm', type=str, help='algorithm name')
+parser.add_argument('-l', '--list', action='store_true', help='List the algorithms and their parameters')
+parser.add_argument('-o', '--output', type=str, default=None,
+                    help='Save the result of every process to this file (.csv, or a trace file otherwise)')
+parser.add_argument('-t', '--telemetry', type=float, default=None, metavar='SECONDS',
+                    help='Report the progress of the run to stderr every this many seconds, 0 for every check')
+parser.add_argument('--telemetry-output', type=str, default=None,
+                    help='Write the progress reports to this JSON lines file instead of stderr')
+parser.add_argument('--tracemalloc', action='store_true', help='Report the peak of traced Python allocations')
+parser.add_argument('--predict', type=str, default=None, choices=PREDICTION_KEYS,
+                    help='Run SJF in prediction mode, averaging burst times by this property, '
+                         'and compare it with the run on the real burst times')
 
 
 class Simulate:
@@ -26,10 +39,21 @@ class Simulate:
     6. Average response time
     """
 
-    def __init__(self, process_file, algorithm):
+    def __init__(self, process_file, algorithm, output=None, telemetry=None, params=None):
+        """
+        :param output: file to save the result of every process to, see results.open_sink
+        :param telemetry: Telemetry observer reporting the progress of the run, or None
+        :param params: parameters to set on the algorithm, see algorithms.parameter_schema
+        """
         self.process_file = process_file
         self.algorithm = algorithm
+        self.params = params or {}
+        self.output = output
+        self.telemetry = telemetry
         self.processes = []
+        # Result records of the processes, see results.py
+        self.results = None
+        self.sorted_by = ()
         self.process_num = 0
         self.cpu_utilization = 0
         self.throughput = 0
@@ -38,33 +62,34 @@ class Simulate:
         self.average_response_time = 0.0
         self.run_time = 0
         self.cpu_total_time = 0
+        # Per-group metrics of the algorithms which report them
+        self.groups = None
+        # Deadline metrics of workloads with deadlines
+        self.deadlines = None
+        # CPUs of the machine and bounded slowdowns of the backfilling algorithms
+        self.cpus = None
+        self.average_bounded_slowdown = None
+        self.max_bounded_slowdown = None
+        # Errors of the predicted burst times of the SJF algorithms in prediction mode
+        self.prediction = None
 
         # Get the algorithm class
         try:
-            self.AlgorithmClass = getattr(algorithms, self.algorithm)
-        except AttributeError:
-            print('Algorithm not found.')
+            self.AlgorithmClass = algorithms.get_algorithm(self.algorithm)
+            algorithms.validate_params(self.algorithm, self.params)
+        except ValueError as e:
+            print(e)
             exit(1)
             return
 
     def read_process(self):
         """
-        Read process.json file and store the processes in self.processes.
+        Read process.json or trace file and store the processes in self.processes.
         """
-        with open(self.process_file, 'r') as f:
-            data = json.load(f)
-            for process in data:
-                self.processes.append(
-                    Process(
-                        pid=process['pid'],
-                        arrival_time=process['arrival_time'],
-                        burst_time=process['burst_time'],
-                        priority=process['priority'],
-                        compare_prop=self.AlgorithmClass.process_compare_prop
-                    )
-                )
-                self.process_num += 1
-        self.processes.sort(key=lambda x: x.arrival_time)
+        dataset = Dataset.load(self.process_file)
+        self.processes = dataset.processes(self.AlgorithmClass.process_compare_prop)
+        self.sorted_by = dataset.sorted_by
+        self.process_num = len(dataset)
 
     def run(self):
         """
@@ -74,13 +99,22 @@ class Simulate:
         self.read_process()
 
         # Create the algorithm instance
-        algorithm = self.AlgorithmClass(self.processes)
+        algorithm = self.AlgorithmClass(self.processes, self.sorted_by)
+        for name, value in self.params.items():
+            setattr(algorithm, name, value)
+        if self.output:
+            algorithm.executed_processes = open_sink(self.output)
+        if self.telemetry is not None:
+            self.telemetry.total = self.process_num
+            algorithm.observers.append(self.telemetry)
 
         # Start python timer
         start_time = time.time()
 
         # Run the algorithm
         result = algorithm.run()
+        if self.telemetry is not None:
+            self.telemetry.finish(algorithm)
 
         # End python timer
         end_time = time.time()
@@ -94,8 +128,14 @@ class Simulate:
         self.average_waiting_time = result['average_waiting_time']
         self.average_turnaround_time = result['average_turnaround_time']
         self.average_response_time = result['average_response_time']
-        self.processes = result['processes']
+        self.results = result['processes']
         self.cpu_total_time = result['total_time']
+        self.groups = result.get('groups')
+        self.deadlines = result.get('deadlines')
+        self.cpus = result.get('cpus')
+        self.average_bounded_slowdown = result.get('average_bounded_slowdown')
+        self.max_bounded_slowdown = result.get('max_bounded_slowdown')
+        self.prediction = result.get('prediction')
 
     def print(self):
         """
@@ -109,34 +149,65 @@ class Simulate:
         """
         print('Simulation time: %.10f s' % self.run_time)
         print('CPU total time: %.0f' % self.cpu_total_time)
+        if self.cpus is not None:
+            print('CPUs: %d' % self.cpus)
         print('CPU utilization: %f%%' % (self.cpu_utilization * 100))
         print('Throughput: %.6f' % self.throughput)
         print('Average waiting time: %.2f' % self.average_waiting_time)
         print('Average turnaround time: %.2f' % self.average_turnaround_time)
         print('Average response time: %.2f' % self.average_response_time)
-
-    def plot_subset(self, processes, name, subplot):
+        if self.average_bounded_slowdown is not None:
+            print('Bounded slowdown: average %.2f, max %.2f' % (self.average_bounded_slowdown, self.max_bounded_slowdown))
+        if self.prediction:
+            print('Burst prediction by %s (alpha %g, %d keys): average error %.2f, average absolute error %.2f (%.2f%% of the burst time)' % (
+                self.prediction['key'], self.prediction['alpha'], self.prediction['keys'],
+                self.prediction['average_error'], self.prediction['average_absolute_error'],
+                self.prediction['relative_absolute_error'] * 100
+            ))
+            print('Absolute error: p50 %.2f, p90 %.2f, p99 %.2f, max %.2f, RMSE %.2f' % (
+                self.prediction['p50_absolute_error'], self.prediction['p90_absolute_error'],
+                self.prediction['p99_absolute_error'], self.prediction['max_absolute_error'], self.prediction['rmse']
+            ))
+        if self.output:
+            print('Results saved to %s' % self.output)
+        if self.groups:
+            print('%-24s %8s %10s %10s %12s %12s' % ('Group', 'Weight', 'Processes', 'CPU share', 'Avg waiting', 'Avg response'))
+            for name, group in self.groups.items():
+                print('%-24s %8g %10d %9.2f%% %12.2f %12.2f' % (
+                    name, group['weight'], group['processes'], group['cpu_share'] * 100,
+                    group['average_waiting_time'], group['average_response_time']
+                ))
+        if self.deadlines:
+            print('Deadline misses: %d of %d (%.2f%%)' % (
+                self.deadlines['missed'], self.deadlines['processes'], self.deadlines['miss_rate'] * 100
+            ))
+            print('Lateness: average %.2f, p50 %.2f, p90 %.2f, p99 %.2f, max %.2f' % (
+                self.deadlines['average_lateness'], self.deadlines['p50_lateness'], self.deadlines['p90_lateness'],
+                self.deadlines['p99_lateness'], self.deadlines['max_lateness']
+            ))
+            print('Tardiness: total %.2f, average %.2f, max %.2f' % (
+                self.deadlines['total_tardiness'], self.deadlines['average_tardiness'],
+                self.deadlines['max_tardiness']
+            ))
+
+    def print_oracle(self, oracle):
         """
-        Plot the processes with given name.
+        Print the averages of this run next to those of a run of the same algorithm on the real burst times.
+        :param oracle: Simulate instance of the run on the real burst times, already run
         """
-        # Create a list of waiting time
-        waiting_time = []
-        for process in processes:
-            waiting_time.append(process.waiting_time)
-
-        # Create a list of turnaround time
-        turnaround_time = []
-        for process in processes:
-            turnaround_time.append(process.turnaround_time)
-
-        # Create a list of response time
-        response_time = []
-        for process in processes:
-            response_time.append(process.response_time)
+        print('%-24s %12s %12s' % ('', 'Oracle', 'Predicted'))
+        for label, name in (('Average waiting time', 'average_waiting_time'),
+                            ('Average turnaround time', 'average_turnaround_time'),
+                            ('Average response time', 'average_response_time')):
+            print('%-24s %12.2f %12.2f' % (label, getattr(oracle, name), getattr(self, name)))
 
+    def plot_subset(self, results, name, subplot):
+        """
+        Plot the result records with given name.
+        """
         # Construct the box plot
         bp = subplot.boxplot(
-            [waiting_time, turnaround_time, response_time],
+            [results['waiting_time'], results['turnaround_time'], results['response_time']],
             labels=['Waiting time', 'Turnaround time', 'Response time'],
             patch_artist=True
         )
@@ -196,14 +267,14 @@ class Simulate:
         high_priority_processes_subplot = fig.add_subplot(223, sharey=all_processes_subplot)
 
         # Plot the processes
-        self.plot_subset(self.processes, 'All processes', all_processes_subplot)
+        self.plot_subset(self.results, 'All processes', all_processes_subplot)
         self.plot_subset(
-            [process for process in self.processes if process.burst_time <= 10],
+            self.results[self.results['burst_time'] <= 10],
             'Processes with burst time less than or equal to 10',
             short_processes_subplot
         )
         self.plot_subset(
-            [process for process in self.processes if process.priority <= 5],
+            self.results[self.results['priority'] <= 5],
             'Processes with priority less than or equal to 5',
             high_priority_processes_subplot
         )
@@ -245,7 +316,26 @@ class Simulate:
 
 if __name__ == '__main__':
     args = parser.parse_args()
-    simulate = Simulate(args.process, args.algorithm)
+    if args.list:
+        for name in algorithms.names():
+            print(name)
+            for parameter, spec in algorithms.parameter_schema(name).items():
+                print('  %s (%s, default %s): %s' % (parameter, spec['type'], spec['default'], spec['description']))
+        exit(0)
+    telemetry = None
+    if args.telemetry is not None and args.telemetry < 0:
+        parser.error('--telemetry must not be negative')
+    if args.telemetry is not None or args.telemetry_output is not None:
+        telemetry = Telemetry(args.telemetry if args.telemetry is not None else 1.0, args.telemetry_output, trace_memory=args.tracemalloc)
+    params = None
+    oracle = None
+    if args.predict is not None:
+        params = {'prediction': True, 'prediction_key': args.predict}
+        oracle = Simulate(args.process, args.algorithm)
+    simulate = Simulate(args.process, args.algorithm, args.output, telemetry, params)
     simulate.run()
     simulate.print()
+    if oracle is not None:
+        oracle.run()
+        simulate.print_oracle(oracle)
     simulate.plot()
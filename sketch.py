@@ -0,0 +1,103 @@
+"""
+Mergeable quantile sketch with relative accuracy (DDSketch).
+
+Values are counted in logarithmic buckets, so every quantile is returned within a relative error
+of `relative_accuracy` of the exact one, using memory logarithmic in the range of the values.
+Merging two sketches adds their bucket counts, which gives exactly the sketch of the combined
+values; shards can be sketched separately and merged in any order.
+"""
+import math
+
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Sketch of a stream of values. Values smaller in magnitude than `min_value` are counted as 0.
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    def add(self, values):
+        """
+        Add a sequence of values.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        small = np.abs(values) < self.min_value
+        self.zero_count += int(small.sum())
+        self.count_buckets(self.positive, values[~small & (values > 0)])
+        self.count_buckets(self.negative, -values[~small & (values < 0)])
+
+    def count_buckets(self, buckets, values):
+        if not len(values):
+            return
+        indexes, counts = np.unique(np.ceil(np.log(values) / self.log_gamma).astype(np.int64), return_counts=True)
+        for index, count in zip(indexes.tolist(), counts.tolist()):
+            buckets[index] = buckets.get(index, 0) + count
+
+    def merge(self, other):
+        """
+        Add the values of another sketch with the same relative accuracy.
+        """
+        if other.gamma != self.gamma or other.min_value != self.min_value:
+            raise ValueError('Only sketches with the same relative accuracy can be merged')
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_buckets.items():
+                buckets[index] = buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def value(self, index):
+        """
+        :return: representative value of a bucket, within relative_accuracy of every value in it
+        """
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q):
+        """
+        :param q: quantile between 0 and 1
+        :return: estimate of the q-quantile, None if the sketch is empty
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return max(-self.value(index), self.min)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return min(self.value(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
@@ -0,0 +1,165 @@
+"""
+Progress and runtime telemetry of a running simulation.
+
+Telemetry is an observer, so it works with every algorithm through the scheduling loop they share.
+Most steps only count down to the next check of the wall clock, so it costs next to nothing; every
+`interval` seconds it reports the processes completed, the simulated time, scheduling steps per
+second, simulated time per wall-clock second, the ready-queue depth, the peak memory and an ETA, as
+a line on stderr or a JSON line in a file.
+"""
+import json
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where the peak RSS is not reported
+    resource = None
+
+# Number of steps between two reads of the wall clock
+CHECK_EVERY = 256
+
+
+def peak_rss():
+    """
+    :return: peak resident set size of this process in MB, or None if unknown
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class Telemetry:
+    """
+    Observer reporting the progress of a run every `interval` seconds of wall time.
+    """
+
+    def __init__(self, interval=1.0, output=None, total=None, trace_memory=False):
+        """
+        :param interval: seconds between two reports
+        :param output: path of a JSON lines file to write the reports to, stderr if None
+        :param total: number of processes of the run, for the ETA; if None, the processes pending
+                      and executed at the first step
+        :param trace_memory: trace Python allocations with tracemalloc to report their peak, which
+                             slows the run down noticeably. The peak is reported anyway if tracemalloc
+                             was started elsewhere.
+        """
+        self.interval = interval
+        self.output = output
+        self.file = None
+        self.total = total
+        self.trace_memory = trace_memory
+        self.tracing = False
+        self.countdown = 1
+        self.steps = 0
+        self.start = None
+        self.next_report = None
+        self.last = None
+
+    def __call__(self, algorithm):
+        self.countdown -= 1
+        if self.countdown:
+            return
+        self.steps += CHECK_EVERY if self.start is not None else 1
+        self.countdown = CHECK_EVERY
+        now = time.monotonic()
+        if self.start is None:
+            self.begin(algorithm, now)
+        elif now >= self.next_report:
+            self.report(algorithm, now)
+
+    def begin(self, algorithm, now):
+        """
+        Start timing at the first step of a run.
+        """
+        if self.total is None:
+            self.total = len(algorithm.arrivals) + len(algorithm.executed_processes)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.tracing = True
+        if self.output is not None:
+            self.file = open(self.output, 'w')
+        self.start = now
+        self.next_report = now + self.interval
+        self.last = (now, self.steps, algorithm.time)
+
+    def finish(self, algorithm):
+        """
+        Report the end of a finished run and close the output file.
+        """
+        if self.start is None:
+            self.begin(algorithm, time.monotonic())
+        self.steps += CHECK_EVERY - self.countdown
+        self.countdown = CHECK_EVERY
+        self.report(algorithm, time.monotonic(), done=True)
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def sample(self, algorithm, now, done=False):
+        """
+        :return: dict of the current progress; rates are over the time since the last report
+        """
+        last_wall_time, last_steps, last_time = self.last
+        wall_time = now - self.start
+        since = now - last_wall_time
+        completed = len(algorithm.executed_processes)
+        sample = {
+            'wall_time': wall_time,
+            'completed': completed,
+            'total': self.total,
+            'simulated_time': algorithm.time,
+            'steps': self.steps,
+            'events_per_second': (self.steps - last_steps) / since if since > 0 else None,
+            'sim_wall_ratio': (algorithm.time - last_time) / since if since > 0 else None,
+            'ready': algorithm.ready_count(),
+            'peak_rss_mb': peak_rss(),
+            'traced_peak_mb': tracemalloc.get_traced_memory()[1] / (1024 * 1024) if tracemalloc.is_tracing() else None,
+            'eta': None,
+            'done': done,
+        }
+        if done:
+            sample['eta'] = 0.0
+        elif completed and self.total:
+            sample['eta'] = wall_time * (self.total - completed) / completed
+        return sample
+
+    def report(self, algorithm, now, done=False):
+        sample = self.sample(algorithm, now, done)
+        if self.file is not None:
+            self.file.write(json.dumps(sample) + '\n')
+            self.file.flush()
+        else:
+            print(format_sample(sample), file=sys.stderr)
+        self.last = (now, self.steps, algorithm.time)
+        self.next_report = now + self.interval
+
+
+def format_sample(sample):
+    """
+    :return: one line describing a telemetry sample
+    """
+    parts = ['%d/%s processes' % (sample['completed'], sample['total'] if sample['total'] is not None else '?')]
+    if sample['total']:
+        parts[0] += ' (%.1f%%)' % (100 * sample['completed'] / sample['total'])
+    parts.append('simulated time %.0f' % sample['simulated_time'])
+    if sample['events_per_second'] is not None:
+        parts.append('%.0f steps/s' % sample['events_per_second'])
+        parts.append('sim/wall %.3g' % sample['sim_wall_ratio'])
+    parts.append('ready %d' % sample['ready'])
+    if sample['peak_rss_mb'] is not None:
+        parts.append('peak RSS %.0f MB' % sample['peak_rss_mb'])
+    if sample['traced_peak_mb'] is not None:
+        parts.append('traced peak %.1f MB' % sample['traced_peak_mb'])
+    if sample['done']:
+        parts.append('done in %.1f s' % sample['wall_time'])
+    elif sample['eta'] is not None:
+        parts.append('ETA %.0f s' % sample['eta'])
+    return '[telemetry] ' + ', '.join(parts)
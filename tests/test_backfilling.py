@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from algorithms.profile import AvailabilityProfile
+from batch import create_algorithm
+from dataset import Dataset
+
+
+def wide_jobs(rng, count=300, cpus=16):
+    return [
+        {'pid': pid, 'arrival_time': rng.randint(0, 400), 'burst_time': rng.randint(0, 30),
+         'priority': 0, 'cpus': rng.randint(1, cpus)}
+        for pid in range(count)
+    ]
+
+
+def peak_usage(jobs, records):
+    """
+    :return: most CPUs used at once by the scheduled jobs
+    """
+    cpus = {job['pid']: job['cpus'] for job in jobs}
+    events = []
+    for pid, start, end in zip(records['pid'].tolist(), records['start_time'].tolist(), records['end_time'].tolist()):
+        if end > start:
+            events.append((start, cpus[pid]))
+            events.append((end, -cpus[pid]))
+    # Ends before starts at the same time
+    events.sort(key=lambda event: (event[0], event[1]))
+    used = peak = 0
+    for _, change in events:
+        used += change
+        peak = max(peak, used)
+    return peak
+
+
+@pytest.mark.parametrize('name', ['EASYBackfilling', 'ConservativeBackfilling'])
+@pytest.mark.parametrize('seed', range(10))
+def test_never_overcommits(name, seed):
+    """
+    The jobs running at any time never need more CPUs than the machine has, and none starts
+    before it arrives.
+    """
+    rng = random.Random(seed)
+    jobs = wide_jobs(rng)
+    result = create_algorithm(Dataset.from_jobs(jobs), name, {'cpus': 16}).run()
+    records = result['processes']
+    assert len(records) == len(jobs)
+    assert (records['start_time'] >= records['arrival_time']).all()
+    assert peak_usage(jobs, records) <= 16
+    assert 0 < result['cpu_utilization'] <= 1
+
+
+def test_too_wide():
+    jobs = [{'pid': 0, 'arrival_time': 0, 'burst_time': 5, 'priority': 0, 'cpus': 8}]
+    with pytest.raises(ValueError):
+        create_algorithm(Dataset.from_jobs(jobs), 'EASYBackfilling', {'cpus': 4}).run()
+
+
+def brute_force_start(reservations, now, cpus, duration, machine):
+    """
+    :return: earliest time from now on at which cpus CPUs are free for duration, trying now and
+             every end of a reservation, where CPUs become free
+    """
+    def free(time):
+        return machine - sum(used for start, end, used in reservations if start <= time < end)
+    for time in sorted({now} | {end for _, end, _ in reservations if end > now}):
+        drops = [start for start, _, _ in reservations if time < start < time + duration]
+        if all(free(t) >= cpus for t in [time] + drops):
+            return time
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_profile_earliest_start(seed):
+    """
+    The earliest window the profile finds is the earliest one that fits.
+    """
+    rng = random.Random(seed)
+    machine = rng.randint(1, 16)
+    profile = AvailabilityProfile(machine)
+    reservations = []
+    now = 0
+    for _ in range(200):
+        if rng.random() < 0.2:
+            now += rng.randint(0, 10)
+            profile.advance(now)
+        cpus, duration = rng.randint(1, machine), rng.randint(1, 20)
+        start = profile.earliest_start(cpus, duration)
+        assert start == brute_force_start(reservations, now, cpus, duration, machine)
+        profile.reserve(start, duration, cpus)
+        reservations.append((start, start + duration, cpus))
+        assert profile.free_at(now) == machine - sum(
+            used for start, end, used in reservations if start <= now < end)
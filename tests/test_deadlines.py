@@ -0,0 +1,81 @@
+import random
+
+import numpy as np
+import pytest
+
+from algorithms.base_algorithm import deadline_results
+from batch import create_algorithm
+from dataset import Dataset
+
+
+def job(pid, arrival_time, burst_time, **deadline):
+    return dict(pid=pid, arrival_time=arrival_time, burst_time=burst_time, priority=0, **deadline)
+
+
+def run(name, jobs, **params):
+    return create_algorithm(Dataset.from_jobs(jobs), name, params).run()
+
+
+def end_times(result):
+    records = result['processes']
+    return dict(zip(records['pid'].tolist(), records['end_time'].tolist()))
+
+
+def test_edf_misses():
+    """
+    B preempts A, C ties with B and waits for it, then misses its deadline.
+    """
+    result = run('EDF', [job('A', 0, 4, deadline=10), job('B', 1, 2, deadline=3), job('C', 2, 3, deadline=2)])
+    assert end_times(result) == {'A': 9, 'B': 3, 'C': 6}
+    deadlines = result['deadlines']
+    assert deadlines['processes'] == 3
+    assert deadlines['missed'] == 1
+    assert deadlines['miss_rate'] == pytest.approx(1 / 3)
+    assert deadlines['average_lateness'] == 0
+    assert deadlines['max_lateness'] == 2
+    assert deadlines['total_tardiness'] == 2
+    assert deadlines['average_tardiness'] == pytest.approx(2 / 3)
+
+
+def test_llf_misses():
+    """
+    C has the least laxity and runs until B has less, which then runs and still misses.
+    """
+    result = run('LLF', [job('A', 0, 6, deadline=10), job('B', 0, 1, deadline=3), job('C', 0, 5, deadline=5)])
+    assert end_times(result) == {'A': 12, 'B': 4, 'C': 6}
+    deadlines = result['deadlines']
+    assert deadlines['missed'] == 3
+    assert deadlines['miss_rate'] == 1
+    assert deadlines['max_lateness'] == 2
+    assert deadlines['total_tardiness'] == 4
+
+
+def test_periods_and_no_deadline():
+    """
+    A period is the deadline of a process without one, and processes with neither are not counted.
+    """
+    result = run('EDF', [job(0, 0, 5), job(1, 0, 2, period=1), job(2, 0, 1, deadline=10)])
+    assert result['deadlines']['processes'] == 2
+    assert result['deadlines']['missed'] == 1
+    assert result['deadlines']['max_lateness'] == 1
+    assert 'deadlines' not in run('EDF', [job(0, 0, 5), job(1, 1, 2)])
+
+
+@pytest.mark.parametrize('name', ['EDF', 'LLF', 'FIFO'])
+@pytest.mark.parametrize('seed', range(5))
+def test_metrics_match_records(name, seed):
+    """
+    The deadline metrics summarize the end time minus the due time of the result records.
+    """
+    rng = random.Random(seed)
+    jobs = []
+    for pid in range(200):
+        deadline = {}
+        if rng.random() < 0.7:
+            deadline['deadline'] = rng.randint(1, 40)
+        jobs.append(job(pid, rng.randint(0, 1000), rng.randint(1, 10), **deadline))
+    result = run(name, jobs)
+    records = result['processes']
+    due = ~np.isnan(records['due_time'])
+    expected = deadline_results(records['end_time'][due] - records['due_time'][due])
+    assert result['deadlines'] == pytest.approx(expected)
@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+import pytest
+
+from batch import create_algorithm
+from dataset import Dataset
+
+
+def random_jobs(seed, count=500, arrivals=100):
+    rng = random.Random(seed)
+    return [
+        {'pid': pid, 'arrival_time': rng.randint(0, arrivals), 'burst_time': rng.randint(0, 20),
+         'priority': rng.randint(0, 10)}
+        for pid in range(count)
+    ]
+
+
+def run(name, jobs, observer=None, **params):
+    instance = create_algorithm(Dataset.from_jobs(jobs), name, params)
+    if observer is not None:
+        instance.observers.append(observer)
+    return instance.run()
+
+
+@pytest.mark.parametrize('name', ['NonPreemptiveSJF', 'NonPreemptivePriority'])
+@pytest.mark.parametrize('seed', range(5))
+def test_drain_matches_loop(name, seed):
+    """
+    Finishing the run at once after the last arrival gives the same schedule and totals as the
+    step-by-step loop, which runs whenever an observer is attached.
+    """
+    jobs = random_jobs(seed)
+    drained = run(name, jobs)
+    stepped = run(name, jobs, observer=lambda algorithm: None)
+    for field in drained['processes'].dtype.names:
+        np.testing.assert_array_equal(drained['processes'][field], stepped['processes'][field])
+    for key in ('total_time', 'cpu_utilization', 'average_waiting_time', 'average_turnaround_time',
+                'average_response_time'):
+        assert drained[key] == pytest.approx(stepped[key])
+
+
+@pytest.mark.parametrize('name', ['NonPreemptiveSJF', 'NonPreemptivePriority'])
+def test_observer_sees_every_job(name):
+    """
+    Observers keep being called after the last arrival, at least once for every job, which they see running.
+    """
+    jobs = [dict(job, burst_time=job['burst_time'] + 1) for job in random_jobs(0)]
+    calls = []
+
+    def observer(algorithm):
+        calls.append(algorithm.running_process.pid if algorithm.running_process is not None else None)
+
+    run(name, jobs, observer)
+    assert len(calls) >= len(jobs)
+    assert set(calls) - {None} == {job['pid'] for job in jobs}
+
+
+def test_drain_updates_predictor():
+    """
+    The predictor learns from the processes finished by drain, and reports every prediction.
+    """
+    jobs = random_jobs(1)
+    result = run('NonPreemptiveSJF', jobs, prediction=True, prediction_key='priority')
+    assert result['prediction']['processes'] == len(jobs)
+
+    instance = create_algorithm(Dataset.from_jobs(jobs), 'NonPreemptiveSJF',
+                                {'prediction': True, 'prediction_key': 'global', 'alpha': 1})
+    instance.run()
+    # With alpha 1 the estimate is the burst time of the last process to finish
+    last = instance.executed_processes.records()[-1]
+    assert instance.predictor.estimates[0] == last['burst_time']
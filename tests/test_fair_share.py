@@ -0,0 +1,71 @@
+import pytest
+
+from batch import create_algorithm
+from dataset import Dataset
+
+
+def job(pid, group, burst_time, arrival_time=0):
+    return {'pid': pid, 'arrival_time': arrival_time, 'burst_time': burst_time, 'priority': 0, 'group': group}
+
+
+def cpu_times_at(jobs, time, **params):
+    """
+    :return: CPU time of every group by path once the clock reaches time, and the result of the run
+    """
+    instance = create_algorithm(Dataset.from_jobs(jobs), 'FairShare', params)
+    sample = {}
+
+    def observe(algorithm):
+        if not sample and algorithm.time >= time:
+            sample.update((name, group.cpu_time) for name, group in algorithm.groups.items())
+    instance.observers.append(observe)
+    return sample, instance.run()
+
+
+def test_weights():
+    """
+    Busy groups share the CPU in proportion to their weights.
+    """
+    jobs = [job(0, 'a', 10000), job(1, 'b', 10000)]
+    sample, _ = cpu_times_at(jobs, 4000, quantum=1, weights={'a': 3, 'b': 1})
+    assert sample['a'] == pytest.approx(3000, abs=2)
+    assert sample['b'] == pytest.approx(1000, abs=2)
+
+
+def test_hierarchy():
+    """
+    Subgroups share the part of their parent, level by level, however many processes they have.
+    """
+    jobs = [job(0, 'acme/batch', 10000), job(1, 'acme/batch', 10000), job(2, 'acme/batch', 10000),
+            job(3, 'acme/web', 10000), job(4, 'globex', 10000)]
+    sample, _ = cpu_times_at(jobs, 4000, quantum=2)
+    assert sample['acme'] == pytest.approx(2000, abs=4)
+    assert sample['globex'] == pytest.approx(2000, abs=4)
+    assert sample['acme/batch'] == pytest.approx(1000, abs=4)
+    assert sample['acme/web'] == pytest.approx(1000, abs=4)
+
+
+def test_no_saving_up():
+    """
+    A group which had nothing to run does not get the CPU to itself to catch up when a process arrives.
+    """
+    jobs = [job(0, 'a', 10000), job(1, 'b', 10000, arrival_time=2000)]
+    sample, _ = cpu_times_at(jobs, 3000, quantum=1)
+    assert sample['a'] == pytest.approx(2500, abs=2)
+    assert sample['b'] == pytest.approx(500, abs=2)
+
+
+def test_group_results():
+    jobs = [job(0, 'a', 30), job(1, 'a', 10), job(2, 'b', 20), job(3, None, 40, arrival_time=100)]
+    result = create_algorithm(Dataset.from_jobs(jobs), 'FairShare', {}).run()
+    groups = result['groups']
+    assert sorted(groups) == ['a', 'b', 'default']
+    assert [groups[name]['processes'] for name in ('a', 'b', 'default')] == [2, 1, 1]
+    assert [groups[name]['cpu_time'] for name in ('a', 'b', 'default')] == [40, 20, 40]
+    assert sum(group['cpu_share'] for group in groups.values()) == pytest.approx(1)
+
+
+def test_processes_and_subgroups():
+    jobs = [job(0, 'acme', 10), job(1, 'acme/batch', 10, arrival_time=5)]
+    with pytest.raises(ValueError):
+        create_algorithm(Dataset.from_jobs(jobs), 'FairShare', {}).run()
@@ -0,0 +1,33 @@
+from importers import CSVImporter
+from tracefile import open_records
+
+
+def test_csv_empty_priority(tmp_path):
+    """
+    Jobs with an empty priority are imported with priority 0; only invalid times and CPUs are skipped.
+    """
+    path = tmp_path / 'jobs.csv'
+    path.write_text(
+        'id,submit_time,duration,queue,cpus\n'
+        '1,0,5,,1\n'
+        '2,3,4,2,2\n'
+        '3,5,0,1,1\n'
+        '4,-1,3,1,1\n'
+        '5,6,2,,0\n'
+        '6,7,8,,\n'
+    )
+    importer = CSVImporter(str(path), burst='duration', pid='id', priority='queue', cpus='cpus')
+    assert importer.convert(str(tmp_path / 'jobs.trace')) == 2
+    assert importer.skipped == 4
+    _, parts = open_records(str(tmp_path / 'jobs.trace'))
+    records = parts[0]
+    assert records['pid'].tolist() == [1, 2]
+    assert records['priority'].tolist() == [0, 2]
+
+
+def test_csv_without_cpus(tmp_path):
+    path = tmp_path / 'jobs.csv'
+    path.write_text('submit_time,duration,queue\n0,5,\n1,2,3\n')
+    importer = CSVImporter(str(path), burst='duration', priority='queue')
+    assert importer.convert(str(tmp_path / 'jobs.trace')) == 2
+    assert importer.skipped == 0
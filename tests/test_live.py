@@ -0,0 +1,23 @@
+from queue import Queue
+
+from batch import create_algorithm
+from dataset import Dataset
+from live import COLORS, LiveSampler
+
+
+def test_string_pids():
+    """
+    Processes are sent as color indices, so pids like those of processes.json need not be numbers.
+    """
+    jobs = [{'pid': 'P%d' % i, 'arrival_time': i, 'burst_time': 3, 'priority': 0} for i in range(30)]
+    queue = Queue()
+    instance = create_algorithm(Dataset.from_jobs(jobs), 'RR', {})
+    sampler = LiveSampler(queue, 120, columns=60, interval=0)
+    instance.observers.append(sampler)
+    instance.run()
+    sampler.finish(instance)
+    colors = []
+    while not queue.empty():
+        colors.extend(queue.get()[2]['colors'])
+    assert set(colors) <= set(range(-1, COLORS))
+    assert len(set(colors) - {-1}) == COLORS
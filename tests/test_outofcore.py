@@ -0,0 +1,76 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+import algorithms
+import batch
+import outofcore
+from dataset import Dataset
+from telemetry import Telemetry
+from tracefile import save_dataset
+
+
+@pytest.fixture(scope='module')
+def trace(tmp_path_factory):
+    rng = random.Random(0)
+    jobs = [
+        {'pid': pid, 'arrival_time': rng.randint(0, 3000), 'burst_time': rng.randint(1, 20),
+         'priority': rng.randint(0, 10)}
+        for pid in range(2000)
+    ]
+    path = str(tmp_path_factory.mktemp('outofcore') / 'jobs.trace')
+    save_dataset(Dataset.from_jobs(jobs), path)
+    return path
+
+
+@pytest.mark.parametrize('name', algorithms.names())
+def test_telemetry(trace, tmp_path, name):
+    """
+    Every algorithm reports its progress out of core, where arrivals are streamed from the trace.
+    """
+    reports = str(tmp_path / 'progress.jsonl')
+    telemetry = Telemetry(0, reports)
+    result = outofcore.run(name, trace, str(tmp_path / 'results.trace'), buffer_size=256, telemetry=telemetry)
+    assert len(result['processes']) == 2000
+    with open(reports) as f:
+        samples = [json.loads(line) for line in f]
+    # Reports every 256 steps with an interval of 0, then once at the end
+    assert len(samples) > 1
+    assert all(sample['ready'] >= 0 for sample in samples)
+    assert samples[-1]['done'] and samples[-1]['completed'] == 2000
+
+
+@pytest.fixture(scope='module')
+def wide_trace(tmp_path_factory):
+    rng = random.Random(1)
+    jobs = [
+        {'pid': pid, 'arrival_time': rng.randint(0, 500), 'burst_time': rng.randint(1, 20),
+         'priority': 0, 'cpus': rng.randint(1, 8)}
+        for pid in range(400)
+    ]
+    dataset = Dataset.from_jobs(jobs)
+    path = str(tmp_path_factory.mktemp('outofcore') / 'wide.trace')
+    save_dataset(dataset, path)
+    return dataset, path
+
+
+@pytest.mark.parametrize('name', ['EASYBackfilling', 'ConservativeBackfilling'])
+@pytest.mark.parametrize('params', [{}, {'cpus': 16}])
+def test_backfilling(wide_trace, tmp_path, name, params):
+    """
+    Backfilling out of core sizes the machine from the trace, or by the cpus parameter, and
+    schedules like it does in memory.
+    """
+    dataset, path = wide_trace
+    expected = batch.create_algorithm(dataset, name, params).run()
+    result = outofcore.run(name, path, str(tmp_path / 'results.trace'), buffer_size=64, params=params)
+    assert result['cpus'] == expected['cpus'] == params.get('cpus', 8)
+    for field in ('pid', 'start_time', 'end_time'):
+        np.testing.assert_array_equal(result['processes'][field], expected['processes'][field])
+
+
+def test_backfilling_too_few_cpus(wide_trace, tmp_path):
+    with pytest.raises(ValueError):
+        outofcore.run('EASYBackfilling', wide_trace[1], str(tmp_path / 'results.trace'), params={'cpus': 4})
@@ -0,0 +1,99 @@
+import random
+
+import numpy as np
+import pytest
+
+from algorithms.prediction import BurstPredictor
+from batch import create_algorithm
+from dataset import Dataset
+from process import Process
+
+
+def process(pid, burst_time, group=None):
+    return Process(pid, 0, 0, burst_time, group=group)
+
+
+@pytest.mark.parametrize('kwargs', [{'key': 'bogus'}, {'alpha': 0}, {'alpha': 1.5}])
+def test_invalid_predictor(kwargs):
+    with pytest.raises(ValueError):
+        BurstPredictor(**kwargs)
+
+
+@pytest.mark.parametrize('params', [{'alpha': 0}, {'prediction_key': 'bogus'}, {'initial_estimate': -1},
+                                    {'prediction': 'yes'}])
+def test_invalid_params(params):
+    jobs = [{'pid': 0, 'arrival_time': 0, 'burst_time': 5, 'priority': 0}]
+    with pytest.raises(ValueError):
+        create_algorithm(Dataset.from_jobs(jobs), 'NonPreemptiveSJF', dict({'prediction': True}, **params))
+
+
+def test_exponential_average():
+    """
+    Estimates of a key average its burst times, and unseen keys are predicted by the average over all keys.
+    """
+    predictor = BurstPredictor('group', alpha=0.5, initial_estimate=3)
+    first = process(0, 10, group='a')
+    predictor.predict([first])
+    assert first.predicted_burst_time == 3
+    predictor.update(first)
+    for burst_time in (20, 40):
+        later = process(1, burst_time, group='a')
+        predictor.predict([later])
+        predictor.update(later)
+    # 10, then 10 + 0.5 * (20 - 10) = 15, then 15 + 0.5 * (40 - 15) = 27.5
+    unseen, seen = process(2, 0, group='b'), process(3, 0, group='a')
+    predictor.predict([unseen, seen])
+    assert seen.predicted_burst_time == 27.5
+    assert unseen.predicted_burst_time == 27.5
+    predictor.update(process(4, 2, group='b'))
+    probe = process(5, 0, group='b')
+    predictor.predict([probe])
+    assert probe.predicted_burst_time == 2
+
+
+def test_error_metrics():
+    """
+    Errors are the predictions minus the burst times, recorded as the processes arrive.
+    """
+    predictor = BurstPredictor('global', alpha=1, initial_estimate=0)
+    burst_times = [4, 8, 2, 2, 10]
+    for pid, burst_time in enumerate(burst_times):
+        arriving = process(pid, burst_time)
+        predictor.predict([arriving])
+        predictor.update(arriving)
+    # With alpha 1 every prediction is the burst time before it
+    errors = np.array([0 - 4, 4 - 8, 8 - 2, 2 - 2, 2 - 10], dtype=float)
+    results = predictor.results()
+    assert results['processes'] == 5
+    assert results['keys'] == 1
+    assert results['average_error'] == pytest.approx(errors.mean())
+    assert results['average_absolute_error'] == pytest.approx(np.abs(errors).mean())
+    assert results['relative_absolute_error'] == pytest.approx(np.abs(errors).sum() / sum(burst_times))
+    assert results['rmse'] == pytest.approx(np.sqrt((errors ** 2).mean()))
+    assert results['max_absolute_error'] == 8
+    assert results['p50_absolute_error'] == 4
+
+
+@pytest.mark.parametrize('name', ['PreemptiveSJF', 'NonPreemptiveSJF'])
+def test_run_reports_errors(name):
+    rng = random.Random(0)
+    jobs = [{'pid': pid, 'arrival_time': rng.randint(0, 500), 'burst_time': rng.randint(1, 20),
+             'priority': 0, 'group': pid % 3}
+            for pid in range(200)]
+    dataset = Dataset.from_jobs(jobs)
+    assert 'prediction' not in create_algorithm(dataset, name, {}).run()
+    result = create_algorithm(dataset, name, {'prediction': True, 'prediction_key': 'group'}).run()
+    assert len(result['processes']) == 200
+    assert result['prediction']['processes'] == 200
+    assert result['prediction']['keys'] == 3
+    assert result['prediction']['average_absolute_error'] > 0
+
+
+def test_exact_predictions():
+    """
+    Jobs which all take the initial estimate are predicted exactly, before and after they finish.
+    """
+    jobs = [{'pid': pid, 'arrival_time': 10 * pid, 'burst_time': 5, 'priority': 0} for pid in range(50)]
+    result = create_algorithm(Dataset.from_jobs(jobs), 'NonPreemptiveSJF',
+                              {'prediction': True, 'prediction_key': 'global', 'initial_estimate': 5}).run()
+    assert result['prediction']['max_absolute_error'] == 0
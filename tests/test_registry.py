@@ -0,0 +1,20 @@
+import pytest
+
+import algorithms
+
+
+@pytest.mark.parametrize('params', [
+    {'alpha': 0},
+    {'alpha': 5},
+    {'alpha': -0.5},
+    {'prediction_key': 'bogus'},
+    {'prediction': 1},
+])
+def test_invalid_params(params):
+    with pytest.raises(ValueError):
+        algorithms.validate_params('PreemptiveSJF', params)
+
+
+def test_valid_params():
+    algorithms.validate_params('NonPreemptiveSJF', {'prediction': True, 'prediction_key': 'group', 'alpha': 1})
+    algorithms.validate_params('RR', {'quantum': 2})
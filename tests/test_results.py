@@ -0,0 +1,73 @@
+import random
+
+import numpy as np
+import pytest
+
+from batch import create_algorithm
+from dataset import Dataset
+from results import CSVResultWriter, ResultColumns, open_sink
+from tracefile import RESULT_DTYPE, ResultWriter
+
+FIELDS = RESULT_DTYPE.names[1:]
+
+
+def random_jobs(count=300, pids=int):
+    rng = random.Random(0)
+    jobs = []
+    for pid in range(count):
+        job = {'pid': pids(pid), 'arrival_time': rng.randint(0, 1000), 'burst_time': rng.randint(0, 10),
+               'priority': rng.randint(0, 10)}
+        if rng.random() < 0.5:
+            job['deadline'] = rng.randint(1, 50)
+        jobs.append(job)
+    return jobs
+
+
+def run(jobs, sink=None):
+    instance = create_algorithm(Dataset.from_jobs(jobs), 'PreemptiveSJF', {})
+    if sink is not None:
+        instance.executed_processes = sink
+    return instance.run()['processes']
+
+
+@pytest.mark.parametrize('name', ['results.trace', 'results.csv'])
+@pytest.mark.parametrize('chunk_size', [1, 7, 65536])
+def test_round_trip(tmp_path, name, chunk_size):
+    """
+    Records streamed to a file and read back are the records kept in memory.
+    """
+    jobs = random_jobs()
+    expected = run(jobs)
+    sink = open_sink(str(tmp_path / name), chunk_size)
+    assert isinstance(sink, CSVResultWriter if name.endswith('.csv') else ResultWriter)
+    records = run(jobs, sink)
+    assert len(records) == len(expected) == len(jobs)
+    np.testing.assert_array_equal(records['pid'].astype(np.int64), expected['pid'])
+    for field in FIELDS:
+        np.testing.assert_array_equal(records[field], expected[field])
+
+
+def test_string_pids(tmp_path):
+    """
+    Processes whose pids are not integers keep them, in memory and in CSV files.
+    """
+    jobs = random_jobs(pids='P{}'.format)
+    expected = run(jobs)
+    assert expected['pid'].dtype == object and expected['pid'][0].startswith('P')
+    records = run(jobs, open_sink(str(tmp_path / 'results.csv')))
+    assert records['pid'].tolist() == expected['pid'].tolist()
+    for field in FIELDS:
+        np.testing.assert_array_equal(records[field], expected[field])
+
+
+def test_extend_records():
+    """
+    Records of another run are appended after the records so far, growing the columns.
+    """
+    records = run(random_jobs())
+    sink = ResultColumns(10)
+    sink.extend_records(records[:100])
+    sink.extend_records(records[100:])
+    assert len(sink) == len(records)
+    for field in RESULT_DTYPE.names:
+        np.testing.assert_array_equal(sink.records()[field], records[field])
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from batch import create_algorithm
+from dataset import Dataset
+from equivalence import WORKLOADS, compare
+
+
+def long_bursts(rng, size):
+    """
+    Few jobs with long bursts arriving far apart, so most rounds are fast-forwarded.
+    """
+    return [
+        {'pid': pid, 'arrival_time': rng.randint(0, 2000), 'burst_time': rng.randint(1, 400),
+         'priority': 0}
+        for pid in range(size)
+    ]
+
+
+@pytest.mark.parametrize('quantum', [1, 3, 8])
+@pytest.mark.parametrize('seed', range(10))
+def test_fast_forward_matches_reference(quantum, seed):
+    """
+    Running full rounds at once schedules every job like the slice-by-slice reference.
+    """
+    rng = random.Random(seed)
+    assert compare('RR', long_bursts(rng, rng.randint(1, 12)), quantum) is None
+
+
+@pytest.mark.parametrize('kind', sorted(WORKLOADS))
+@pytest.mark.parametrize('seed', range(10))
+def test_matches_reference(kind, seed):
+    rng = random.Random(seed)
+    assert compare('RR', WORKLOADS[kind](rng, 20), rng.randint(1, 6)) is None
+
+
+def test_fast_forward_skips_rounds():
+    """
+    Two long jobs take a handful of steps instead of one per quantum.
+    """
+    jobs = [{'pid': 0, 'arrival_time': 0, 'burst_time': 10 ** 6, 'priority': 0},
+            {'pid': 1, 'arrival_time': 0, 'burst_time': 10 ** 6 + 5, 'priority': 0}]
+    instance = create_algorithm(Dataset.from_jobs(jobs), 'RR', {'quantum': 1})
+    steps = []
+    instance.observers.append(steps.append)
+    records = instance.run()['processes']
+    assert len(steps) < 20
+    assert sorted(records['end_time'].tolist()) == [2 * 10 ** 6 - 1, 2 * 10 ** 6 + 5]
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from server import DatasetCache, HTTPError, Job, JobServer
+
+
+def write_datasets(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / 'jobs{}.json'.format(i)
+        path.write_text(json.dumps([{'pid': 1, 'arrival_time': 0, 'burst_time': i + 1, 'priority': 0}]))
+        paths.append(str(path))
+    return paths
+
+
+def test_cache_threads(tmp_path):
+    """
+    Threads asking for the same files at once load every file once, and evicting never fails.
+    """
+    paths = write_datasets(tmp_path, 4)
+    cache = DatasetCache(capacity=2)
+    errors = []
+
+    def get(path):
+        try:
+            cache.get(path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=get, args=(paths[i % 2],)) for i in range(32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert cache.misses == 2 and cache.hits == 30
+
+    threads = [threading.Thread(target=get, args=(path,)) for path in paths * 8]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(cache.datasets) == 2
+
+
+def test_history():
+    """
+    Only the last finished jobs are kept, while unfinished ones stay.
+    """
+    server = JobServer(workers=1, history=3)
+    jobs = [Job(job_id, {'algorithm': 'RR'}) for job_id in range(1, 6)]
+    for job in jobs:
+        server.jobs[job.id] = job
+    for job in jobs[:4]:
+        server.retire(job)
+    assert list(server.jobs) == [2, 3, 4, 5]
+
+
+def read_request(data):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await JobServer(workers=1).read_request(reader)
+    return asyncio.run(read())
+
+
+@pytest.mark.parametrize('length', [b'abc', b'-1', b''])
+def test_invalid_content_length(length):
+    with pytest.raises(HTTPError) as error:
+        read_request(b'POST /jobs HTTP/1.1\r\nContent-Length: ' + length + b'\r\n\r\n{}')
+    assert error.value.status == 400
+
+
+def test_read_request():
+    assert read_request(b'POST /jobs HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}') == ('POST', '/jobs', b'{}')
+    assert read_request(b'GET /jobs HTTP/1.1\r\n\r\n') == ('GET', '/jobs', b'')
@@ -0,0 +1,55 @@
+import random
+
+import numpy as np
+import pytest
+
+from batch import create_algorithm
+from dataset import Dataset
+from vectorized import POLICIES, VectorizedBatch
+
+
+def workloads(seed, count, zero_bursts):
+    rng = random.Random(seed)
+    datasets = []
+    for _ in range(count):
+        jobs = []
+        for pid in range(rng.randint(1, 25)):
+            burst_time = rng.randint(1, 12)
+            if zero_bursts and rng.random() < 0.4:
+                burst_time = 0
+            jobs.append({'pid': pid, 'arrival_time': rng.randint(0, 40), 'burst_time': burst_time,
+                         'priority': rng.randint(0, 3)})
+        datasets.append(Dataset.from_jobs(jobs))
+    return datasets
+
+
+@pytest.mark.parametrize('name', list(POLICIES))
+@pytest.mark.parametrize('zero_bursts', [False, True])
+def test_matches_loop_engine(name, zero_bursts):
+    """
+    Every workload of a batch is scheduled exactly like the algorithm schedules it alone.
+    """
+    datasets = workloads(1, 300, zero_bursts)
+    result = VectorizedBatch.stack(datasets).run(name)
+    for i, dataset in enumerate(datasets):
+        expected = create_algorithm(dataset, name, {}).run()
+        records = expected['processes']
+        start_times = dict(zip(records['pid'].tolist(), records['start_time'].tolist()))
+        assert result['start_time'][i, :len(dataset)].tolist() == [start_times[pid] for pid in dataset.pids]
+        for key in ('total_time', 'cpu_utilization', 'throughput', 'average_waiting_time',
+                    'average_turnaround_time', 'average_response_time'):
+            assert np.isclose(result[key][i], expected[key]), key
+
+
+def test_zero_burst_first():
+    """
+    A job without burst time ends at once and the CPU picks again from the ready queue.
+    """
+    dataset = Dataset.from_jobs([
+        {'pid': 0, 'arrival_time': 0, 'burst_time': 0, 'priority': 0},
+        {'pid': 1, 'arrival_time': 0, 'burst_time': 5, 'priority': 1},
+        {'pid': 2, 'arrival_time': 1, 'burst_time': 3, 'priority': 0},
+    ])
+    result = VectorizedBatch.stack([dataset]).run('NonPreemptivePriority')
+    assert result['start_time'][0].tolist() == [0, 0, 5]
+    assert result['cpu_utilization'][0] == 1.0
@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+import pytest
+
+from batch import create_algorithm
+from dataset import Dataset
+from whatif import WhatIf
+
+ALGORITHMS = ['FIFO', 'PreemptiveSJF', 'NonPreemptiveSJF', 'PriorityPreemptive', 'NonPreemptivePriority', 'RR']
+
+
+def random_jobs(rng, count=100):
+    return [
+        {'pid': pid, 'arrival_time': rng.randint(0, 500), 'burst_time': rng.randint(1, 20),
+         'priority': rng.randint(0, 10)}
+        for pid in range(count)
+    ]
+
+
+def assert_same_result(result, expected):
+    for name in ('total_time', 'cpu_utilization', 'average_waiting_time', 'average_turnaround_time',
+                 'average_response_time'):
+        assert result[name] == pytest.approx(expected[name]), name
+    records = np.sort(result['processes'], order='pid')
+    expected_records = np.sort(expected['processes'], order='pid')
+    for field in ('pid', 'start_time', 'end_time', 'waiting_time'):
+        np.testing.assert_array_equal(records[field], expected_records[field])
+
+
+@pytest.mark.parametrize('name', ALGORITHMS)
+@pytest.mark.parametrize('seed', range(4))
+def test_matches_full_rerun(name, seed):
+    """
+    Resuming from a snapshot, and reusing the base schedule once the state matches again, gives
+    the result of simulating the changed workload from the start.
+    """
+    rng = random.Random(seed)
+    jobs = random_jobs(rng)
+    changes = [{'pid': rng.randrange(len(jobs)), 'burst_time': rng.randint(1, 20)},
+               {'pid': rng.randrange(len(jobs)), 'priority': rng.randint(0, 10)}]
+    additions = [{'pid': len(jobs), 'arrival_time': rng.randint(250, 500), 'burst_time': 5, 'priority': 3}]
+    result = WhatIf(jobs, name, interval=10).run(changes, additions)
+
+    changed = [dict(job) for job in jobs]
+    for change in changes:
+        changed[change['pid']].update(change)
+    expected = create_algorithm(Dataset.from_jobs(changed + additions), name, {}).run()
+    assert_same_result(result, expected)
+
+
+def test_resumes_from_snapshot():
+    """
+    A job added late resumes the run from a snapshot taken before it arrives.
+    """
+    jobs = random_jobs(random.Random(0))
+    result = WhatIf(jobs, 'FIFO', interval=10).run(
+        additions=[{'pid': len(jobs), 'arrival_time': 400, 'burst_time': 5, 'priority': 0}]
+    )
+    assert result['resumed_from'] is not None and result['resumed_from'] <= 400
+
+
+def test_reconverges():
+    """
+    FIFO ignores priorities, so after changing one the run matches the base run again and reuses it.
+    """
+    jobs = random_jobs(random.Random(0))
+    what_if = WhatIf(jobs, 'FIFO', interval=10)
+    result = what_if.run([{'pid': 50, 'priority': 99}])
+    assert result['reconverged_at'] is not None
+    assert_same_result(result, what_if.base_result)
@@ -0,0 +1,425 @@
+"""
+Binary trace files: a fixed-size JSON header followed by fixed-size records, which can be
+memory-mapped and read in chunks without loading the whole workload.
+"""
+import argparse
+import json
+import os
+from operator import attrgetter
+
+import numpy as np
+
+from process import Process
+
+parser = argparse.ArgumentParser(description='Convert a process.json file to a trace file.')
+parser.add_argument('-i', '--input', type=str, help='process.json file')
+parser.add_argument('-o', '--output', type=str, help='Output trace file')
+
+HEADER_SIZE = 4096
+MAGIC = 'cpu-scheduler-trace'
+MANIFEST_MAGIC = 'cpu-scheduler-manifest'
+
+TRACE_DTYPE = np.dtype([
+    ('pid', np.int64),
+    ('arrival_time', np.int64),
+    ('burst_time', np.int64),
+    ('priority', np.int64),
+])
+
+# Optional fields of trace records, stored only for workloads which have them, by Dataset column.
+# Groups are stored as integers; deadlines and periods missing for some processes as NO_DEADLINE
+OPTIONAL_FIELDS = {
+    'groups': ('group', np.int64),
+    'deadlines': ('deadline', np.int64),
+    'periods': ('period', np.int64),
+    'cpus': ('cpus', np.int64),
+}
+NO_DEADLINE = -1
+
+RESULT_DTYPE = np.dtype([
+    ('pid', np.int64),
+    ('arrival_time', np.int64),
+    ('burst_time', np.int64),
+    ('priority', np.int64),
+    ('start_time', np.float64),
+    ('end_time', np.float64),
+    ('waiting_time', np.float64),
+    ('turnaround_time', np.float64),
+    ('response_time', np.float64),
+    ('due_time', np.float64),
+])
+
+
+def is_trace(path):
+    """
+    Check whether the file at path is a trace file.
+    """
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC) + 12) == ('{"magic": "%s"' % MAGIC).encode()
+
+
+def is_manifest(path):
+    """
+    Check whether the file at path is a manifest of trace shards.
+    """
+    with open(path, 'rb') as f:
+        return f.read(len(MANIFEST_MAGIC) + 12) == ('{"magic": "%s"' % MANIFEST_MAGIC).encode()
+
+
+def read_header(path):
+    """
+    Read the header of a trace file.
+    :return: header dict with at least "count" and "fields", and "sorted_by" if the records are sorted
+    """
+    with open(path, 'rb') as f:
+        header = json.loads(f.read(HEADER_SIZE).decode())
+    if header.get('magic') != MAGIC:
+        raise ValueError('Not a trace file: {}'.format(path))
+    return header
+
+
+def open_trace(path):
+    """
+    Memory-map the records of a trace file.
+    :return: (header, read-only structured array)
+    """
+    header = read_header(path)
+    dtype = np.dtype([tuple(field) for field in header['fields']])
+    if not header['count']:
+        return header, np.zeros(0, dtype=dtype)
+    return header, np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(header['count'],))
+
+
+def read_manifest(path):
+    """
+    Read a manifest of trace shards, which together form one trace in the order of the shards.
+    :return: manifest dict with "count", "shards" (list of dicts with "path" and "count") and
+             "sorted_by" if the records of all shards are sorted; shard paths are resolved
+    """
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('magic') != MANIFEST_MAGIC:
+        raise ValueError('Not a manifest: {}'.format(path))
+    directory = os.path.dirname(os.path.abspath(path))
+    for shard in manifest['shards']:
+        shard['path'] = os.path.join(directory, shard['path'])
+    return manifest
+
+
+def open_records(path):
+    """
+    Memory-map the records of a trace file, or of all shards of a manifest.
+    :return: (header or manifest, list of read-only structured arrays)
+    """
+    if is_manifest(path):
+        manifest = read_manifest(path)
+        return manifest, [open_trace(shard['path'])[1] for shard in manifest['shards']]
+    header, records = open_trace(path)
+    return header, [records]
+
+
+class TraceWriter:
+    """
+    Write records to a trace file in chunks. The record count in the header is filled in on close.
+    Extra header fields are passed as keyword arguments, e.g. sorted_by=['arrival_time'].
+    """
+
+    def __init__(self, path, dtype=TRACE_DTYPE, chunk_size=65536, **header):
+        self.path = path
+        self.dtype = dtype
+        self.header = header
+        self.count = 0
+        self.buffer = np.zeros(chunk_size, dtype=dtype)
+        self.buffered = 0
+        self.file = open(path, 'wb')
+        self.write_header()
+
+    def __len__(self):
+        return self.count + self.buffered
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_header(self):
+        header = dict(magic=MAGIC, **self.header)
+        header.update(count=self.count, fields=[[name, self.dtype[name].str] for name in self.dtype.names])
+        data = json.dumps(header).encode()
+        if len(data) >= HEADER_SIZE:
+            raise ValueError('Trace header is too large')
+        self.file.seek(0)
+        self.file.write(data.ljust(HEADER_SIZE - 1) + b'\n')
+        self.file.seek(0, 2)
+
+    def write(self, records):
+        """
+        Write an array of records.
+        """
+        self.flush()
+        records = np.asarray(records, dtype=self.dtype)
+        self.file.write(records.tobytes())
+        self.count += len(records)
+
+    def append(self, record):
+        """
+        Buffer one record given as a tuple of field values.
+        """
+        self.buffer[self.buffered] = record
+        self.buffered += 1
+        if self.buffered == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        if self.buffered:
+            self.file.write(self.buffer[:self.buffered].tobytes())
+            self.count += self.buffered
+            self.buffered = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.write_header()
+        self.file.close()
+
+
+def fill_results(records, processes):
+    """
+    Write finished processes into result records, a column at a time. Turnaround, waiting and
+    response times are derived from the other columns the way BaseAlgorithm.complete_process does.
+    Processes without a deadline get a NaN due time.
+    :param records: array of as many result records as there are processes
+    """
+    count = len(processes)
+    records['pid'] = [process.pid for process in processes]
+    for name in ('arrival_time', 'burst_time', 'priority', 'start_time', 'end_time'):
+        records[name] = np.fromiter(map(attrgetter(name), processes), records.dtype[name], count)
+    records['due_time'] = [np.nan if process.due_time is None else process.due_time for process in processes]
+    records['turnaround_time'] = records['end_time'] - records['arrival_time']
+    records['waiting_time'] = records['turnaround_time'] - records['burst_time']
+    records['response_time'] = records['start_time'] - records['arrival_time']
+
+
+class ResultWriter(TraceWriter):
+    """
+    Result sink which streams every finished process to a trace file. Processes are kept until a
+    chunk is full and then written a column at a time.
+    """
+
+    def __init__(self, path, chunk_size=65536):
+        super().__init__(path, dtype=RESULT_DTYPE, chunk_size=chunk_size)
+        self.pending = []
+
+    def __len__(self):
+        return super().__len__() + len(self.pending)
+
+    def append(self, process):
+        self.pending.append(process)
+        if len(self.pending) == len(self.buffer):
+            self.flush()
+
+    def extend(self, processes):
+        for process in processes:
+            self.append(process)
+
+    def flush(self):
+        if self.pending:
+            fill_results(self.buffer[:len(self.pending)], self.pending)
+            self.buffered = len(self.pending)
+            self.pending = []
+        super().flush()
+
+    def records(self):
+        """
+        Close the file and memory-map the records written.
+        :return: read-only structured array of RESULT_DTYPE
+        """
+        self.close()
+        return open_trace(self.path)[1]
+
+
+class StreamedArrivals:
+    """
+    Pending processes of a trace file or a manifest of shards sorted by arrival time, read ahead in
+    chunks of buffer_size records. Offers the same interface as algorithms.arrivals.ArrivalIndex, so
+    only the read-ahead buffer of pending processes lives in memory.
+    """
+
+    def __init__(self, path, order=('arrival_time',), compare_prop='priority', buffer_size=65536):
+        """
+        :param path: trace file or manifest sorted by arrival time
+        :param order: properties the algorithm orders its input by; processes arriving at the same
+                      time are sorted by the ones after arrival_time
+        :param compare_prop: property the algorithm compares processes by
+        :param buffer_size: number of records read ahead
+        """
+        header, self.parts = open_records(path)
+        self.count = sum(len(records) for records in self.parts)
+        sorted_by = tuple(header.get('sorted_by', ('arrival_time',)))
+        if sorted_by[:1] != ('arrival_time',):
+            raise ValueError('Trace file is not sorted by arrival time, sort it with extsort.py')
+        # Groups arriving together still need sorting unless the file is sorted the same way
+        if len(order) > 1 and sorted_by[:len(order)] != tuple(order):
+            self.group_key = attrgetter(*order[1:])
+        else:
+            self.group_key = None
+        self.compare_prop = compare_prop
+        self.buffer_size = buffer_size
+        self.part = 0
+        self.position = 0
+        self.chunk = []
+        self.chunk_arrival_times = np.zeros(0, dtype=np.int64)
+        self.index = 0
+        self.cursor = 0
+        self.last_arrival_time = None
+
+    def __len__(self):
+        return self.count - self.cursor
+
+    def __bool__(self):
+        return self.cursor < self.count
+
+    def fill(self):
+        """
+        Read the next chunk once the current one is used up.
+        :return: False if there is nothing left to read
+        """
+        if self.index < len(self.chunk):
+            return True
+        while self.part < len(self.parts) and self.position >= len(self.parts[self.part]):
+            self.part += 1
+            self.position = 0
+        if self.part == len(self.parts):
+            return False
+        records = np.array(self.parts[self.part][self.position:self.position + self.buffer_size])
+        arrival_times = records['arrival_time']
+        previous = self.chunk_arrival_times[-1:]
+        if np.any(np.diff(np.concatenate([previous, arrival_times])) < 0):
+            raise ValueError('Trace file is not sorted by arrival time, sort it with extsort.py')
+        columns = optional_columns(records)
+        missing = [None] * len(records)
+        self.chunk = [
+            Process(pid=pid, arrival_time=arrival_time, burst_time=burst_time, priority=priority,
+                    compare_prop=self.compare_prop, group=group, deadline=deadline, period=period, cpus=cpus)
+            for pid, arrival_time, burst_time, priority, group, deadline, period, cpus in zip(
+                records['pid'].tolist(), arrival_times.tolist(), records['burst_time'].tolist(),
+                records['priority'].tolist(), columns.get('groups', missing),
+                columns.get('deadlines', missing), columns.get('periods', missing),
+                columns.get('cpus', [1] * len(records))
+            )
+        ]
+        self.chunk_arrival_times = arrival_times
+        self.index = 0
+        self.position += len(records)
+        return True
+
+    def next_arrival_time(self):
+        """
+        :return: arrival time of the next process, or None if all of them have arrived
+        """
+        if not self.fill():
+            return None
+        return self.chunk[self.index].arrival_time
+
+    def take(self, time):
+        """
+        Take the processes arriving at the given time.
+        :return: list of processes, empty if none arrives at that time
+        """
+        arrived_processes = []
+        while self.fill() and self.chunk[self.index].arrival_time == time:
+            end = int(np.searchsorted(self.chunk_arrival_times, time, side='right'))
+            arrived_processes.extend(self.chunk[self.index:end])
+            self.index = end
+        if arrived_processes:
+            self.cursor += len(arrived_processes)
+            self.last_arrival_time = time
+            if self.group_key is not None:
+                arrived_processes.sort(key=self.group_key)
+        return arrived_processes
+
+    def widest(self):
+        """
+        :return: largest number of CPUs a process of the trace needs, 1 if it has no cpus field
+        """
+        return max((int(records['cpus'].max()) for records in self.parts
+                    if 'cpus' in records.dtype.names and len(records)), default=1)
+
+    def arrived_count(self, time):
+        """
+        :return: number of processes arriving by the given time which have not been taken yet, as
+                 far as they have been read ahead
+        """
+        if not self.fill():
+            return 0
+        return int(np.searchsorted(self.chunk_arrival_times, time, side='right')) - self.index
+
+    def popleft(self):
+        """
+        Take the next process alone.
+        """
+        self.fill()
+        process = self.chunk[self.index]
+        self.index += 1
+        self.cursor += 1
+        self.last_arrival_time = process.arrival_time
+        return process
+
+
+def optional_columns(records):
+    """
+    Read the optional fields present in trace records.
+    :return: dict of Dataset column name to list of values, None for missing deadlines and periods
+    """
+    columns = {}
+    for column, (name, _) in OPTIONAL_FIELDS.items():
+        if name not in records.dtype.names:
+            continue
+        values = records[name].tolist()
+        if name in ('deadline', 'period'):
+            values = [None if value == NO_DEADLINE else value for value in values]
+        columns[column] = values
+    return columns
+
+
+def save_dataset(dataset, path):
+    """
+    Write a dataset to a trace file. Processes whose pid is not an integer are numbered by their
+    position in arrival order. Groups are only stored if they are integers, and so are deadlines and periods.
+    Processes without a number of CPUs are stored with 1.
+    """
+    fields = [field for column, field in OPTIONAL_FIELDS.items() if getattr(dataset, column) is not None]
+    records = np.zeros(len(dataset), dtype=np.dtype(TRACE_DTYPE.descr + fields))
+    try:
+        records['pid'] = [int(pid) for pid in dataset.pids]
+    except ValueError:
+        records['pid'] = np.arange(len(dataset))
+    records['arrival_time'] = dataset.arrival_times
+    records['burst_time'] = dataset.burst_times
+    records['priority'] = dataset.priorities
+    if dataset.groups is not None:
+        try:
+            records['group'] = [int(group) for group in dataset.groups]
+        except (TypeError, ValueError):
+            raise ValueError('Only integer groups can be stored in trace files')
+    if dataset.cpus is not None:
+        records['cpus'] = [1 if value is None else value for value in dataset.cpus]
+    for column, name in (('deadlines', 'deadline'), ('periods', 'period')):
+        values = getattr(dataset, column)
+        if values is None:
+            continue
+        try:
+            records[name] = [NO_DEADLINE if value is None else int(value) for value in values]
+        except (TypeError, ValueError):
+            raise ValueError('Only integer {} can be stored in trace files'.format(column))
+    with TraceWriter(path, records.dtype, sorted_by=list(dataset.sorted_by)) as writer:
+        writer.write(records)
+
+
+if __name__ == '__main__':
+    from dataset import Dataset
+
+    args = parser.parse_args()
+    save_dataset(Dataset.load(args.input), args.output)
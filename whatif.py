@@ -0,0 +1,274 @@
+"""
+Re-simulate a workload after a small change (what-if analysis).
+
+A base run records snapshots of the scheduling state. A what-if run resumes from the latest
+snapshot taken before the earliest changed arrival, and stops as soon as its state matches the
+base run again, reusing the rest of the base schedule.
+"""
+import argparse
+import bisect
+import copy
+import json
+import time
+
+import numpy as np
+
+import algorithms
+from algorithms.base_algorithm import deadline_results
+from dataset import Dataset
+
+parser = argparse.ArgumentParser(description='Re-simulate a workload after changing some of its jobs.')
+parser.add_argument('-p', '--process', type=str, help='process.json file')
+parser.add_argument('-a', '--algorithm', type=str, help='algorithm name')
+parser.add_argument('-d', '--delta', type=str, help='delta.json file with "changes" and "additions"')
+parser.add_argument('-i', '--interval', type=float, default=100, help='Simulated time between snapshots')
+
+
+class Reconverged(Exception):
+    """
+    Raised from an observer to stop a what-if run whose state matches the base run again.
+    """
+
+
+class Snapshot:
+    """
+    Scheduling state of an algorithm at the top of a step.
+    Executed processes are never changed again, so only their count is kept.
+    """
+
+    def __init__(self, algorithm, horizon):
+        self.horizon = horizon
+        self.time = algorithm.time
+        self.idle_time = algorithm.idle_time
+        self.totals = (algorithm.total_waiting_time, algorithm.total_turnaround_time, algorithm.total_response_time)
+        self.executed = len(algorithm.executed_processes)
+        self.running_process = copy.copy(algorithm.running_process)
+        self.ready_queue = [copy.copy(process) for process in algorithm.ready_queue]
+
+    def restore(self, algorithm, executed_processes):
+        """
+        Put the algorithm back into this state.
+        :param algorithm: algorithm holding the processes which arrive at or after the horizon
+        :param executed_processes: result records of the run the snapshot was taken from
+        """
+        algorithm.time = self.time
+        algorithm.idle_time = self.idle_time
+        algorithm.total_waiting_time, algorithm.total_turnaround_time, algorithm.total_response_time = self.totals
+        records = executed_processes[:self.executed]
+        algorithm.executed_processes.extend_records(records)
+        algorithm.lateness.extend(lateness(records).tolist())
+        algorithm.running_process = copy.copy(self.running_process)
+        for process in self.ready_queue:
+            algorithm.append_to_ready_queue(copy.copy(process))
+
+    def matches(self, algorithm):
+        """
+        Check whether the algorithm will make the same decisions from here on as it did from this snapshot.
+        """
+        if algorithm.time != self.time:
+            return False
+        if process_state(algorithm.running_process) != process_state(self.running_process):
+            return False
+        if len(algorithm.ready_queue) != len(self.ready_queue):
+            return False
+        return all(
+            process_state(process) == process_state(snapshot_process)
+            for process, snapshot_process in zip(algorithm.ready_queue, self.ready_queue)
+        )
+
+
+class SnapshotRecorder:
+    """
+    Observer taking a snapshot every `interval` units of arrival horizon.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.snapshots = []
+        self.horizons = []
+
+    def __call__(self, algorithm):
+        horizon = algorithm.arrival_horizon()
+        if horizon is None:
+            return
+        if self.horizons and horizon < self.horizons[-1] + self.interval:
+            return
+        self.snapshots.append(Snapshot(algorithm, horizon))
+        self.horizons.append(horizon)
+
+    def latest_before(self, arrival_time):
+        """
+        Get the latest snapshot which no process arriving at or after arrival_time has influenced.
+        :return: Snapshot or None
+        """
+        i = bisect.bisect_right(self.horizons, arrival_time)
+        return self.snapshots[i - 1] if i else None
+
+
+class ReconvergenceCheck:
+    """
+    Observer stopping a what-if run once every changed process has arrived and the state
+    matches a base snapshot taken at the same horizon.
+    """
+
+    def __init__(self, recorder, last_change):
+        self.snapshots = dict(zip(recorder.horizons, recorder.snapshots))
+        self.last_change = last_change
+        self.snapshot = None
+
+    def __call__(self, algorithm):
+        horizon = algorithm.arrival_horizon()
+        if horizon is None or horizon <= self.last_change:
+            return
+        snapshot = self.snapshots.get(horizon)
+        if snapshot is not None and snapshot.matches(algorithm):
+            self.snapshot = snapshot
+            raise Reconverged()
+
+
+def process_state(process):
+    """
+    Return the fields of a process which decide how it is scheduled from now on.
+    """
+    if process is None:
+        return None
+    return (
+        process.pid, process.arrival_time, process.burst_time, process.priority,
+        process.remaining_time, process.start_time, process.due_time
+    )
+
+
+def lateness(records):
+    """
+    :return: array of the lateness of the result records which have a due time
+    """
+    due_times = records['due_time']
+    has_deadline = ~np.isnan(due_times)
+    return records['end_time'][has_deadline] - due_times[has_deadline]
+
+
+def summarize(records, total_time, idle_time):
+    """
+    Calculate the result of a run the same way the algorithms do. Times are added up one by one in
+    the order the processes finished, so the averages round the same way too.
+    """
+    executed = len(records)
+    result = {
+        "processes": records,
+        "total_time": total_time,
+        "cpu_utilization": (total_time - idle_time) / total_time,
+        "throughput": executed / total_time,
+        "average_waiting_time": sum(records['waiting_time'].tolist()) / executed,
+        "average_turnaround_time": sum(records['turnaround_time'].tolist()) / executed,
+        "average_response_time": sum(records['response_time'].tolist()) / executed
+    }
+    late = lateness(records)
+    if len(late):
+        result['deadlines'] = deadline_results(late)
+    return result
+
+
+class WhatIf:
+    """
+    Run a base simulation once, then answer what-if questions about changed or added jobs.
+    """
+
+    def __init__(self, jobs, algorithm, interval=100):
+        """
+        :param jobs: list of job dicts as found in process.json
+        :param algorithm: algorithm name
+        :param interval: simulated time between snapshots of the base run
+        """
+        self.jobs = list(jobs)
+        self.AlgorithmClass = algorithms.get_algorithm(algorithm)
+        self.index = {job['pid']: i for i, job in enumerate(self.jobs)}
+        self.recorder = SnapshotRecorder(interval)
+
+        base = self.create_algorithm(self.jobs)
+        base.observers.append(self.recorder)
+        self.base_result = base.run()
+        self.base_idle_time = base.idle_time
+
+    def create_algorithm(self, jobs):
+        """
+        Create an algorithm instance for the given jobs, sorted by arrival time like Simulate does.
+        """
+        dataset = Dataset.from_jobs(jobs)
+        return self.AlgorithmClass(dataset.processes(self.AlgorithmClass.process_compare_prop), dataset.sorted_by)
+
+    def run(self, changes=None, additions=None):
+        """
+        Simulate the base workload with some jobs changed or added.
+        :param changes: list of dicts with a "pid" and the fields to change, e.g. {"pid": 3, "burst_time": 7}
+        :param additions: list of new job dicts
+        :return: result dict like BaseAlgorithm.run, plus "resumed_from" (horizon of the snapshot used)
+                 or None, and "reconverged_at" (horizon at which the base schedule was reused, or None)
+        """
+        changes = changes or []
+        additions = additions or []
+        if not changes and not additions:
+            return dict(self.base_result, resumed_from=None, reconverged_at=None)
+
+        jobs = list(self.jobs)
+        touched = []
+        for change in changes:
+            if change['pid'] not in self.index:
+                raise ValueError('Unknown pid: {}'.format(change['pid']))
+            i = self.index[change['pid']]
+            touched.append(jobs[i]['arrival_time'])
+            jobs[i] = dict(jobs[i], **change)
+            touched.append(jobs[i]['arrival_time'])
+        jobs.extend(additions)
+        touched.extend(job['arrival_time'] for job in additions)
+
+        snapshot = self.recorder.latest_before(min(touched))
+        if snapshot is None:
+            algorithm = self.create_algorithm(jobs)
+            resumed_from = None
+        else:
+            algorithm = self.create_algorithm(job for job in jobs if job['arrival_time'] >= snapshot.horizon)
+            snapshot.restore(algorithm, self.base_result['processes'])
+            resumed_from = snapshot.horizon
+        check = ReconvergenceCheck(self.recorder, max(touched))
+        algorithm.observers.append(check)
+
+        try:
+            result = algorithm.run()
+        except Reconverged:
+            algorithm.executed_processes.extend_records(self.base_result['processes'][check.snapshot.executed:])
+            idle_time = algorithm.idle_time + self.base_idle_time - check.snapshot.idle_time
+            result = summarize(algorithm.executed_processes.records(), self.base_result['total_time'], idle_time)
+            return dict(result, resumed_from=resumed_from, reconverged_at=check.snapshot.horizon)
+
+        return dict(result, resumed_from=resumed_from, reconverged_at=None)
+
+
+def print_result(name, result):
+    print('%s:' % name)
+    print('  CPU total time: %.0f' % result['total_time'])
+    print('  CPU utilization: %f%%' % (result['cpu_utilization'] * 100))
+    print('  Throughput: %.6f' % result['throughput'])
+    print('  Average waiting time: %.2f' % result['average_waiting_time'])
+    print('  Average turnaround time: %.2f' % result['average_turnaround_time'])
+    print('  Average response time: %.2f' % result['average_response_time'])
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    with open(args.process, 'r') as f:
+        jobs = json.load(f)
+    with open(args.delta, 'r') as f:
+        delta = json.load(f)
+
+    start_time = time.time()
+    what_if = WhatIf(jobs, args.algorithm, args.interval)
+    print('Base simulation time: %.10f s' % (time.time() - start_time))
+
+    start_time = time.time()
+    result = what_if.run(delta.get('changes'), delta.get('additions'))
+    print('What-if simulation time: %.10f s' % (time.time() - start_time))
+    print('Resumed from: %s' % result['resumed_from'])
+    print('Reconverged at: %s' % result['reconverged_at'])
+
+    print_result('Base', what_if.base_result)
+    print_result('What-if', result)